@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains benchmarks, run with `python -m benchmarks` from the `src` directory.
+"""
+from .frame_time import *
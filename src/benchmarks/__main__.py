@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Runs frame time benchmarks and writes results as JSON.
+
+Exits with status 1 if a baseline is given and a scenario got slower than allowed.
+"""
+import argparse
+import json
+import platform
+import sys
+
+import pygame as pg
+
+from core import Game, Replayer
+
+from .frame_time import (MenuScenario, PlayScenario, PauseScenario, GameOverScenario, StressScenario,
+                         SpawnScenario, ReplayScenario, run_scenario, compare)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--frames", type=int, default=600, help="measured frames per scenario")
+    parser.add_argument("--actors", type=int, default=2000, help="extra actors in the stress scenario")
+    parser.add_argument("--spawns", type=int, default=60, help="enemies spawned per second in the spawn scenario")
+    parser.add_argument("--replay", metavar="PATH", help="also run the replay scenario on this replay log")
+    parser.add_argument("--scenario", action="append", help="scenario to run (default: all)")
+    parser.add_argument("--output", help="write results to this JSON file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative slowdown (default: 0.1)")
+    args = parser.parse_args()
+
+    scenarios = {s.name: s for s in (MenuScenario(), PlayScenario(), PauseScenario(), GameOverScenario(),
+                                     StressScenario(args.actors), SpawnScenario(args.spawns))}
+    if args.replay:
+        with open(args.replay, "rb") as f:
+            scenarios["replay"] = ReplayScenario(Replayer(f))
+    names = args.scenario or list(scenarios)
+    for name in names:
+        if name not in scenarios:
+            parser.error(f"unknown scenario {name!r}, choose from {list(scenarios)}")
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pg.version.ver,
+            "platform": platform.platform(),
+            "frames": args.frames,
+        },
+        "scenarios": {name: run_scenario(Game, scenarios[name], args.frames) for name in names},
+    }
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
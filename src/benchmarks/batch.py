@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains the throughput benchmark of `BatchPlay`.
+
+Run with `python -m benchmarks.batch`: games are stepped together with random actions.
+That `BatchPlay` goes exactly like headless games is tested by `tests/test_batch.py`.
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from core import BatchPlay
+from data import Action
+
+
+def random_actions(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    Returns random actions for `n` games, changing jump type now and then.
+    """
+    actions = rng.integers(0, 8, n)
+    actions[rng.random(n) < .02] |= Action.CHANGE_JUMP
+    return actions
+
+
+def throughput(games: int = 4096, ticks: int = 1000, seed: int = 0) -> float:
+    """
+    Returns the number of game ticks simulated per second by `BatchPlay`, with random actions.
+
+    :param games: Number of games stepped together.
+    :param ticks: Number of steps.
+    :param seed: Seed of the random actions.
+    """
+    rng = np.random.default_rng(seed)
+    actions = [random_actions(rng, games) for _ in range(min(ticks, 64))]
+    batch = BatchPlay(games)
+
+    start = perf_counter()
+    for tick in range(ticks):
+        batch.step(actions[tick % len(actions)])
+    return games * ticks / (perf_counter() - start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.batch", description=__doc__)
+    parser.add_argument("--games", type=int, default=4096, help="games stepped together in the throughput benchmark")
+    parser.add_argument("--ticks", type=int, default=1000, help="steps in the throughput benchmark")
+    args = parser.parse_args()
+
+    print(f"throughput: {throughput(args.games, args.ticks):,.0f} game ticks/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
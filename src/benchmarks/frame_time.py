@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains frame time benchmarks for every game state.
+
+Each scenario drives the active state for a number of frames, one simulation
+tick per frame, feeding it scripted events. The wall time of each frame is
+split into event processing, logic, rendering and display flip.
+"""
+import gc
+import os
+import statistics
+import tracemalloc
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+
+from core import Replayer, SpatialHash, game_checksum
+from data import Layer, RenderLayer, SCREEN_RES, SNAIL_SPEED, TICK_DT, get_sprite
+from data.const.keybindings import JUMP_KEY, MOVE_RIGHT_KEY, MOVE_LEFT_KEY, CHANGE_JUMP_KEY
+from entities import Actor, ActorStore
+
+PHASES = ("event", "logic", "render", "flip")
+
+
+def _key(event_type: int, key: int) -> pg.event.Event:
+    return pg.event.Event(event_type, key=key, mod=0, unicode="", scancode=0)
+
+
+def _mouse_motion(pos: tuple[int, int]) -> pg.event.Event:
+    return pg.event.Event(pg.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+
+
+class Scenario:
+    """
+    A benchmark scenario: prepares the game and scripts the events of each frame.
+    """
+    name = ""
+
+    def setup(self, game) -> None:
+        """
+        Brings the game to the state to benchmark.
+        """
+
+    def events(self, game, frame: int) -> list[pg.event.Event]:
+        """
+        Returns the events to process at `frame`.
+        """
+        return []
+
+    def after_frame(self, game, frame: int) -> None:
+        """
+        Called at the end of each frame, e.g. to keep the game in the benchmarked state.
+        """
+
+
+class MenuScenario(Scenario):
+    """Moves the mouse over the menu buttons."""
+    name = "menu"
+
+    def events(self, game, frame):
+        x, y = SCREEN_RES.width * 2 // 3, SCREEN_RES.height * (frame // 30 % 4) // 4
+        return [_mouse_motion((x, y))]
+
+
+class PlayScenario(Scenario):
+    """Walks and jumps around, restarting the game when it's over."""
+    name = "play"
+
+    def setup(self, game):
+        game.new_game()
+
+    def events(self, game, frame):
+        events = []
+        phase = frame % 120
+        if phase == 0:
+            events.append(_key(pg.KEYDOWN, MOVE_RIGHT_KEY))
+        elif phase == 60:
+            events += [_key(pg.KEYUP, MOVE_RIGHT_KEY), _key(pg.KEYDOWN, MOVE_LEFT_KEY)]
+        elif phase == 119:
+            events += [_key(pg.KEYUP, MOVE_LEFT_KEY), _key(pg.KEYUP, CHANGE_JUMP_KEY)]
+
+        if frame % 20 == 0:
+            events.append(_key(pg.KEYDOWN, JUMP_KEY))
+        elif frame % 20 == 10:
+            events.append(_key(pg.KEYUP, JUMP_KEY))
+        return events
+
+    def after_frame(self, game, frame):
+        if not game.has_active_game():
+            game.new_game()
+
+
+class SpawnScenario(PlayScenario):
+    """
+    Plays the game while enemies keep spawning from the right edge,
+    so that enemies are constantly taken from and given back to the pool.
+    """
+    name = "spawn"
+
+    def __init__(self, per_second: int = 60) -> None:
+        self.per_second = per_second
+
+    def after_frame(self, game, frame):
+        super().after_frame(game, frame)
+        state = game.state_manager.active_state()
+        due = (frame + 1) * self.per_second // 60 - frame * self.per_second // 60
+        for i in range(due):
+            state.spawn_enemy(bottomleft=(SCREEN_RES.width + i * 7, state.ground.rect.top - frame * 37 % 200))
+
+
+class ReplayScenario(Scenario):
+    """
+    Replays a recorded session from the main menu, one tick per frame,
+    checking that the game doesn't diverge from the recording.
+    """
+    name = "replay"
+
+    def __init__(self, replayer: Replayer) -> None:
+        self.replayer = replayer
+
+    def events(self, game, frame):
+        return self.replayer.events(frame)
+
+    def after_frame(self, game, frame):
+        self.replayer.check(frame, game_checksum(game))
+
+
+class PauseScenario(Scenario):
+    """Stays in the pause screen while it fades."""
+    name = "pause"
+
+    def setup(self, game):
+        game.new_game()
+        game.step()
+        game.pause_game()
+
+
+class GameOverScenario(Scenario):
+    """Stays in the game over screen while it fades."""
+    name = "game_over"
+
+    def setup(self, game):
+        game.new_game()
+        game.step()
+        game.game_over()
+
+
+class StressScenario(PlayScenario):
+    """
+    Plays the game while updating and drawing many extra actors.
+    The actors share an `ActorStore` and are updated all at once,
+    then tested against the player through a `SpatialHash`
+    and drawn through the render queue.
+    """
+    name = "stress"
+
+    def __init__(self, actors: int = 2000) -> None:
+        self.n_actors = actors
+        self.actors = []  # type: list[Actor]
+
+    def setup(self, game):
+        super().setup(game)
+        sprite = get_sprite("snail", "snail1.png")
+        store = ActorStore(self.n_actors)
+        grid = SpatialHash()
+        self.actors = []
+        for i in range(self.n_actors):
+            actor = Actor(sprite, store=store, layer=Layer.ENEMY)
+            actor.place(bottomleft=(i * 7 % SCREEN_RES.width, i * 13 % 300))
+            self.actors.append(actor)
+
+        state = game.state_manager.active_state()
+        tick, update_screen = state.tick, state._update_screen
+
+        def stress_tick(dt):
+            tick(dt)
+            n = store.size
+            store.store_previous_positions()
+            store.x[:n] -= SNAIL_SPEED * dt
+            store.apply_gravity(dt)
+            store.clamp_to_ground(300)
+            store.x[:n][store.x[:n] + store.w[:n] <= 0] = SCREEN_RES.width
+            grid.sync(store)
+            grid.query_rect(tuple(state.player.rect), Layer.ENEMY)
+
+        def stress_update_screen():
+            update_screen()
+            positions = store.draw_positions(state.interpolation)
+            state.mark_dirty(state.render_queue.submit_many(sprite, positions, RenderLayer.ACTORS))
+
+        state.tick, state._update_screen = stress_tick, stress_update_screen
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Returns the `q` percentile (0-100) of `sorted_values`, nearest-rank method.
+    """
+    idx = max(0, min(len(sorted_values) - 1, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[idx]
+
+
+def summarize(values: list[float]) -> dict[str, float]:
+    """
+    Returns mean, median, 99th percentile and max of `values`.
+    """
+    ordered = sorted(values)
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": _percentile(ordered, 50),
+        "p99": _percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+def _run_frame(game, events: Iterable[pg.event.Event], timings: Optional[dict[str, list[float]]]) -> None:
+    """
+    Runs one frame of the game loop, timing each phase in milliseconds.
+    """
+    manager = game.state_manager
+
+    t0 = perf_counter()
+    manager.active_state().process_events(TICK_DT, events)
+    t1 = perf_counter()
+    manager.active_state().tick(TICK_DT)
+    t2 = perf_counter()
+    state = manager.active_state()
+    state.draw()
+    t3 = perf_counter()
+    state.present()
+    t4 = perf_counter()
+
+    if timings is not None:
+        timings["event"].append((t1 - t0) * 1000)
+        timings["logic"].append((t2 - t1) * 1000)
+        timings["render"].append((t3 - t2) * 1000)
+        timings["flip"].append((t4 - t3) * 1000)
+
+
+def run_scenario(game_factory: Callable, scenario: Scenario, frames: int, warmup: int = 30) -> dict:
+    """
+    Runs `scenario` on a new game for `frames` frames and returns its results.
+
+    Frame times are measured in a first pass. Allocations are measured in
+    a second pass with `tracemalloc`, which would distort the timings.
+
+    :param game_factory: Called with no arguments to build the `Game`.
+    :param scenario: Scenario to run.
+    :param frames: Number of measured frames.
+    :param warmup: Number of frames run before measuring.
+    :return: Frame time statistics per phase, in milliseconds, and allocation statistics.
+    """
+    timings = {phase: [] for phase in PHASES}
+
+    game = game_factory()
+    scenario.setup(game)
+    for frame in range(warmup + frames):
+        measured = frame >= warmup
+        _run_frame(game, scenario.events(game, frame), timings if measured else None)
+        scenario.after_frame(game, frame)
+
+    total = [sum(t) for t in zip(*timings.values())]
+
+    game = game_factory()
+    scenario.setup(game)
+    peaks = []
+    gc_before = sum(gen["collections"] for gen in gc.get_stats())
+    tracemalloc.start()
+    start_memory, _ = tracemalloc.get_traced_memory()
+    for frame in range(frames):
+        tracemalloc.reset_peak()
+        current, _ = tracemalloc.get_traced_memory()
+        _run_frame(game, scenario.events(game, frame), None)
+        scenario.after_frame(game, frame)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    end_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    gc_after = sum(gen["collections"] for gen in gc.get_stats())
+
+    return {
+        "frames": frames,
+        "phases": {phase: summarize(values) for phase, values in timings.items()},
+        "total": summarize(total),
+        "alloc": {
+            "peak_bytes_per_frame": summarize(peaks),
+            "retained_bytes": end_memory - start_memory,
+            "gc_collections": gc_after - gc_before,
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compares `results` against `baseline`, for scenarios found in both.
+
+    :param results: Benchmark results.
+    :param baseline: Stored benchmark results.
+    :param tolerance: Allowed relative slowdown (0.1 means 10%).
+    :return: A description of each regression found.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if base is None:
+            continue
+
+        for stat in ("mean", "p99"):
+            value, base_value = result["total"][stat], base["total"][stat]
+            if value > base_value * (1 + tolerance):
+                regressions.append(f"{name}: total {stat} {value:.3f} ms > baseline {base_value:.3f} ms "
+                                   f"(+{(value / base_value - 1) * 100:.1f}%)")
+    return regressions
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains the input latency benchmark of frame pacing modes.
+
+Run with `python -m benchmarks.latency`: while the game loop runs a game, a thread presses
+and releases the jump key at random times, and the latency from each press to the frame
+showing it is measured, with `pg.time.Clock.tick()` pacing and in low latency mode.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+from time import perf_counter, sleep
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+
+from core import Game
+from data import JUMP_KEY
+
+
+def press_keys(stop: threading.Event, seed: int = 0) -> None:
+    """
+    Posts presses and releases of the jump key at random times until `stop` is set.
+    Presses carry the time they are posted at, which `LatencyMonitor` measures from.
+    """
+    rng = random.Random(seed)
+    while not stop.is_set():
+        sleep(rng.uniform(.02, .1))
+        pg.event.post(pg.event.Event(pg.KEYDOWN, key=JUMP_KEY, timestamp=perf_counter()))
+        sleep(rng.uniform(.02, .05))
+        pg.event.post(pg.event.Event(pg.KEYUP, key=JUMP_KEY))
+
+
+def run(low_latency: bool, frames: int) -> dict:
+    """
+    Runs the game loop for `frames` frames, pressing keys from another thread.
+
+    :param low_latency: If True, run in low latency mode.
+    :param frames: Number of frames.
+    :return: Latency statistics of the jump key and frame time of the loop.
+    """
+    game = Game(low_latency=low_latency, measure_latency=True)
+    game.new_game()
+    stop = threading.Event()
+    presser = threading.Thread(target=press_keys, args=(stop,))
+    presser.start()
+    start = perf_counter()
+    try:
+        game.run(frames)
+    finally:
+        stop.set()
+        presser.join()
+    return {**game.latency.stats()[pg.key.name(JUMP_KEY)], "frame": (perf_counter() - start) * 1000 / frames}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.latency", description=__doc__)
+    parser.add_argument("--frames", type=int, default=600, help="frames run in each pacing mode")
+    args = parser.parse_args()
+
+    for name, low_latency in (("clock.tick", False), ("low latency", True)):
+        result = run(low_latency, args.frames)
+        print(f"{name:12s} {result['count']:4d} presses: mean {result['mean']:5.1f} ms, p50 {result['p50']:5.1f} ms, "
+              f"p99 {result['p99']:5.1f} ms, max {result['max']:5.1f} ms, frame {result['frame']:5.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains the throughput benchmark of `ParallelGames`.
+
+Run with `python -m benchmarks.parallel`: headless games are stepped with random
+actions by an increasing number of worker processes, reporting the throughput
+of the whole pool and of each worker.
+"""
+import argparse
+import os
+import sys
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from core import ParallelGames
+
+from .batch import random_actions
+
+
+def run(workers: int, games_per_worker: int, ticks: int, rendering: bool, seed: int = 0) -> dict:
+    """
+    Steps the games of a pool of `workers` processes `ticks` times.
+
+    :param workers: Number of worker processes.
+    :param games_per_worker: Number of games run by each worker.
+    :param ticks: Number of steps.
+    :param rendering: If True, games are drawn and frames shared with the parent process.
+    :param seed: Seed of the random actions.
+    :return: Throughput of the pool and statistics of each worker.
+    """
+    rng = np.random.default_rng(seed)
+    with ParallelGames(workers, games_per_worker, rendering) as pool:
+        actions = [random_actions(rng, pool.n) for _ in range(min(ticks, 64))]
+        start = perf_counter()
+        for tick in range(ticks):
+            pool.step(actions[tick % len(actions)])
+        elapsed = perf_counter() - start
+        return {
+            "workers": workers,
+            "ticks_per_second": pool.n * ticks / elapsed,
+            "per_worker": pool.stats(),
+        }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.parallel", description=__doc__)
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="largest number of workers")
+    parser.add_argument("--games", type=int, default=4, help="games run by each worker")
+    parser.add_argument("--ticks", type=int, default=1000, help="steps for each number of workers")
+    parser.add_argument("--no-rendering", action="store_true", help="don't draw games nor share frames")
+    args = parser.parse_args()
+
+    counts = sorted({1, *(2 ** i for i in range(args.workers.bit_length()) if 2 ** i <= args.workers), args.workers})
+    base = None
+    for workers in counts:
+        result = run(workers, args.games, args.ticks, not args.no_rendering)
+        base = base or result["ticks_per_second"]
+        print(f"{workers:3d} workers: {result['ticks_per_second']:10,.0f} ticks/s "
+              f"(x{result['ticks_per_second'] / base:.2f})")
+        for worker in result["per_worker"]:
+            print(f"      pid {worker['pid']}: {worker['ticks_per_second']:10,.0f} ticks/s while busy")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
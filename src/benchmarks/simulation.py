@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains the overlap benchmark of the simulation thread.
+
+Run with `python -m benchmarks.simulation`: the game loop runs as fast as it can, with extra
+enemies to simulate and draw, first on the main thread alone and then with `PlayState` ticked
+by a `SimulationThread`. The CPU time of both threads over the wall time tells how much
+drawing and simulating overlapped: above 1, they ran at the same time.
+"""
+import argparse
+import os
+import sys
+import time
+from contextlib import nullcontext
+from time import perf_counter
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+
+from core import Game
+from data import SCREEN_RES, Layer
+
+
+def run(threaded: bool, enemies: int, seconds: float) -> dict:
+    """
+    Runs the game loop without frame rate limit for `seconds` seconds.
+
+    :param threaded: If True, simulate on a thread of its own.
+    :param enemies: Number of extra enemies.
+    :param seconds: Wall time to run for.
+    :return: Frames and ticks per second, CPU time of each thread and their overlap.
+    """
+    game = Game(threaded=threaded)
+    game.new_game()
+    state = game.state_manager.active_state()
+    simulation = game.simulation
+    with simulation.lock if simulation is not None else nullcontext():
+        # The player is kept out of collisions, so that the game never ends
+        state.actors.layer[state.player.row] = Layer.NONE
+        for i in range(enemies):
+            state.spawn_enemy(bottomleft=(i * SCREEN_RES.width // enemies, state.ground.rect.y))
+
+    clock = pg.time.Clock()
+    clock.tick()
+    frames, ticks = 0, game.ticks
+    sim_cpu = simulation.cpu_time if simulation is not None else 0.
+    cpu_start, start = time.thread_time(), perf_counter()
+    while perf_counter() - start < seconds:
+        game.advance(clock.tick())
+        frames += 1
+    wall, main_cpu = perf_counter() - start, time.thread_time() - cpu_start
+    ticks = game.ticks - ticks
+    sim_cpu = simulation.cpu_time - sim_cpu if simulation is not None else 0.
+    game.stop_simulation()
+    return {
+        "fps": frames / wall,
+        "ticks_per_second": ticks / wall,
+        "main_cpu": main_cpu / wall,
+        "simulation_cpu": sim_cpu / wall,
+        "overlap": (main_cpu + sim_cpu) / wall,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.simulation", description=__doc__)
+    parser.add_argument("--enemies", type=int, default=300, help="extra enemies simulated and drawn")
+    parser.add_argument("--seconds", type=float, default=5., help="wall time of each run")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs")
+    for name, threaded in (("single thread", False), ("threaded", True)):
+        result = run(threaded, args.enemies, args.seconds)
+        print(f"{name:14s} {result['fps']:7.1f} frames/s, {result['ticks_per_second']:5.1f} ticks/s, "
+              f"CPU main {result['main_cpu']:.2f} + simulation {result['simulation_cpu']:.2f} "
+              f"= overlap {result['overlap']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,39 @@
 # -*- coding: utf-8 -*-
 """
 Contains core objects for the game.
+
+Modules are imported when one of their names is first used, so that starting
+the game doesn't import the batch, parallel, capture or simulation thread machinery.
 """
-from .states import *
-from .game import *
+from typing import TYPE_CHECKING
+
+from utils import lazy_exports
+
+__getattr__, __all__ = lazy_exports(__name__, {
+    ".profiler": ("FrameProfiler",),
+    ".collision": ("SpatialHash",),
+    ".render": ("RenderQueue",),
+    ".replay": ("RECORDED_EVENTS", "ReplayError", "ReplayDivergence", "game_checksum",
+                "Recorder", "Replayer", "play_back"),
+    ".batch": ("BatchPlay",),
+    ".parallel": ("ActionKeys", "ParallelGames"),
+    ".capture": ("CAPTURE_FORMATS", "FrameCapture"),
+    ".latency": ("PRESS_EVENTS", "LatencyMonitor", "DeadlinePacer"),
+    ".simulation": ("Snapshot", "SnapshotBuffer", "SimulationThread"),
+    ".states": ("WrongState", "GameProtocol", "GameState", "on_event", "coalesce_motion", "OverlayState",
+                "PlayState", "GameOverState", "MenuState", "PauseState", "StateManager"),
+    ".game": ("Game",),
+})
+
+if TYPE_CHECKING:
+    from .profiler import *
+    from .collision import *
+    from .render import *
+    from .replay import *
+    from .batch import *
+    from .parallel import *
+    from .capture import *
+    from .latency import *
+    from .simulation import *
+    from .states import *
+    from .game import *
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `BatchPlay`, which runs many games with the rules of `PlayState` at once.
+"""
+from typing import Optional
+
+import numpy as np
+import pygame as pg
+
+from data import (Action, GRAVITY, PLAYER_SPEED, REFERENCE_DT, SCREEN_RES, SNAIL_SPEED, TICK_DT,
+                  sprite_size)
+from entities.components import BaseJump, DoubleJump, JetpackJump, RocketJump
+
+
+class BatchPlay:
+    """
+    Runs `n` independent games with the rules of `PlayState`, each game being
+    one element of NumPy arrays, so that they are all stepped together.
+
+    The rules are those of `PlayState` and `JumpProcessor`, applied in the same
+    order and with the same floating point operations, so that a game here
+    goes exactly like a headless `Game` given the same actions.
+    Finished games are reset at the end of the step they end in.
+    """
+    jumps = (BaseJump, DoubleJump, JetpackJump, RocketJump)
+    observation_fields = ("player_x", "player_y", "player_vy", "jump_count", "jump_index", "snail_x", "snail_y")
+
+    def __init__(self, n: int, dt: float = TICK_DT) -> None:
+        """
+        :param n: Number of games.
+        :param dt: Milliseconds simulated by each step.
+        """
+        self.n = n    # type: int
+        self.dt = dt  # type: float
+
+        self.player_w, self.player_h = sprite_size("player", "player_stand.png")
+        self.snail_w, self.snail_h = sprite_size("snail", "snail1.png")
+        self.ground_top = sprite_size("background", "sky.png")[1]
+
+        # Starting positions, placed like `PlayState.reset()` does
+        player = pg.Rect(0, 0, self.player_w, self.player_h)
+        player.midbottom = (50, self.ground_top)
+        snail = pg.Rect(0, 0, self.snail_w, self.snail_h)
+        snail.midbottom = (SCREEN_RES.width, self.ground_top)
+        self._player_start = player.topleft  # type: tuple[int, int]
+        self._snail_start = snail.topleft    # type: tuple[int, int]
+
+        self._max_jumps = np.array([j.max_jumps for j in self.jumps], dtype=np.int32)
+        self._jump_height = np.array([j.jump_height for j in self.jumps], dtype=np.float64)
+        self._jump_tempo = np.array([j.multi_jump_tempo for j in self.jumps], dtype=np.float64)
+
+        self.player_x = np.zeros(n, dtype=np.float64)
+        self.player_y = np.zeros(n, dtype=np.float64)
+        self.player_vy = np.zeros(n, dtype=np.float64)
+        self.jump_count = np.zeros(n, dtype=np.int32)
+        self.jump_index = np.zeros(n, dtype=np.int32)
+        self.snail_x = np.zeros(n, dtype=np.float64)
+        self.snail_y = np.zeros(n, dtype=np.float64)
+        self.snail_vy = np.zeros(n, dtype=np.float64)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.final_scores = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+
+        self.reset()
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Starts new games.
+
+        :param mask: Games to reset, every game by default.
+        :return: Observations, see `observe()`.
+        """
+        if mask is None:
+            mask = slice(None)
+
+        self.player_x[mask], self.player_y[mask] = self._player_start
+        self.player_vy[mask] = 0.
+        self.jump_count[mask] = 0
+        self.jump_index[mask] = 0
+        self.snail_x[mask], self.snail_y[mask] = self._snail_start
+        self.snail_vy[mask] = 0.
+        self.scores[mask] = 0
+        self.ticks[mask] = 0
+        return self.observe()
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Advances every game by one simulation tick.
+
+        :param actions: `Action` flags of each game.
+        :return: Observations after the step, score gained in the step and whether
+                 each game ended in the step. Ended games are already reset:
+                 their score is in `self.final_scores`.
+        """
+        actions = np.asarray(actions)
+        dt = self.dt
+        width = SCREEN_RES.width
+
+        # Jump type is changed when its key is released, before the tick
+        change = (actions & Action.CHANGE_JUMP) != 0
+        self.jump_index[change] = (self.jump_index[change] + 1) % len(self.jumps)
+
+        # PlayState._handle_movement()
+        direction = ((actions & Action.RIGHT) != 0).astype(np.float64) - ((actions & Action.LEFT) != 0)
+        x_movement = direction * dt * PLAYER_SPEED
+
+        jumping = (actions & Action.JUMP) != 0
+        self._jump(jumping)
+
+        self.player_x += x_movement
+        left = np.floor(self.player_x) < 0
+        right = ~left & (np.floor(self.player_x) + self.player_w > width)
+        self.player_x[left] = 0.
+        self.player_x[right] = width - self.player_w
+
+        # ActorStore.apply_gravity()
+        self.player_vy += GRAVITY * dt
+        self.player_y += self.player_vy * (dt / REFERENCE_DT)
+        self.snail_vy += GRAVITY * dt
+        self.snail_y += self.snail_vy * (dt / REFERENCE_DT)
+
+        # PlayState._check_collisions(), the tick goes on after the game is over
+        dones = self._colliding()
+
+        landed = np.floor(self.player_y) + self.player_h > self.ground_top
+        self.player_y[landed] = self.ground_top - self.player_h
+        self.player_vy[landed] = 0.
+        self.jump_count[landed] = 0
+
+        landed = np.floor(self.snail_y) + self.snail_h > self.ground_top
+        self.snail_y[landed] = self.ground_top - self.snail_h
+        self.snail_vy[landed] = 0.
+
+        # PlayState._move_enemies()
+        gone = np.floor(self.snail_x) + self.snail_w <= 0
+        rewards = np.where(gone, 100, 0)
+        self.snail_x[~gone] += -SNAIL_SPEED * dt
+        self.snail_x[gone] = width
+        self.snail_y[gone] = self.ground_top - self.snail_h
+        self.snail_vy[gone] = 0.
+
+        self.scores += rewards
+        self.ticks += 1
+        if dones.any():
+            self.final_scores[dones] = self.scores[dones]
+            self.reset(dones)
+        return self.observe(), rewards, dones
+
+    def observe(self) -> np.ndarray:
+        """
+        Returns the state of each game, one row per game, with the columns in `self.observation_fields`.
+        """
+        return np.column_stack((self.player_x, self.player_y, self.player_vy, self.jump_count, self.jump_index,
+                                self.snail_x, self.snail_y))
+
+    def _jump(self, jumping: np.ndarray) -> None:
+        """
+        Makes players jump where they can, like `JumpProcessor.jump()`.
+
+        :param jumping: Whether the jump key is held in each game.
+        """
+        idx = self.jump_index
+        limit = np.where(self.jump_count == 0, 0., self._jump_tempo[idx])
+        can = jumping & (self.jump_count < self._max_jumps[idx]) & (self.player_vy >= limit)
+        self.player_vy[can] = -self._jump_height[idx[can]]
+        self.jump_count[can] += 1
+
+    def _colliding(self) -> np.ndarray:
+        """
+        Returns whether the player and the snail collide in each game, like `Rect.colliderect()`.
+        """
+        px, py = np.floor(self.player_x), np.floor(self.player_y)
+        sx, sy = np.floor(self.snail_x), np.floor(self.snail_y)
+        return ((px < sx + self.snail_w) & (sx < px + self.player_w)
+                & (py < sy + self.snail_h) & (sy < py + self.player_h))
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `FrameCapture`, which records the frames shown by the game to a video file
+or to a sequence of images.
+"""
+import os
+import queue
+import threading
+from typing import BinaryIO, Optional
+
+import numpy as np
+import pygame as pg
+
+from data import MAX_FPS
+from utils import channel_offsets, rgb_view
+
+CAPTURE_FORMATS = ("y4m", "raw", "png")
+
+
+class FrameCapture:
+    """
+    Copies frames into a ring of preallocated buffers, while a writer thread
+    encodes them. The game loop never waits for the writer: when every buffer
+    is still waiting to be written, the frame is dropped and counted.
+
+    Formats:
+    - "y4m": YUV4MPEG2 video, 4:4:4, at `fps` frames per second;
+    - "raw": RGB24 frames, one after the other;
+    - "png": one PNG file per frame, `path` being a pattern like "frames/%05d.png".
+    """
+
+    def __init__(self, path: str, surface: pg.Surface, fmt: Optional[str] = None, slots: int = 8,
+                 fps: int = MAX_FPS) -> None:
+        """
+        :param path: Output file, or file name pattern for "png".
+        :param surface: The surface captured, which must keep its size and format.
+        :param fmt: One of `CAPTURE_FORMATS`, guessed from `path` extension by default.
+        :param slots: Number of frame buffers.
+        :param fps: Frames per second the frames are captured at, written in the header of "y4m" videos.
+        """
+        if fmt is None:
+            fmt = os.path.splitext(path)[1].lstrip(".").lower()
+        if fmt not in CAPTURE_FORMATS:
+            raise ValueError(f"unknown capture format {fmt!r}, choose from {CAPTURE_FORMATS}")
+
+        self.path = path                                 # type: str
+        self.fmt = fmt                                   # type: str
+        self.fps = fps                                   # type: int
+        self.size = surface.get_size()                   # type: tuple[int, int]
+        self._pitch = surface.get_pitch()                # type: int
+        self._offsets = channel_offsets(surface)         # type: tuple[int, int, int]
+
+        width, height = self.size
+        # Filled rather than empty, so that pages are mapped now and not on the first captures
+        self._slots = [np.full((height, self._pitch), 0, dtype=np.uint8) for _ in range(slots)]
+        self._free = queue.SimpleQueue()                 # type: queue.SimpleQueue
+        self._filled = queue.SimpleQueue()               # type: queue.SimpleQueue
+        for slot in range(slots):
+            self._free.put(slot)
+
+        self.captured = 0                                # type: int
+        self.dropped = 0                                 # type: int
+        self.written = 0                                 # type: int
+
+        self._file = None                                # type: Optional[BinaryIO]
+        if fmt != "png":
+            self._file = open(path, "wb")
+            if fmt == "y4m":
+                self._file.write(f"YUV4MPEG2 W{width} H{height} F{fps}:1 Ip A1:1 C444\n".encode())
+
+        self._thread = threading.Thread(target=self._write_frames, name="frame-capture", daemon=True)
+        self._thread.start()
+
+    def capture(self, surface: pg.Surface) -> bool:
+        """
+        Copies the pixels of `surface` into a free buffer, to be written by the writer thread.
+
+        :param surface: The captured surface.
+        :return: False if the frame was dropped, because no buffer was free.
+        """
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+
+        # The buffer proxy is a view of the surface pixels: this is the only copy
+        np.copyto(self._slots[slot].reshape(-1), np.frombuffer(surface.get_buffer(), dtype=np.uint8))
+        self._filled.put(slot)
+        self.captured += 1
+        return True
+
+    def close(self) -> None:
+        """
+        Waits for the frames captured so far to be written, then closes the output.
+        """
+        self._filled.put(None)
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the number of frames captured, dropped and written.
+        """
+        return {"captured": self.captured, "dropped": self.dropped, "written": self.written}
+
+    def _write_frames(self) -> None:
+        """
+        Writer thread: encodes filled buffers and gives them back, until `close()`.
+        """
+        width, height = self.size
+        while True:
+            slot = self._filled.get()
+            if slot is None:
+                return
+
+            raw = self._slots[slot].reshape(height, self._pitch // 4, 4)[:, :width]
+            rgb = np.ascontiguousarray(rgb_view(raw, self._offsets))
+            self._free.put(slot)
+
+            if self.fmt == "raw":
+                self._file.write(rgb.data)
+            elif self.fmt == "y4m":
+                self._file.write(b"FRAME\n")
+                self._file.write(_rgb_to_yuv444(rgb).data)
+            else:
+                pg.image.save(pg.image.frombuffer(rgb.tobytes(), self.size, "RGB"), self.path % self.written)
+            self.written += 1
+
+
+def _rgb_to_yuv444(rgb: np.ndarray) -> np.ndarray:
+    """
+    Converts RGB pixels to planar Y, Cb, Cr (BT.601, studio range).
+
+    :param rgb: Pixels, shaped (height, width, 3).
+    :return: Planes, shaped (3, height, width).
+    """
+    r, g, b = (rgb[:, :, i].astype(np.float32) for i in range(3))
+    y = 16 + 0.257 * r + 0.504 * g + 0.098 * b
+    cb = 128 - 0.148 * r - 0.291 * g + 0.439 * b
+    cr = 128 + 0.439 * r - 0.368 * g - 0.071 * b
+    return np.rint(np.stack((y, cb, cr))).astype(np.uint8)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `SpatialHash`, the broadphase used for collisions and mouse picking.
+"""
+from typing import Iterator, Optional
+
+import numpy as np
+
+from data import COLLISION_CELL_SIZE
+from entities import ActorStore
+
+_NO_CELLS = np.iinfo(np.int32).min
+
+
+class SpatialHash:
+    """
+    A uniform grid that maps each cell to the actors of an `ActorStore`
+    whose rects overlap it, so that only actors sharing a cell are tested.
+
+    The grid is kept in sync with the store by `sync()`, which only
+    moves actors whose range of cells changed. Only occupied cells are kept. Queries take a mask of
+    collision layers: only actors whose layer is in the mask are considered.
+    """
+
+    def __init__(self, cell_size: int = COLLISION_CELL_SIZE) -> None:
+        self.cell_size = cell_size                          # type: int
+        self._cells = {}                                    # type: dict[tuple[int, int], set[int]]
+
+        self._ranges = np.empty((0, 4), dtype=np.int32)    # type: np.ndarray
+        self._rects = np.empty((0, 4), dtype=np.int32)     # type: np.ndarray
+        self._rect_list = None                              # type: Optional[list[list[int]]]
+        self._layers = np.empty(0, dtype=np.int32)         # type: np.ndarray
+        self._alive = np.empty(0, dtype=bool)              # type: np.ndarray
+
+        self.pairs_tested = 0                               # type: int
+        self.hits = 0                                       # type: int
+
+    def sync(self, store: ActorStore) -> None:
+        """
+        Updates the grid with current positions and layers of the actors in `store`.
+        To be called before queries, whenever actors moved.
+
+        :param store: The store of the actors.
+        """
+        n = store.size
+        rects = store.rects()
+        alive = store.alive[:n]
+
+        # Cells covered by each rect: first column, first row, last column, last row
+        ranges = np.empty((n, 4), dtype=np.int32)
+        np.floor_divide(rects[:, :2], self.cell_size, out=ranges[:, :2])
+        np.floor_divide(rects[:, :2] + rects[:, 2:] - 1, self.cell_size, out=ranges[:, 2:])
+        if not alive.all():
+            ranges[~alive] = _NO_CELLS
+
+        old_ranges = self._ranges
+        if len(old_ranges) < n:
+            old_ranges = np.concatenate((old_ranges, np.full((n - len(old_ranges), 4), _NO_CELLS, dtype=np.int32)))
+
+        changed = np.flatnonzero((ranges != old_ranges[:n]).any(axis=1))
+        if changed.size:
+            cells = self._cells
+            for row, old, new in zip(changed.tolist(), old_ranges[changed].tolist(), ranges[changed].tolist()):
+                if old[0] != _NO_CELLS:
+                    for cell in self._cells_in(old):
+                        rows = cells[cell]
+                        rows.discard(row)
+                        if not rows:
+                            del cells[cell]
+                if new[0] != _NO_CELLS:
+                    for cell in self._cells_in(new):
+                        cells.setdefault(cell, set()).add(row)
+
+        self._ranges = ranges
+        self._rects = rects
+        self._rect_list = None
+        self._layers = store.layer[:n].copy()
+        self._alive = alive.copy()
+
+    def pairs(self, mask_a: int, mask_b: int) -> list[tuple[int, int]]:
+        """
+        Returns the pairs of colliding actors, one in `mask_a` and the other in `mask_b`.
+        Candidates are taken from the cells of the actors in `mask_a`,
+        so `mask_a` should be the one with fewer actors.
+
+        :param mask_a: Layers of the first actor of each pair.
+        :param mask_b: Layers of the second actor of each pair.
+        :return: Rows of the colliding actors.
+        """
+        rows = self._rows_in(mask_a)
+        if not rows:
+            return []
+
+        rects = self._rect_lists()
+        layers = self._layers.tolist()
+        seen = set()
+        colliding = []
+
+        for a, cell_range in zip(rows, self._ranges[rows].tolist()):
+            for cell in self._cells_in(cell_range):
+                for b in self._cells.get(cell, ()):
+                    if b == a or not layers[b] & mask_b:
+                        continue
+
+                    key = (a, b) if a < b else (b, a)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    self.pairs_tested += 1
+                    if self._overlap(rects[a], rects[b]):
+                        self.hits += 1
+                        colliding.append((a, b))
+        return colliding
+
+    def query_point(self, pos: tuple[int, int], mask: int) -> list[int]:
+        """
+        Returns the actors in `mask` whose rect contains `pos`.
+
+        :param pos: The point.
+        :param mask: Layers to consider.
+        :return: Rows of the actors.
+        """
+        x, y = pos
+        rects = self._rect_lists()
+        found = []
+        for row in self._cells.get((x // self.cell_size, y // self.cell_size), ()):
+            if not self._layers[row] & mask:
+                continue
+
+            self.pairs_tested += 1
+            left, top, w, h = rects[row]
+            if left <= x < left + w and top <= y < top + h:
+                self.hits += 1
+                found.append(row)
+        return found
+
+    def query_rect(self, rect: tuple[int, int, int, int], mask: int) -> list[int]:
+        """
+        Returns the actors in `mask` whose rect overlaps `rect`.
+
+        :param rect: The rect (left, top, width, height).
+        :param mask: Layers to consider.
+        :return: Rows of the actors.
+        """
+        left, top, w, h = rect
+        cells = self._cells_in([left // self.cell_size, top // self.cell_size,
+                                (left + w - 1) // self.cell_size, (top + h - 1) // self.cell_size])
+        candidates = set()
+        for cell in cells:
+            candidates.update(self._cells.get(cell, ()))
+
+        rects = self._rect_lists()
+        found = []
+        for row in candidates:
+            if not self._layers[row] & mask:
+                continue
+
+            self.pairs_tested += 1
+            if self._overlap(rect, rects[row]):
+                self.hits += 1
+                found.append(row)
+        return found
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the number of occupied cells, of exact tests run and of the ones that hit.
+        """
+        return {
+            "cells": len(self._cells),
+            "pairs_tested": self.pairs_tested,
+            "hits": self.hits,
+        }
+
+    def reset_stats(self) -> None:
+        """
+        Resets test counters.
+        """
+        self.pairs_tested = 0
+        self.hits = 0
+
+    def _rows_in(self, mask: int) -> list[int]:
+        """
+        Returns rows of alive actors whose layer is in `mask`.
+        """
+        return np.flatnonzero(self._alive & (self._layers & mask != 0)).tolist()
+
+    def _rect_lists(self) -> list[list[int]]:
+        """
+        Returns the rects of the last sync as lists, faster to index than the array.
+        """
+        if self._rect_list is None:
+            self._rect_list = self._rects.tolist()
+        return self._rect_list
+
+    @staticmethod
+    def _cells_in(cell_range: list[int]) -> Iterator[tuple[int, int]]:
+        """
+        Yields the cells in a range (first column, first row, last column, last row).
+        """
+        x0, y0, x1, y1 = cell_range
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+
+    @staticmethod
+    def _overlap(a, b) -> bool:
+        """
+        `True` if rects `a` and `b` (left, top, width, height) overlap, like `Rect.colliderect()`.
+        """
+        return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
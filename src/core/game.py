@@ -3,23 +3,70 @@
 """
 Contains `Game` class.
 """
+import os
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Iterable, Optional
+
 import pygame as pg
 
+from data import State, preload
 from data.const.settings import *
 from data.const.keybindings import *
+from utils import StartupTrace
+
+from .latency import DeadlinePacer, LatencyMonitor
+from .profiler import FrameProfiler
+from .replay import Recorder, game_checksum
+from .states import StateManager, coalesce_motion
 
-from .states import StateManager
+if TYPE_CHECKING:
+    from .capture import FrameCapture
+    from .simulation import SimulationThread
 
 
 class Game:
     """
     Main game class, starts and runs the game.
+
+    The game loop is started by `run()`. Otherwise the game can be advanced
+    calling `advance()` or `step()`, with injected events.
+    In headless mode no window is opened and nothing is shown on display.
+
+    If a replay log is given, the events processed and a checksum of the state
+    after each simulation tick are recorded to it, see `core.replay`.
+    Frames shown can be captured to a video with `start_capture()`.
+
+    Frames are paced by `pg.time.Clock.tick()`, or in low latency mode by a `DeadlinePacer`,
+    which polls input as late as possible before each frame must be shown. The latency from
+    presses to the frames showing them can be measured with a `LatencyMonitor`.
+
+    In threaded mode, `PlayState` is ticked by a `SimulationThread` and drawn from the
+    newest snapshot it published, so that drawing a frame overlaps simulating the next tick.
+
+    Only the pygame modules the game uses are initialized: display here,
+    font by the first `get_font()`. Sprites and fonts are preloaded by `run()`
+    once the first frame is shown; otherwise they are loaded on first use.
     """
 
-    def __init__(self) -> None:
-        # Initialize all imported pygame modules.
-        pg.init()
+    def __init__(self, headless: bool = False, rendering: bool = True, record: Optional[str] = None,
+                 startup_trace: Optional[StartupTrace] = None, low_latency: bool = False,
+                 measure_latency: bool = False, threaded: bool = False) -> None:
+        """
+        :param headless: If True, use SDL dummy video driver and draw off-screen.
+        :param rendering: If False, states are never drawn (only meaningful in headless mode).
+        :param record: Path of a replay log to record the game to.
+        :param startup_trace: Trace to record startup steps to, reported by `run()` after the first frame.
+        :param low_latency: If True, `run()` paces frames with a `DeadlinePacer`.
+        :param measure_latency: If True, measure input latency in `latency`.
+        :param threaded: If True, simulate `PlayState` on a thread of its own, stopped by `stop_simulation()`.
+        """
+        self.headless = headless                    # type: bool
+        self.rendering = rendering or not headless  # type: bool
 
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+        self._startup_trace = startup_trace      # type: Optional[StartupTrace]
         self.keys_pressed = {
             JUMP_KEY: False,
             MOVE_RIGHT_KEY: False,
@@ -27,29 +74,249 @@ class Game:
         }                                        # type: dict[int, bool]
 
         self._init_window()
+        self._trace("window")
         self.score = 0                           # type: int
         self._playing = False                    # type: bool
+        self._accumulator = 0.                   # type: float
+        self.ticks = 0                           # type: int
+        self._recorder = Recorder(open(record, "wb")) if record else None  # type: Optional[Recorder]
+        self._capture = None                     # type: Optional[FrameCapture]
+        self.profiler = FrameProfiler()          # type: FrameProfiler
+        self.low_latency = low_latency           # type: bool
+        self.latency = LatencyMonitor() if measure_latency else None  # type: Optional[LatencyMonitor]
 
         self.state_manager = StateManager(self)  # type: StateManager
-        self._run_game_loop()
+        self._trace("states")
+
+        self._simulation = None                  # type: Optional[SimulationThread]
+        if threaded:
+            from .simulation import SimulationThread
+            self._simulation = SimulationThread(self)
 
     def _init_window(self) -> None:
         """
         Initialize window setting screen resolution and window title.
+
+        In headless mode the game draws on its own off-screen surface,
+        so that more headless games can live in the same process.
         """
-        self.screen = pg.display.set_mode(SCREEN_RES)
-        pg.display.set_caption(GAME_TITLE)
+        pg.display.init()
+        if not self.headless:
+            self.screen = pg.display.set_mode(SCREEN_RES)
+            pg.display.set_caption(GAME_TITLE)
+            return
+
+        if pg.display.get_surface() is None:
+            # A display mode is needed to convert sprites
+            pg.display.set_mode(SCREEN_RES)
+        self.screen = pg.Surface(SCREEN_RES)
 
-    def _run_game_loop(self) -> None:
+    def run(self, frames: Optional[int] = None) -> None:
         """
         Runs the game loop.
+
+        :param frames: Number of frames to run, after the first one. If None, run until the game is quit.
         """
         clock = pg.time.Clock()
+        pacer = DeadlinePacer(MAX_FPS) if self.low_latency else None
+
+        try:
+            self.advance(clock.tick())
+            self._trace("first frame")
+            if self._startup_trace is not None:
+                self._startup_trace.report()
+
+            # The first frame is shown, the assets the game will need can be loaded now
+            preload(font_sizes=(40, 50, 60, 70, 120))
+            clock.tick()
+
+            frame = 0
+            while frames is None or frame < frames:
+                self.profiler.begin_frame()
+
+                # Limit FPS and calculate frame time
+                frame_time = clock.tick(MAX_FPS) if pacer is None else pacer.wait()
+                self.profiler.mark("sleep")
+
+                self.advance(frame_time)
+                if pacer is not None:
+                    pacer.frame_done()
+                self.profiler.end_frame()
+                frame += 1
+        finally:
+            self.stop_simulation()
+            self.stop_recording()
+            self.stop_capture()
+
+    def advance(self, frame_time: float, events: Optional[Iterable[pg.event.Event]] = None) -> None:
+        """
+        Advances the game by `frame_time` milliseconds, running as many fixed
+        simulation ticks as fit in the time accumulated so far, then draws a frame
+        interpolated between the last two ticks.
+
+        In threaded mode, `PlayState` is ticked by the simulation thread instead,
+        and drawn from the newest snapshot published.
+
+        :param frame_time: Milliseconds elapsed since last frame.
+        :param events: Events to process. If None, events are taken from the SDL event queue.
+        """
+        if events is None:
+            events = coalesce_motion(pg.event.get())
+            if self.latency is not None:
+                self.latency.polled(events)
+
+        simulation = self._simulation
+        with simulation.lock if simulation is not None else nullcontext():
+            if simulation is not None:
+                simulation.run_requests()
+            self._simulate(frame_time, events)
+            threaded = simulation is not None and self.state_manager.active() is State.PLAYING
+            processed_tick = self.ticks
+        self.profiler.mark("logic")
+
+        if not self.rendering:
+            return
+
+        state = self.state_manager.active_state()
+        snapshot = simulation.snapshots.latest() if threaded else None
+        if snapshot is not None:
+            if self.latency is not None and snapshot.tick > processed_tick:
+                self.latency.ticked()
+            state.snapshot = snapshot
+            state.draw(simulation.interpolation(snapshot))
+            state.snapshot = None
+        else:
+            # Drawn from its entities, which the simulation thread must leave alone meanwhile
+            with simulation.lock if threaded else nullcontext():
+                state.draw(self._accumulator / TICK_DT)
+        if self.profiler.enabled:
+            state.mark_dirty(self.profiler.draw(self.screen))
+        self.profiler.mark("render")
+
+        state.present()
+        self.profiler.mark("flip")
+        if self.latency is not None:
+            self.latency.presented()
+
+        if self._capture is not None:
+            self._capture.capture(self.screen)
+            self.profiler.mark("capture")
+
+    def _simulate(self, frame_time: float, events: list[pg.event.Event]) -> None:
+        """
+        Processes `events`, then runs the simulation ticks due after `frame_time` milliseconds,
+        unless they're left to the simulation thread.
+        """
+        self._accumulator += min(frame_time, MAX_FRAME_TIME)
+        if self._recorder is not None:
+            self._recorder.record_events(self.ticks, events)
+        self.state_manager.active_state().process_events(TICK_DT, events)
+        self.profiler.mark("event")
+
+        if self._simulation is not None and self.state_manager.active() is State.PLAYING:
+            self._accumulator = 0.
+            return
 
-        while True:
-            # Limit FPS and calculate delta time
-            dt = clock.tick(MAX_FPS)
-            self.state_manager.active_state().loop(dt)
+        if self._accumulator >= TICK_DT and self.latency is not None:
+            self.latency.ticked()
+        while self._accumulator >= TICK_DT:
+            self.state_manager.active_state().tick(TICK_DT)
+            self.end_tick()
+            self._accumulator -= TICK_DT
+
+    def step(self, events: Iterable[pg.event.Event] = ()) -> None:
+        """
+        Runs a single simulation tick of the game loop, processing `events`
+        instead of the ones in the SDL event queue.
+
+        :param events: Events to process.
+        """
+        assert self._simulation is None, "Threaded games are only advanced by `advance()`"
+        if self._recorder is not None:
+            events = list(events)
+            self._recorder.record_events(self.ticks, events)
+        # The tick runs on the state the events left active, like in `advance()`
+        self.state_manager.active_state().process_events(TICK_DT, events)
+        self.state_manager.active_state().tick(TICK_DT)
+        self.end_tick()
+
+        if self.rendering:
+            self.state_manager.active_state().update_screen()
+            if self._capture is not None:
+                self._capture.capture(self.screen)
+
+    def _trace(self, step: str) -> None:
+        """
+        Marks the end of a startup step, if tracing startup.
+        """
+        if self._startup_trace is not None:
+            self._startup_trace.mark(step)
+
+    def end_tick(self) -> None:
+        """
+        Counts a simulation tick, recording the state checksum if recording.
+        Called by whatever ticked the active state, right after the tick.
+
+        The tick counter and the replay log belong to the thread ticking `PlayState`: the
+        simulation thread while playing in threaded mode, the main thread otherwise. In
+        threaded mode both threads call this, and record events, only holding `simulation.lock`.
+        """
+        if self._recorder is not None:
+            self._recorder.record_checksum(self.ticks, game_checksum(self))
+        self.ticks += 1
+
+    @property
+    def simulation(self) -> Optional["SimulationThread"]:
+        """
+        Returns the simulation thread, None if not threaded.
+        """
+        return self._simulation
+
+    def stop_simulation(self) -> None:
+        """
+        Stops the simulation thread, if threaded. `PlayState` is then ticked by `advance()`.
+        """
+        if self._simulation is not None:
+            self._simulation.stop()
+            self._simulation = None
+
+    def stop_recording(self) -> None:
+        """
+        Stops recording the game, closing the replay log.
+        """
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def start_capture(self, path: str, fmt: Optional[str] = None, fps: int = MAX_FPS) -> "FrameCapture":
+        """
+        Starts capturing the frames shown, see `FrameCapture`.
+
+        :param path: Output file, or file name pattern for PNG images.
+        :param fmt: Output format, guessed from `path` by default.
+        :param fps: Frames per second of the video: `MAX_FPS` for `run()`, `TICK_RATE` for `step()`.
+        :return: The capture, whose counters tell the frames written and dropped.
+        """
+        from .capture import FrameCapture
+
+        self.stop_capture()
+        self._capture = FrameCapture(path, self.screen, fmt, fps=fps)
+        return self._capture
+
+    def stop_capture(self) -> None:
+        """
+        Stops capturing frames, waiting for the frames captured to be written.
+        """
+        if self._capture is not None:
+            self._capture.close()
+            self._capture = None
+
+    def toggle_profiler(self) -> None:
+        """
+        Shows or hides the frame profiler.
+        """
+        self.profiler.toggle()
+        self.state_manager.active_state().redraw()
 
     def _reset_keys_pressed(self):
         """
@@ -65,6 +332,8 @@ class Game:
         self._playing = True
         self._reset_keys_pressed()
         self.state_manager.new_game()
+        if self._simulation is not None:
+            self._simulation.snapshots.clear()
 
     def resume_game(self) -> None:
         """
@@ -91,6 +360,10 @@ class Game:
         """
         Ends the current game.
         """
+        if self._simulation is not None and self._simulation.in_thread():
+            # States are only changed by the main thread, see `SimulationThread`
+            self._simulation.request(self.game_over)
+            return
         self._playing = False
         self._reset_keys_pressed()
         self.state_manager.game_over()
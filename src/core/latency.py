@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `LatencyMonitor`, which measures the latency from input events to the frame
+showing their effect, and `DeadlinePacer`, a frame pacing that polls input as late as possible.
+"""
+import sys
+import time
+from array import array
+from collections import deque
+from time import perf_counter
+from typing import Iterable, Optional, TextIO
+
+import pygame as pg
+
+PRESS_EVENTS = (pg.KEYDOWN, pg.MOUSEBUTTONDOWN)
+
+
+class LatencyMonitor:
+    """
+    Measures the time from each key or mouse button press to the end of the display update
+    of the first frame drawn after a simulation tick processed it, keeping a histogram of
+    the latencies of each key (or mouse button).
+
+    pygame doesn't expose the timestamps SDL gives events, so an event is taken to be queued
+    right after the previous poll of the event queue: latencies measured are upper bounds,
+    above the true ones by at most the time between two polls. Events carrying a `timestamp`
+    attribute, a `perf_counter()` time, are measured from it instead.
+    """
+    bin_width = .5  # Milliseconds
+    bins = 200      # The last bin counts every latency above the others
+
+    def __init__(self) -> None:
+        self._histograms = {}    # type: dict[str, array]
+        self._totals = {}        # type: dict[str, float]
+        self._max = {}           # type: dict[str, float]
+        self._last_poll = None   # type: Optional[float]
+        self._unprocessed = []   # type: list[tuple[str, float]]
+        self._processed = []     # type: list[tuple[str, float]]
+
+    @staticmethod
+    def _label(event: pg.event.Event) -> str:
+        if event.type == pg.KEYDOWN:
+            return pg.key.name(event.key) or str(event.key)
+        return f"mouse {event.button}"
+
+    def polled(self, events: Iterable[pg.event.Event]) -> None:
+        """
+        Records the presses among the events just taken from the SDL event queue.
+
+        :param events: The events taken.
+        """
+        now = perf_counter()
+        queued = now if self._last_poll is None else self._last_poll
+        for event in events:
+            if event.type in PRESS_EVENTS:
+                self._unprocessed.append((self._label(event), getattr(event, "timestamp", queued)))
+        self._last_poll = now
+
+    def ticked(self) -> None:
+        """
+        Tells that a simulation tick processed the events polled so far.
+        """
+        if self._unprocessed:
+            self._processed.extend(self._unprocessed)
+            self._unprocessed.clear()
+
+    def presented(self) -> None:
+        """
+        Tells that a frame was shown on display, measuring the latency of the events processed.
+        """
+        if not self._processed:
+            return
+
+        now = perf_counter()
+        for label, queued in self._processed:
+            self.record(label, (now - queued) * 1000)
+        self._processed.clear()
+
+    def record(self, label: str, latency: float) -> None:
+        """
+        Adds a latency to the histogram of `label`.
+
+        :param label: Key name, or mouse button.
+        :param latency: Latency in milliseconds.
+        """
+        histogram = self._histograms.get(label)
+        if histogram is None:
+            histogram = self._histograms[label] = array("L", bytes(array("L").itemsize * self.bins))
+            self._totals[label] = self._max[label] = 0.
+        histogram[min(self.bins - 1, int(latency / self.bin_width))] += 1
+        self._totals[label] += latency
+        self._max[label] = max(self._max[label], latency)
+
+    def _percentile(self, label: str, q: float) -> float:
+        """
+        Returns the upper edge of the histogram bin holding the `q` quantile of `label` latencies.
+        """
+        histogram = self._histograms[label]
+        rank = q * (sum(histogram) - 1)
+        count = 0
+        for i, n in enumerate(histogram):
+            count += n
+            if count > rank:
+                return min((i + 1) * self.bin_width, self._max[label])
+        return self._max[label]
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Returns number, mean, median, 99th percentile and max latency of the presses of each key
+        (and mouse button), in milliseconds. Percentiles are rounded up to `bin_width`.
+        """
+        stats = {}
+        for label, histogram in self._histograms.items():
+            count = sum(histogram)
+            stats[label] = {
+                "count": count,
+                "mean": self._totals[label] / count,
+                "p50": self._percentile(label, .5),
+                "p99": self._percentile(label, .99),
+                "max": self._max[label],
+            }
+        return stats
+
+    def report(self, file: TextIO = sys.stderr) -> None:
+        """
+        Prints the statistics and the histogram of the latencies of each key.
+
+        :param file: File to print to.
+        """
+        if not self._histograms:
+            print("input latency: no presses measured", file=file)
+            return
+
+        width = 40
+        for label, stats in sorted(self.stats().items()):
+            print(f"input latency of {label!r}: {stats['count']} presses, mean {stats['mean']:.1f} ms, "
+                  f"p50 {stats['p50']:.1f} ms, p99 {stats['p99']:.1f} ms, max {stats['max']:.1f} ms", file=file)
+            histogram = self._histograms[label]
+            used = [i for i, n in enumerate(histogram) if n]
+            peak = max(histogram)
+            for i in range(used[0], used[-1] + 1):
+                edge = f">{i * self.bin_width:5.1f}" if i == self.bins - 1 else f"{i * self.bin_width:6.1f}"
+                bar = "#" * -(-histogram[i] * width // peak)
+                print(f"  {edge} ms | {bar} {histogram[i] or ''}", file=file)
+
+
+class DeadlinePacer:
+    """
+    Paces frames so that each one ends right at a deadline, deadlines being `1 / fps` apart.
+
+    Instead of sleeping as soon as a frame is shown, like `pg.time.Clock.tick()`, the pacer
+    sleeps before input is polled, waking up as late as the longest of the last frames allows:
+    input is read as close as possible to the moment the frame showing it is presented.
+    The OS sleep is cut short by `spin` seconds, or by the longest of the last oversleeps up to
+    `max_spin` seconds, and the rest is busy-waited, so that the wake up isn't delayed by scheduler jitter.
+    Frames missing their deadline move on to the next one.
+
+    Frame times are the times between deadlines, the moments frames are meant to be seen, rather than
+    between wake ups: simulation time advances by whole frame periods, free of the jitter of the wake up.
+    """
+
+    def __init__(self, fps: int, spin: float = .0005, max_spin: float = .002, margin: float = .0005,
+                 history: int = 30) -> None:
+        """
+        :param fps: Frames per second.
+        :param spin: Least seconds busy-waited at the end of each sleep.
+        :param max_spin: Most seconds busy-waited at the end of each sleep.
+        :param margin: Seconds of slack left to each frame, above the longest of the last frames.
+        :param history: Number of frames the expected frame time and oversleep are taken from.
+        """
+        self.frame_time = 1000 / fps                # type: float
+        self.period = self.frame_time / 1000        # type: float
+        self.spin = spin                            # type: float
+        self.max_spin = max_spin                    # type: float
+        self.margin = margin                        # type: float
+        self._work = deque(maxlen=history)          # type: deque[float]
+        self._oversleep = deque(maxlen=history)     # type: deque[float]
+        self._deadline = None                       # type: Optional[float]
+        self._wake = 0.                             # type: float
+        self._periods = 0                           # type: int
+
+    def wait(self) -> float:
+        """
+        Sleeps until the next frame must start to end by its deadline.
+
+        :return: Milliseconds from the deadline of the previous frame to the one of this frame, 0 the first time.
+        """
+        now = perf_counter()
+        if self._deadline is None:
+            self._deadline = now + self.period
+
+        wake = self._deadline - max(self._work, default=0.) - self.margin
+        sleep = wake - now - min(self.max_spin, max(self.spin, max(self._oversleep, default=0.)))
+        if sleep > 0:
+            time.sleep(sleep)
+            self._oversleep.append(perf_counter() - now - sleep)
+        while perf_counter() < wake:
+            pass
+
+        self._wake = perf_counter()
+        return self._periods * self.frame_time
+
+    def frame_done(self) -> None:
+        """
+        Tells that the frame was shown, setting the deadline of the next one.
+        """
+        now = perf_counter()
+        self._work.append(now - self._wake)
+        # Deadlines missed are skipped, like refreshes of a display
+        self._periods = 1 + max(0, int((now - self._deadline) // self.period) + 1)
+        self._deadline += self._periods * self.period
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `ParallelGames`, which runs headless games in a pool of worker processes.
+
+Workers get actions and send back results through pipes, while the frames they
+draw are copied, as raw pixels, into shared memory blocks, which the parent process
+reads in place.
+"""
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from time import perf_counter
+from typing import Optional
+
+import numpy as np
+import pygame as pg
+
+from data import Action, SCREEN_RES
+from data.const.keybindings import CHANGE_JUMP_KEY, JUMP_KEY, MOVE_LEFT_KEY, MOVE_RIGHT_KEY
+from utils import channel_offsets, rgb_view
+
+_FRAME_SHAPE = (SCREEN_RES.height, SCREEN_RES.width, 4)  # Raw 32 bit pixels of the screen
+_HELD_KEYS = ((Action.LEFT, MOVE_LEFT_KEY), (Action.RIGHT, MOVE_RIGHT_KEY), (Action.JUMP, JUMP_KEY))
+
+
+class ActionKeys:
+    """
+    Turns the `Action` flags of each tick into the key events a player would send.
+    """
+
+    def __init__(self) -> None:
+        self.held = set()  # type: set[int]
+
+    def events(self, action: int) -> list[pg.event.Event]:
+        """
+        Returns the key events that make the keys held match `action`.
+
+        :param action: `Action` flags.
+        """
+        events = []
+        for flag, key in _HELD_KEYS:
+            if action & flag and key not in self.held:
+                events.append(pg.event.Event(pg.KEYDOWN, key=key, mod=0, unicode="", scancode=0))
+                self.held.add(key)
+            elif not action & flag and key in self.held:
+                events.append(pg.event.Event(pg.KEYUP, key=key, mod=0, unicode="", scancode=0))
+                self.held.discard(key)
+        if action & Action.CHANGE_JUMP:
+            events.append(pg.event.Event(pg.KEYUP, key=CHANGE_JUMP_KEY, mod=0, unicode="", scancode=0))
+        return events
+
+    def release(self) -> None:
+        """
+        Forgets the held keys, e.g. when a game restarts.
+        """
+        self.held.clear()
+
+
+def _worker_main(conn, n_games: int, rendering: bool, frame_names: list[str]) -> None:
+    """
+    Runs `n_games` headless games, answering the commands sent by `ParallelGames`.
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from .game import Game
+
+    games = [Game(headless=True, rendering=rendering) for _ in range(n_games)]
+    keys = [ActionKeys() for _ in range(n_games)]
+    blocks = [shared_memory.SharedMemory(name) for name in frame_names]
+    frames = [np.ndarray(_FRAME_SHAPE, dtype=np.uint8, buffer=block.buf) for block in blocks]
+
+    ticks, busy = 0, 0.
+    scores = np.zeros(n_games, dtype=np.int64)
+    dones = np.zeros(n_games, dtype=bool)
+
+    try:
+        while True:
+            command, arg = conn.recv()
+            start = perf_counter()
+
+            if command == "reset":
+                for game, game_keys in zip(games, keys):
+                    if game.has_active_game():
+                        game.game_over()
+                    game.new_game()
+                    game_keys.release()
+                screen = games[0].screen
+                assert screen.get_pitch() == screen.get_width() * 4
+                result = channel_offsets(screen)
+
+            elif command == "step":
+                for i, (game, game_keys) in enumerate(zip(games, keys)):
+                    game.step(game_keys.events(int(arg[i])))
+                    dones[i] = not game.has_active_game()
+                    scores[i] = game.score
+                    if dones[i]:
+                        game.new_game()
+                        game_keys.release()
+                    if frames:
+                        # One copy per frame: pygame 2.1.2 can't make a surface over shared memory in the
+                        # display pixel format, and drawing sprites converted to it on a surface of another
+                        # format, like the RGBX ones `frombuffer()` makes, is several times slower than copying
+                        np.copyto(frames[i], np.frombuffer(game.screen.get_buffer(), np.uint8).reshape(_FRAME_SHAPE))
+                ticks += n_games
+                result = (scores, dones)
+
+            elif command == "stats":
+                result = {"pid": os.getpid(), "ticks": ticks, "busy": busy,
+                          "ticks_per_second": ticks / busy if busy else 0.}
+
+            else:
+                break
+
+            busy += perf_counter() - start
+            conn.send(result)
+    finally:
+        del frames
+        for block in blocks:
+            block.close()
+        conn.close()
+
+
+class ParallelGames:
+    """
+    Runs `workers * games_per_worker` headless games in worker processes,
+    all stepped together with `step()`, like `BatchPlay` does in a single process.
+
+    Games that end are restarted at the end of the step they end in.
+    If rendering, the frame of each game after the last step is in `self.frames`,
+    a view of shared memory shaped like `pg.surfarray.pixels3d()` of the game screen.
+    """
+
+    def __init__(self, workers: Optional[int] = None, games_per_worker: int = 1, rendering: bool = True) -> None:
+        """
+        :param workers: Number of worker processes, defaults to the number of CPUs.
+        :param games_per_worker: Number of games run by each worker.
+        :param rendering: If False, games are never drawn and there are no frames.
+        """
+        self.workers = workers or os.cpu_count() or 1  # type: int
+        self.games_per_worker = games_per_worker        # type: int
+        self.n = self.workers * games_per_worker        # type: int
+
+        frame_size = int(np.prod(_FRAME_SHAPE))
+        self._blocks = [shared_memory.SharedMemory(create=True, size=frame_size)
+                        for _ in range(self.n if rendering else 0)]  # type: list[shared_memory.SharedMemory]
+        self._raw_frames = [np.ndarray(_FRAME_SHAPE, dtype=np.uint8, buffer=block.buf)
+                            for block in self._blocks]              # type: list[np.ndarray]
+        self.frames = []                                            # type: list[np.ndarray]
+
+        # Workers are spawned rather than forked, so they don't inherit the parent pygame state
+        context = mp.get_context("spawn")
+        self._pipes = []      # type: list
+        self._processes = []  # type: list[mp.Process]
+        for w in range(self.workers):
+            parent_conn, child_conn = context.Pipe()
+            names = [block.name for block in self._blocks[w * games_per_worker:(w + 1) * games_per_worker]]
+            process = context.Process(target=_worker_main, args=(child_conn, games_per_worker, rendering, names),
+                                      daemon=True)
+            process.start()
+            child_conn.close()
+            self._pipes.append(parent_conn)
+            self._processes.append(process)
+
+        self.final_scores = np.zeros(self.n, dtype=np.int64)  # type: np.ndarray
+        offsets = self.reset()
+        self.frames = [rgb_view(raw, offsets).transpose(1, 0, 2) for raw in self._raw_frames]
+
+    def reset(self) -> tuple[int, int, int]:
+        """
+        Starts a new game in every worker.
+
+        :return: The byte offsets of red, green and blue in the pixels of the game screens.
+        """
+        return self._broadcast("reset")[0]
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advances every game by one simulation tick.
+
+        :param actions: `Action` flags of each game.
+        :return: Score of each game and whether it ended in the step. Ended games are
+                 already restarted: their score is in `self.final_scores`.
+        """
+        actions = np.asarray(actions).reshape(self.workers, self.games_per_worker)
+        results = self._broadcast("step", list(actions))
+        scores = np.concatenate([r[0] for r in results])
+        dones = np.concatenate([r[1] for r in results])
+        self.final_scores[dones] = scores[dones]
+        scores[dones] = 0
+        return scores, dones
+
+    def stats(self) -> list[dict]:
+        """
+        Returns, for each worker, its process id, the game ticks it ran,
+        the time it spent running them and its throughput in ticks per second.
+        """
+        return self._broadcast("stats")
+
+    def close(self) -> None:
+        """
+        Stops the workers and frees the shared memory.
+        """
+        for conn in self._pipes:
+            conn.send(("close", None))
+            conn.close()
+        for process in self._processes:
+            process.join()
+        self._pipes.clear()
+        self._processes.clear()
+
+        self.frames.clear()
+        self._raw_frames.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+
+    def __enter__(self) -> "ParallelGames":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _broadcast(self, command: str, args: Optional[list] = None) -> list:
+        """
+        Sends `command` to every worker, with its own argument if any,
+        then waits for every answer, so that workers run in parallel.
+        """
+        for w, conn in enumerate(self._pipes):
+            conn.send((command, None if args is None else args[w]))
+        return [conn.recv() for conn in self._pipes]
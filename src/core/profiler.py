@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `FrameProfiler`, which times the phases of each frame
+and draws a frame time graph over the game.
+"""
+from array import array
+from time import perf_counter
+from typing import Optional
+
+import pygame as pg
+
+from data import MAX_FPS, get_font, render_text
+from utils import debug_func
+
+
+class FrameProfiler:
+    """
+    Times the phases of each frame, keeping the last `capacity` frames in a ring buffer.
+
+    While disabled, each call costs a single attribute check.
+    The profiler can only be enabled in debug mode.
+    """
+    phases = ("sleep", "event", "logic", "render", "flip", "capture")
+    graph_frames = 200
+    graph_height = 60
+    stats_interval = 30
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self.enabled = False                                                   # type: bool
+        self.capacity = capacity                                               # type: int
+        self.frames = 0                                                        # type: int
+
+        self._samples = {phase: array("d", bytes(8 * capacity)) for phase in self.phases}
+        self._totals = array("d", bytes(8 * capacity))                        # type: array
+        self._current = dict.fromkeys(self.phases, 0.)                        # type: dict[str, float]
+        self._last = 0.                                                        # type: float
+
+        self._panel = None                                                     # type: Optional[pg.Surface]
+        self._stats_text = ""                                                  # type: str
+
+    @debug_func
+    def toggle(self) -> None:
+        """
+        Enables the profiler if disabled, disables it otherwise.
+        Recorded frames are discarded when the profiler is enabled.
+        """
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.frames = 0
+            self._stats_text = ""
+            self.begin_frame()
+
+    def begin_frame(self) -> None:
+        """
+        Starts timing a new frame.
+        """
+        if self.enabled:
+            for phase in self._current:
+                self._current[phase] = 0.
+            self._last = perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """
+        Adds the time elapsed since the previous mark to `phase`.
+
+        :param phase: One of `self.phases`.
+        """
+        if self.enabled:
+            now = perf_counter()
+            self._current[phase] += now - self._last
+            self._last = now
+
+    def end_frame(self) -> None:
+        """
+        Stores the times of the current frame in the ring buffer.
+        """
+        if not self.enabled:
+            return
+
+        idx = self.frames % self.capacity
+        total = 0.
+        for phase, seconds in self._current.items():
+            self._samples[phase][idx] = seconds * 1000
+            total += seconds
+        self._totals[idx] = total * 1000
+        self.frames += 1
+
+    def recent(self, n: Optional[int] = None, phase: Optional[str] = None) -> list[float]:
+        """
+        Returns the times of the last `n` recorded frames, oldest first, in milliseconds.
+
+        :param n: Number of frames. Defaults to every frame in the buffer.
+        :param phase: Phase to return times of. Defaults to whole frame times.
+        :return: Frame times.
+        """
+        samples = self._totals if phase is None else self._samples[phase]
+        count = min(self.frames, self.capacity)
+        if n is not None:
+            count = min(n, count)
+
+        end = self.frames % self.capacity
+        if count <= end:
+            return samples[end - count:end].tolist()
+        return samples[self.capacity - (count - end):].tolist() + samples[:end].tolist()
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """
+        Returns mean, 99th percentile and max time of each phase and of whole frames,
+        over the frames in the buffer, in milliseconds.
+        """
+        stats = {}
+        for phase in (*self.phases, "frame"):
+            values = sorted(self.recent(phase=None if phase == "frame" else phase))
+            if not values:
+                continue
+            stats[phase] = {
+                "mean": sum(values) / len(values),
+                "p99": values[min(len(values) - 1, int(len(values) * .99))],
+                "max": values[-1],
+            }
+        return stats
+
+    def draw(self, surface: pg.Surface) -> Optional[pg.Rect]:
+        """
+        Draws the frame time graph with FPS and 99th percentile on the top right corner of `surface`.
+
+        :param surface: A surface to draw the graph onto.
+        :return: The area of `surface` that was drawn, or None if the profiler is disabled.
+        """
+        if not self.enabled:
+            return None
+
+        if self._panel is None:
+            self._panel = pg.Surface((self.graph_frames, self.graph_height + 24))
+
+        if self.frames % self.stats_interval == 1 or not self._stats_text:
+            frame_stats = self.stats().get("frame")
+            if frame_stats:
+                self._stats_text = f"FPS {1000 / frame_stats['mean']:.0f}  P99 {frame_stats['p99']:.1f} MS"
+
+        panel = self._panel
+        panel.fill((16, 16, 16))
+
+        # One bar per frame, the horizontal line is the frame budget
+        budget = 1000 / MAX_FPS
+        scale = self.graph_height / (budget * 2)
+        bottom = panel.get_height() - 1
+        for x, frame_time in enumerate(self.recent(self.graph_frames)):
+            color = (96, 200, 96) if frame_time <= budget else (220, 64, 64)
+            pg.draw.line(panel, color, (x, bottom), (x, bottom - min(self.graph_height, frame_time * scale)))
+        pg.draw.line(panel, "gray", (0, bottom - budget * scale), (self.graph_frames, bottom - budget * scale))
+
+        panel.blit(render_text(get_font(30), self._stats_text, False, "white"), (4, 2))
+
+        rect = panel.get_rect(topright=(surface.get_width(), 0))
+        return surface.blit(panel, rect)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `RenderQueue`, which batches the blits of a frame.
+"""
+from itertools import repeat
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pygame as pg
+
+
+class RenderQueue:
+    """
+    Collects the blits submitted during a frame and draws them onto
+    a target surface with a single `Surface.blits()` call per layer.
+
+    Layers are drawn in ascending order, blits of the same layer
+    in the order they were submitted. Blits falling entirely
+    outside the target are culled when submitted.
+    """
+
+    def __init__(self, target: pg.Surface) -> None:
+        """
+        :param target: The surface blits are drawn onto.
+        """
+        self.target = target                   # type: pg.Surface
+        self._bounds = target.get_rect()        # type: pg.Rect
+        self._layers = {}                       # type: dict[int, list[tuple]]
+
+        self.submitted = 0                      # type: int
+        self.culled = 0                         # type: int
+        self.batches = 0                        # type: int
+
+    def submit(self, source: pg.Surface, dest: Union[pg.Rect, Sequence[int]],
+               area: Optional[pg.Rect] = None, layer: int = 0) -> pg.Rect:
+        """
+        Queues the blit of `source` at `dest`, like `Surface.blit()`.
+
+        :param source: The surface to draw.
+        :param dest: Position of the top left corner of `source` on the target.
+        :param area: The portion of `source` to draw, the whole surface by default.
+        :param layer: The layer to draw `source` in.
+        :return: The area of the target that will be drawn, empty if culled.
+        """
+        w, h = source.get_size() if area is None else area.size
+        rect = pg.Rect(dest[0], dest[1], w, h).clip(self._bounds)
+
+        self.submitted += 1
+        if not rect:
+            self.culled += 1
+            return rect
+
+        blits = self._layers.get(layer)
+        if blits is None:
+            blits = self._layers[layer] = []
+        blits.append((source, dest) if area is None else (source, dest, area))
+        return rect
+
+    def submit_many(self, source: pg.Surface, positions: np.ndarray, layer: int = 0) -> pg.Rect:
+        """
+        Queues the blits of `source` at many positions, culling them all at once.
+
+        :param source: The surface to draw.
+        :param positions: Integer positions of the top left corner of `source`, one per row.
+        :param layer: The layer to draw `source` in.
+        :return: The bounding box of the area of the target that will be drawn, empty if all culled.
+        """
+        w, h = source.get_size()
+        bounds = self._bounds
+        x, y = positions[:, 0], positions[:, 1]
+        visible = positions[(x < bounds.right) & (x + w > bounds.left) & (y < bounds.bottom) & (y + h > bounds.top)]
+
+        self.submitted += len(positions)
+        self.culled += len(positions) - len(visible)
+        if not len(visible):
+            return pg.Rect(0, 0, 0, 0)
+
+        blits = self._layers.get(layer)
+        if blits is None:
+            blits = self._layers[layer] = []
+        blits.extend(zip(repeat(source), visible.tolist()))
+
+        left, top = visible.min(axis=0).tolist()
+        right, bottom = visible.max(axis=0).tolist()
+        return pg.Rect(left, top, right - left + w, bottom - top + h).clip(bounds)
+
+    def flush(self) -> None:
+        """
+        Draws every queued blit onto the target, emptying the queue.
+        """
+        for layer in sorted(self._layers):
+            blits = self._layers[layer]
+            if blits:
+                self.target.blits(blits, doreturn=False)
+                self.batches += 1
+                blits.clear()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the number of blits submitted, of the ones culled and of `Surface.blits()` calls.
+        """
+        return {"submitted": self.submitted, "culled": self.culled, "batches": self.batches}
+
+    def reset_stats(self) -> None:
+        """
+        Resets counters.
+        """
+        self.submitted = 0
+        self.culled = 0
+        self.batches = 0
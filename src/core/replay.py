@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains input recording and replay.
+
+A replay log starts with a header, followed by records of two kinds:
+input events, tagged with the simulation tick they are processed before,
+and checksums of the simulation state after each tick.
+Replaying the events at the same ticks on a new game must give the same checksums.
+"""
+import struct
+import zlib
+from typing import BinaryIO, Iterable, Optional
+
+import pygame as pg
+
+from data import TICK_RATE
+
+_MAGIC = b"LPRP"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHH")    # magic, version, tick rate
+_EVENT = struct.Struct("<cIHIhh")   # tag, tick, event type, key or button, x, y
+_CHECKSUM = struct.Struct("<cII")   # tag, tick, checksum
+_EVENT_TAG = b"E"
+_CHECKSUM_TAG = b"C"
+
+# Events that can change the simulation
+RECORDED_EVENTS = frozenset((pg.KEYDOWN, pg.KEYUP, pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP,
+                             pg.MOUSEMOTION, pg.WINDOWFOCUSLOST))
+
+
+class ReplayError(Exception):
+    """
+    Raised when a replay log can't be read.
+    """
+
+
+class ReplayDivergence(Exception):
+    """
+    Raised when a replayed game doesn't match the recorded one.
+    """
+
+    def __init__(self, tick: int, expected: int, actual: int) -> None:
+        super().__init__(f"replay diverged at tick {tick}: checksum {actual:#010x}, expected {expected:#010x}")
+        self.tick = tick
+        self.expected = expected
+        self.actual = actual
+
+
+def game_checksum(game) -> int:
+    """
+    Returns a checksum of the simulation state of `game`.
+
+    :param game: The game.
+    :return: A CRC32 of the active state name and its checksum.
+    """
+    state = game.state_manager.active_state()
+    return zlib.crc32(type(state).__name__.encode(), state.checksum())
+
+
+class Recorder:
+    """
+    Writes input events and state checksums to a replay log.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        """
+        :param file: A binary file open for writing.
+        """
+        self._file = file  # type: BinaryIO
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, TICK_RATE))
+
+    def record_events(self, tick: int, events: Iterable[pg.event.Event]) -> None:
+        """
+        Records the events processed before `tick`.
+        Events that can't change the simulation are skipped.
+
+        :param tick: The next simulation tick.
+        :param events: The events.
+        """
+        for event in events:
+            if event.type not in RECORDED_EVENTS:
+                continue
+
+            code = getattr(event, "key", getattr(event, "button", 0))
+            x, y = getattr(event, "pos", (0, 0))
+            self._file.write(_EVENT.pack(_EVENT_TAG, tick, event.type, code, x, y))
+
+    def record_checksum(self, tick: int, checksum: int) -> None:
+        """
+        Records the checksum of the simulation state after `tick`.
+
+        :param tick: The simulation tick.
+        :param checksum: The checksum, see `game_checksum()`.
+        """
+        self._file.write(_CHECKSUM.pack(_CHECKSUM_TAG, tick, checksum))
+
+    def close(self) -> None:
+        """
+        Closes the replay log.
+        """
+        self._file.close()
+
+
+class Replayer:
+    """
+    Reads a replay log and gives back its events and checksums tick by tick.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        """
+        :param file: A binary file open for reading.
+        """
+        self._events = {}      # type: dict[int, list[pg.event.Event]]
+        self._checksums = {}   # type: dict[int, int]
+        self.last_tick = -1    # type: int
+        self._read(file.read())
+
+    def events(self, tick: int) -> list[pg.event.Event]:
+        """
+        Returns the events recorded before `tick`.
+
+        :param tick: The next simulation tick.
+        """
+        return self._events.get(tick, [])
+
+    def check(self, tick: int, checksum: int) -> None:
+        """
+        Compares the checksum of the simulation state after `tick` with the recorded one.
+
+        :param tick: The simulation tick.
+        :param checksum: The checksum, see `game_checksum()`.
+        :raise ReplayDivergence: If the checksums differ.
+        """
+        expected = self._checksums.get(tick)
+        if expected is not None and expected != checksum:
+            raise ReplayDivergence(tick, expected, checksum)
+
+    def _read(self, data: bytes) -> None:
+        """
+        Parses a replay log.
+        """
+        if len(data) < _HEADER.size:
+            raise ReplayError("replay log is too short")
+
+        magic, version, tick_rate = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ReplayError("not a replay log, or unsupported version")
+        if tick_rate != TICK_RATE:
+            raise ReplayError(f"replay recorded at {tick_rate} ticks per second, game runs at {TICK_RATE}")
+
+        offset = _HEADER.size
+        while offset < len(data):
+            tag = data[offset:offset + 1]
+            if tag == _EVENT_TAG and offset + _EVENT.size <= len(data):
+                _, tick, event_type, code, x, y = _EVENT.unpack_from(data, offset)
+                self._events.setdefault(tick, []).append(self._make_event(event_type, code, (x, y)))
+                offset += _EVENT.size
+            elif tag == _CHECKSUM_TAG and offset + _CHECKSUM.size <= len(data):
+                _, tick, checksum = _CHECKSUM.unpack_from(data, offset)
+                self._checksums[tick] = checksum
+                offset += _CHECKSUM.size
+            else:
+                raise ReplayError(f"corrupted replay log at byte {offset}")
+            self.last_tick = max(self.last_tick, tick)
+
+    @staticmethod
+    def _make_event(event_type: int, code: int, pos: tuple[int, int]) -> pg.event.Event:
+        """
+        Builds back a recorded event.
+        """
+        if event_type in (pg.KEYDOWN, pg.KEYUP):
+            return pg.event.Event(event_type, key=code, mod=0, unicode="", scancode=0)
+        if event_type in (pg.MOUSEBUTTONDOWN, pg.MOUSEBUTTONUP):
+            return pg.event.Event(event_type, button=code, pos=pos)
+        if event_type == pg.MOUSEMOTION:
+            return pg.event.Event(event_type, pos=pos, rel=(0, 0), buttons=(0, 0, 0))
+        return pg.event.Event(event_type)
+
+
+def play_back(game, replayer: Replayer, ticks: Optional[int] = None) -> int:
+    """
+    Replays the recorded events on `game`, one simulation tick at a time,
+    checking the state after each tick. `game` must be a new game.
+
+    :param game: The game to replay on, usually a headless one.
+    :param replayer: The replay.
+    :param ticks: Number of ticks to replay, defaults to every recorded tick.
+    :return: The number of ticks replayed.
+    :raise ReplayDivergence: If the replayed game doesn't match the recorded one.
+    """
+    if ticks is None:
+        ticks = replayer.last_tick + 1
+
+    for tick in range(game.ticks, ticks):
+        game.step(replayer.events(tick))
+        replayer.check(tick, game_checksum(game))
+    return ticks
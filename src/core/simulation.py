@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `SimulationThread`, which runs the simulation ticks of `PlayState` on a thread
+of its own, and the triple buffer of `Snapshot`s it hands the state over with.
+"""
+import threading
+import time
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pygame as pg
+
+from data import MAX_FRAME_TIME, TICK_DT, State
+
+if TYPE_CHECKING:
+    from entities import ActorStore
+    from .game import Game
+    from .render import RenderQueue
+
+
+class Snapshot(NamedTuple):
+    """
+    The state of a game at the end of a simulation tick, as needed to draw it.
+    Its arrays are read-only and left untouched while the snapshot is the newest one taken.
+    """
+    tick: int                           # Simulation tick at whose end it was taken
+    time: float                         # `perf_counter()` time it was published at
+    previous: np.ndarray                # Positions (x, y) of the actors at the start of the tick
+    current: np.ndarray                 # Positions (x, y) of the actors at the end of the tick
+    sizes: np.ndarray                   # Sizes (w, h) of the actors
+    layers: np.ndarray                  # Collision layers of the actors
+    surfaces: tuple[pg.Surface, ...]    # Surfaces of the actors
+    score: int
+    jump_type: str
+
+    def draw_positions(self, interpolation: float = 1.) -> np.ndarray:
+        """
+        Returns the integer positions actors are drawn at, like `Actor.blit()` does.
+
+        :param interpolation: 0 gives positions at the start of the tick, 1 at its end.
+        :return: Positions (x, y), one per actor.
+        """
+        positions = self.current
+        if interpolation < 1.:
+            positions = self.previous + (positions - self.previous) * interpolation
+        return np.floor(positions).astype(np.int32)
+
+    def submit(self, queue: "RenderQueue", layer: int = 0, interpolation: float = 1.) -> list[pg.Rect]:
+        """
+        Submits every actor to a render queue, like `Actor.submit()` does.
+
+        :param queue: The render queue.
+        :param layer: The layer to draw actors in.
+        :param interpolation: 0 draws actors at the start of the tick, 1 at its end.
+        :return: The areas of the queue target that will be drawn.
+        """
+        return [queue.submit(surface, (x, y), layer=layer)
+                for surface, (x, y) in zip(self.surfaces, self.draw_positions(interpolation).tolist())]
+
+    def query_point(self, pos: tuple[int, int], mask: int) -> bool:
+        """
+        Tells whether an actor in `mask` contains `pos` at the end of the tick.
+
+        :param pos: The point.
+        :param mask: Layers to consider.
+        """
+        left, top = np.floor(self.current).astype(np.int32).T
+        w, h = self.sizes.T
+        x, y = pos
+        return bool(np.any((self.layers & mask != 0) & (left <= x) & (x < left + w) & (top <= y) & (y < top + h)))
+
+
+class _Slot:
+    """
+    Arrays a snapshot is copied into, grown when more actors need them.
+    """
+
+    def __init__(self) -> None:
+        self.previous = np.zeros((0, 2), dtype=np.float64)  # type: np.ndarray
+        self.current = np.zeros((0, 2), dtype=np.float64)   # type: np.ndarray
+        self.sizes = np.zeros((0, 2), dtype=np.int32)       # type: np.ndarray
+        self.layers = np.zeros(0, dtype=np.int32)           # type: np.ndarray
+        self.snapshot = None                                # type: Optional[Snapshot]
+
+    def fill(self, tick: int, published: float, store: "ActorStore", rows: Sequence[int],
+             surfaces: tuple[pg.Surface, ...], score: int, jump_type: str) -> None:
+        n = len(rows)
+        if len(self.current) < n:
+            capacity = max(n, 2 * len(self.current))
+            self.previous = np.zeros((capacity, 2), dtype=np.float64)
+            self.current = np.zeros((capacity, 2), dtype=np.float64)
+            self.sizes = np.zeros((capacity, 2), dtype=np.int32)
+            self.layers = np.zeros(capacity, dtype=np.int32)
+        for array in (self.previous, self.current, self.sizes, self.layers):
+            array.flags.writeable = True
+
+        self.previous[:n, 0], self.previous[:n, 1] = store.prev_x[rows], store.prev_y[rows]
+        self.current[:n, 0], self.current[:n, 1] = store.x[rows], store.y[rows]
+        self.sizes[:n, 0], self.sizes[:n, 1] = store.w[rows], store.h[rows]
+        self.layers[:n] = store.layer[rows]
+
+        views = []
+        for array in (self.previous, self.current, self.sizes, self.layers):
+            array.flags.writeable = False
+            views.append(array[:n])
+        self.snapshot = Snapshot(tick, published, *views, surfaces, score, jump_type)
+
+
+class SnapshotBuffer:
+    """
+    A triple buffer of snapshots: the simulation fills a slot while the renderer draws
+    another, and the third holds the newest snapshot not taken yet. Publishing and taking
+    a snapshot only swap slots, so neither side ever waits for the other to copy or draw,
+    and the slot of the snapshot being drawn is never written.
+    """
+
+    def __init__(self) -> None:
+        self._slots = [_Slot() for _ in range(3)]  # type: list[_Slot]
+        self._back, self._middle, self._front = self._slots  # type: _Slot
+        self._fresh = False                        # type: bool
+        self._lock = threading.Lock()              # type: threading.Lock
+
+    def publish(self, tick: int, store: "ActorStore", rows: Sequence[int], surfaces: tuple[pg.Surface, ...],
+                score: int, jump_type: str) -> None:
+        """
+        Copies the state of the actors at `rows` of `store` into a snapshot,
+        making it the newest one. Called by the simulation.
+
+        :param tick: Simulation tick that just ended.
+        :param store: Physics state of the actors.
+        :param rows: Rows of the actors, in drawing order.
+        :param surfaces: Surfaces of the actors.
+        :param score: Score of the game.
+        :param jump_type: Jump type of the player.
+        """
+        self._back.fill(tick, perf_counter(), store, rows, surfaces, score, jump_type)
+        with self._lock:
+            self._back, self._middle = self._middle, self._back
+            self._fresh = True
+
+    def latest(self) -> Optional[Snapshot]:
+        """
+        Returns the newest snapshot, which stays valid until the next call. Called by the renderer.
+
+        :return: The snapshot, None if none was published since the buffer was cleared.
+        """
+        with self._lock:
+            if self._fresh:
+                self._front, self._middle = self._middle, self._front
+                self._fresh = False
+        return self._front.snapshot
+
+    def clear(self) -> None:
+        """
+        Forgets the snapshots published, e.g. when a new game starts.
+        """
+        with self._lock:
+            for slot in self._slots:
+                slot.snapshot = None
+            self._fresh = False
+
+
+class SimulationThread:
+    """
+    Runs the simulation ticks of `PlayState` on a thread of its own, in real time at `TICK_DT`
+    milliseconds per tick, publishing a snapshot to `snapshots` after each one. Drawing the
+    newest snapshot, the main thread renders while the next tick is simulated.
+
+    Events are still processed by the main thread. Ticks and event processing take `lock`,
+    so that they never run at the same time. While another state is active, or the game is
+    being changed to it, no tick runs: other states are ticked by the main thread.
+    Each tick ends with `Game.end_tick()`, so while playing the tick counter and the replay log
+    of the game are written by this thread.
+
+    The thread owns no pygame resource: changes of state requested by ticks are queued with
+    `request()` and run by the main thread with `run_requests()`.
+    """
+
+    def __init__(self, game: "Game") -> None:
+        """
+        :param game: The game to simulate.
+        """
+        self._game = game                                # type: Game
+        self.lock = threading.Lock()                     # type: threading.Lock
+        self.snapshots = SnapshotBuffer()                # type: SnapshotBuffer
+        self.ticks = 0                                   # type: int
+        self.cpu_time = 0.                               # type: float
+        self._requests = []                              # type: list[Callable[[], None]]
+        self._stop = threading.Event()                   # type: threading.Event
+        self._thread = threading.Thread(target=self._run, name="simulation", daemon=True)  # type: threading.Thread
+        self._thread.start()
+
+    def in_thread(self) -> bool:
+        """
+        True if called from the simulation thread.
+        """
+        return threading.current_thread() is self._thread
+
+    def request(self, call: Callable[[], None]) -> None:
+        """
+        Queues a call to be run by the main thread, pausing ticks until it is.
+        Called by the simulation thread, holding `lock`.
+
+        :param call: The call.
+        """
+        self._requests.append(call)
+
+    def run_requests(self) -> None:
+        """
+        Runs the calls queued by the simulation thread. Called by the main thread, holding `lock`.
+        """
+        requests, self._requests = self._requests, []
+        for call in requests:
+            call()
+
+    def _ticking(self) -> bool:
+        """
+        True if the simulation thread should tick the active state.
+        """
+        return not self._requests and self._game.state_manager.active() is State.PLAYING
+
+    def _run(self) -> None:
+        """
+        Ticks at `TICK_DT` milliseconds per tick, catching up when late,
+        but not by more than `MAX_FRAME_TIME` milliseconds.
+        """
+        period = TICK_DT / 1000
+        next_tick = perf_counter()
+        cpu_start = time.thread_time()
+        while not self._stop.is_set():
+            delay = next_tick - perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            with self.lock:
+                if self._ticking():
+                    state = self._game.state_manager.active_state()
+                    state.tick(TICK_DT)
+                    self._game.end_tick()
+                    state.publish(self.snapshots, self._game.ticks)
+                    self.ticks += 1
+                    next_tick = max(next_tick + period, perf_counter() - MAX_FRAME_TIME / 1000)
+                else:
+                    next_tick = perf_counter() + period
+            self.cpu_time = time.thread_time() - cpu_start
+
+    def interpolation(self, snapshot: Snapshot) -> float:
+        """
+        Returns the fraction of the tick after `snapshot` elapsed so far, to draw it at.
+
+        :param snapshot: The snapshot drawn.
+        """
+        return min(1., (perf_counter() - snapshot.time) * 1000 / TICK_DT)
+
+    def stop(self) -> None:
+        """
+        Stops the simulation thread, waiting for the tick it's running.
+        """
+        self._stop.set()
+        self._thread.join()
@@ -4,6 +4,7 @@
 Contains game states.
 """
 from .state import *
+from .overlay import *
 
 from .play import *
 from .game_over import *
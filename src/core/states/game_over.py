@@ -7,102 +7,60 @@ that shows game over screen.
 import pygame as pg
 from pygame.locals import *
 
-from data import SCREEN_RES, SCREEN_CENTER, get_font
+from data import SCREEN_CENTER, get_font
 from data.const.keybindings import RESTART_KEY, MENU_KEY
 
-from entities import StaticEntity
+from entities import Label
 
-from .state import GameState
+from .overlay import OverlayState
+from .state import on_event
 
 
-class GameOverState(GameState):
+class GameOverState(OverlayState):
+    _background_color = "black"
+    _background_alpha = 8
+    _text_alpha = 16
 
     # Re-implemented abstract methods from base class
 
     def _init(self):
-        self._text_alpha = 16
-        self._background_alpha = 8
+        self._init_labels()
 
-    def _loop(self, dt):
-        pass
-
-    def _process_event(self, event, dt):
-        if event.type == KEYDOWN:
-            if event.key == RESTART_KEY:
-                self._game.new_game()
-
-            elif event.key == MENU_KEY:
-                self._game.main_menu()
-
-    def _update_screen(self):
-        for ent in (self._get_background_surf(),
-                    self._get_game_over_surf(),
-                    self._get_score_surf(),
-                    self._get_hint_surf(),
-                    ):
-            ent.blit(self.screen)
+    def _texts(self):
+        self.score_label.set_values(self.score)
+        return self.game_over_label, self.score_label, self.hint_label
 
     # Own methods
 
-    def _get_background_surf(self) -> StaticEntity:
+    @on_event(KEYDOWN, RESTART_KEY)
+    def _restart(self, event: pg.event.Event) -> None:
         """
-        Returns a surface and a rect that represents game over screen background.
-
-        :return: A tuple containing background surface and rect.
+        Starts a new game.
         """
-        background = pg.Surface(SCREEN_RES)
-        background.set_alpha(self._background_alpha)
-        background.fill("black")
-        return StaticEntity(background)
-
-    def _get_game_over_surf(self) -> StaticEntity:
-        """
-        Returns a surface and a rect that represent a "GAME OVER" text.
-
-        :return: A tuple containing game over text surface and rect.
-        """
-        font = get_font(120)
-        surf = font.render("GAME OVER", False, "white")
-        surf.set_alpha(self._text_alpha)
-        x, y = SCREEN_CENTER
+        self._game.new_game()
 
-        game_over = StaticEntity(surf)
-        game_over.rect.center = (x, y - 60)
-        return game_over
-
-    def _get_score_surf(self) -> StaticEntity:
+    @on_event(KEYDOWN, MENU_KEY)
+    def _main_menu(self, event: pg.event.Event) -> None:
         """
-        Returns a surface and a rect that show the final score to the user.
-
-        :return: A tuple containing score surface and rect.
+        Goes to main menu.
         """
-        text = f"FINAL SCORE: {self.score}"
-        font = get_font(60)
-        surf = font.render(text, False, "white")
-        surf.set_alpha(self._text_alpha)
-
-        score = StaticEntity(surf)
-        score.rect.center = SCREEN_CENTER
-        return score
+        self._game.main_menu()
 
-    def _get_hint_surf(self) -> StaticEntity:
+    def _init_labels(self) -> None:
         """
-        Returns a surface and a rect that represent a hint for
-        the user that explains how to start a new game.
-
-        :return: A tuple containing hint surface and rect.
+        Initializes the "GAME OVER" text, the final score and
+        a hint for the user that explains how to start a new game.
         """
         def key_name(key):
             return pg.key.name(key).upper()
 
-        text = f"PRESS '{key_name(RESTART_KEY)}' TO RESTART, " \
-               f"'{key_name(MENU_KEY)}' TO GO TO MAIN MENU"
-
-        font = get_font(40)
-        surf = font.render(text, False, "white")
-        surf.set_alpha(self._text_alpha)
         x, y = SCREEN_CENTER
 
-        hint = StaticEntity(surf)
-        hint.rect.center = (x, y + 50)
-        return hint
+        self.game_over_label = Label(get_font(120), "GAME OVER", "white", (x, y - 60), anchor="center")
+
+        self.score_label = Label(get_font(60), "FINAL SCORE: {}", "white", SCREEN_CENTER,
+                                 anchor="center", values=(self.score,))
+
+        hint = f"PRESS '{key_name(RESTART_KEY)}' TO RESTART, " \
+               f"'{key_name(MENU_KEY)}' TO GO TO MAIN MENU"
+        self.hint_label = Label(get_font(40), hint, "white", (x, y + 50), anchor="center")
@@ -3,6 +3,8 @@
 """
 Contains `StateManager`.
 """
+import pygame as pg
+
 from . import (State, WrongState, GameState, GameProtocol,
                PlayState, GameOverState, MenuState, PauseState)
 
@@ -10,28 +12,90 @@ from . import (State, WrongState, GameState, GameProtocol,
 class StateManager:
     """
     An object used to manage the active state of the game.
+
+    States are created the first time they are needed, then kept for
+    the whole game, so that their sprites, fonts and texts are loaded once.
+
+    Active states form a stack: `PauseState` and `GameOverState` are pushed
+    over `PlayState`, which stays frozen below them until they are popped.
+    The active state is the one on top.
+
+    Each time the active state changes, the SDL event queue is set to only take
+    the events it handles, so that the others never reach Python.
     """
+    _state_types = {
+        State.MENU: MenuState,
+        State.PLAYING: PlayState,
+        State.PAUSE: PauseState,
+        State.GAME_OVER: GameOverState,
+    }  # type: dict[State, type[GameState]]
 
     def __init__(self, game: GameProtocol):
-        self._game = game                                # type: GameProtocol
-        self.__states = {
-            State.MENU: MenuState(self._game),
-            State.PLAYING: PlayState(self._game),
-            State.PAUSE: PauseState(self._game),
-            State.GAME_OVER: GameOverState(self._game),
-        }                                                # type: dict[State: GameState]
-        self.__active = State.MENU                       # type: State
+        self._game = game     # type: GameProtocol
+        self.__states = {}    # type: dict[State, GameState]
+        self.__stack = []     # type: list[State]
+        self.set_state(State.MENU)
+
+    def get_state(self, state: State) -> GameState:
+        """
+        Returns the `GameState` of `state`, creating it if it wasn't needed so far.
+
+        :param state: A `State`.
+        :return: Its `GameState`.
+        """
+        if state not in self.__states:
+            if state not in self._state_types:
+                raise WrongState()
+            self.__states[state] = self._state_types[state](self._game)
+        return self.__states[state]
 
     def set_state(self, state: State) -> None:
         """
-        Sets the active state of the game.
+        Sets the active state of the game, emptying the state stack.
 
         :param state: the `State` to set as active.
         """
-        if state not in self.__states:
-            raise WrongState()
+        game_state = self.get_state(state)
+        self.__stack = [state]
+        self._filter_events()
+        game_state.enter()
 
-        self.__active = state
+    def push_state(self, state: State) -> None:
+        """
+        Makes `state` the active state, keeping the current one frozen below it.
+
+        :param state: the `State` to push.
+        """
+        game_state = self.get_state(state)
+        self.__stack.append(state)
+        self._filter_events()
+        game_state.enter()
+
+    def pop_state(self) -> None:
+        """
+        Leaves the active state, making the state below it active again.
+        """
+        assert len(self.__stack) > 1
+        self.__stack.pop()
+        self._filter_events()
+        self.active_state().enter()
+
+    def _filter_events(self) -> None:
+        """
+        Blocks the events the active state has no handler for.
+        Headless games are given their events and leave the SDL event queue alone.
+        """
+        if self._game.headless:
+            return
+
+        pg.event.set_blocked(None)
+        pg.event.set_allowed(list(self.active_state().handled_event_types()))
+
+    def active(self) -> State:
+        """
+        Returns the currently active `State`.
+        """
+        return self.__stack[-1]
 
     def active_state(self) -> GameState:
         """
@@ -39,40 +103,44 @@ class StateManager:
 
         :return: The active `GameState`.
         """
-        return self.__states[self.__active]
+        return self.__states[self.__stack[-1]]
 
     def new_game(self) -> None:
         """
         Starts a new game.
         """
-        assert self.__active in (State.MENU, State.GAME_OVER)
-        self.__states[State.PLAYING] = PlayState(self._game)
+        assert self.active() in (State.MENU, State.GAME_OVER)
+        play = self.get_state(State.PLAYING)
+        play.reset()
         self.set_state(State.PLAYING)
 
     def resume_game(self) -> None:
         """
         Resumes the current game.
         """
-        assert self.__active in (State.PAUSE, State.MENU)
-        self.set_state(State.PLAYING)
+        assert self.active() in (State.PAUSE, State.MENU)
+        if self.active() is State.PAUSE:
+            self.pop_state()
+        else:
+            self.set_state(State.PLAYING)
 
     def main_menu(self) -> None:
         """
         Goes to main menu.
         """
-        assert self.__active is not State.MENU
+        assert self.active() is not State.MENU
         self.set_state(State.MENU)
 
     def pause_game(self) -> None:
         """
         Pauses the game.
         """
-        assert self.__active is State.PLAYING
-        self.set_state(State.PAUSE)
+        assert self.active() is State.PLAYING
+        self.push_state(State.PAUSE)
 
     def game_over(self) -> None:
         """
         Ends the current game.
         """
-        assert self.__active is State.PLAYING
-        self.set_state(State.GAME_OVER)
+        assert self.active() is State.PLAYING
+        self.push_state(State.GAME_OVER)
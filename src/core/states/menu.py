@@ -8,17 +8,19 @@ import sys
 
 import pygame as pg
 
-from data import get_font, get_sprite, SCREEN_RES, SCREEN_CENTER
-from entities import StaticEntity, Button
+from data import get_font, get_scaled_sprite, SCREEN_RES, SCREEN_CENTER
+from entities import StaticEntity, Button, ButtonGroup
 
-from .state import GameState
+from .state import GameState, on_event
 
 
 class MenuState(GameState):
+    _dirty_rendering = True
 
     # Re-implemented abstract methods from base class
 
     def _init(self):
+        self.bg_color = (94, 129, 162)
         font = get_font(70)
         btn_color = (24, 59, 92)
         self.buttons = [
@@ -34,54 +36,38 @@ class MenuState(GameState):
             btn.rect.center = (x_btn, y_btn)
             y_btn += y_segment
 
-        logo = get_sprite("player", "player_stand.png")
-        logo_res = tuple(n * 3 for n in logo.get_rect().size)
-        logo = pg.transform.scale(logo, logo_res)
+        self.button_group = ButtonGroup(self.buttons, self.bg_color)
 
-        self.logo = StaticEntity(logo)
+        self.logo = StaticEntity(get_scaled_sprite("player", "player_stand.png", 3))
         self.logo.rect.center = x_segment, SCREEN_CENTER[1]
 
     def _loop(self, dt):
         continue_btn = self.buttons[0]
         continue_btn.active = self._game.has_active_game()
 
-    def _process_event(self, event, dt):
-        if event.type == pg.MOUSEMOTION:
-            for btn in self.buttons:
-                if btn.box.collidepoint(event.pos):
-                    self._set_focused(btn)
-                    break
-                else:
-                    self._unfocus()
-
-        elif event.type == pg.MOUSEBUTTONDOWN and event.button == pg.BUTTON_LEFT:
-            for btn in self.buttons:
-                if btn.focused:
-                    btn.press()
-                    break
-
     def _update_screen(self):
-        self.screen.fill((94, 129, 162))
-        self.logo.blit(self.screen)
+        if self._full_redraw:
+            self.screen.fill(self.bg_color)
+            self.logo.blit(self.screen)
+            self.button_group.invalidate()
 
-        for btn in self.buttons:
-            btn.blit(self.screen)
+        # Only buttons that changed since last frame are redrawn
+        self.mark_dirty(*self.button_group.draw(self.screen))
 
     # Own methods
 
-    def _set_focused(self, button: Button) -> None:
+    @on_event(pg.MOUSEMOTION)
+    def _hover(self, event: pg.event.Event) -> None:
         """
-        Sets the currently focused button.
-
-        :param button: The button to focus on.
+        Focuses the button under the mouse.
         """
-        assert button in self.buttons
-        self._unfocus()
-        button.focused = True
+        self.button_group.focus(self.button_group.button_at(event.pos))
 
-    def _unfocus(self) -> None:
+    @on_event(pg.MOUSEBUTTONDOWN, pg.BUTTON_LEFT)
+    def _click(self, event: pg.event.Event) -> None:
         """
-        Removes the focus from all the buttons.
+        Presses the focused button.
         """
-        for btn in self.buttons:
-            btn.focused = False
+        focused = self.button_group.focused
+        if focused is not None:
+            focused.press()
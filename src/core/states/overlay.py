@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains abstract class for game states that are drawn over
+a frozen frame of the previous state, fading it out.
+"""
+from abc import abstractmethod
+from functools import lru_cache
+from typing import Iterable
+
+import pygame as pg
+
+from data import SCREEN_RES, MAX_FPS
+from entities import Entity
+
+from .state import GameState
+
+
+@lru_cache
+def _fade_table(alpha: int) -> tuple[int, ...]:
+    """
+    Returns the opacity reached at each fade step by a layer
+    blended `alpha` times onto itself, once per step.
+
+    :param alpha: Opacity added at each step.
+    :return: Opacity at each step, until the layer is fully opaque.
+    """
+    table = []
+    transparency = 1.
+    opacity = 0
+    while opacity < 255:
+        transparency *= 1 - alpha / 255
+        opacity = min(255, round(255 * (1 - transparency)))
+        table.append(opacity)
+    return tuple(table)
+
+
+class OverlayState(GameState):
+    """
+    Abstract class for a state that snapshots the screen when entered and
+    draws a fading background and some text over it.
+
+    The fade advances `MAX_FPS` steps per second, whatever the frame rate is.
+    Each step is composed from the snapshot and two cached layers,
+    and nothing is drawn once the fade is over.
+    """
+    _dirty_rendering = True
+    _background_color = "black"  # type: str
+    _background_alpha = 8        # type: int
+    _text_alpha = 16             # type: int
+
+    def __init__(self, game) -> None:
+        self._snapshot = pg.Surface(SCREEN_RES)     # type: pg.Surface
+        self._background = pg.Surface(SCREEN_RES)   # type: pg.Surface
+        self._text_layer = None                     # type: pg.Surface
+        self._text_pos = (0, 0)                     # type: tuple[int, int]
+        self._elapsed = 0.                          # type: float
+        self._step = -1                             # type: int
+        super().__init__(game)
+
+        self._background.fill(self._background_color)
+        self._background_fade = _fade_table(self._background_alpha)  # type: tuple[int, ...]
+        self._text_fade = _fade_table(self._text_alpha)              # type: tuple[int, ...]
+        self._last_step = max(len(self._background_fade), len(self._text_fade)) - 1  # type: int
+
+    def enter(self) -> None:
+        super().enter()
+        self._snapshot.blit(self.screen, (0, 0))
+        self._build_text_layer(self._texts())
+        self._elapsed = 0.
+        self._step = -1
+
+    def _loop(self, dt):
+        self._elapsed += dt
+
+    def _update_screen(self):
+        step = min(int(self._elapsed * MAX_FPS // 1000), self._last_step)
+        if step == self._step and not self._full_redraw:
+            # Nothing changed since last drawn step
+            return
+
+        self._step = step
+        self._background.set_alpha(self._background_fade[min(step, len(self._background_fade) - 1)])
+        self._text_layer.set_alpha(self._text_fade[min(step, len(self._text_fade) - 1)])
+
+        self.screen.blit(self._snapshot, (0, 0))
+        self.mark_dirty(self.screen.blit(self._background, (0, 0)))
+        self.screen.blit(self._text_layer, self._text_pos)
+
+    # Own methods
+
+    def _build_text_layer(self, texts: Iterable[Entity]) -> None:
+        """
+        Draws `texts` onto a transparent layer, large enough to contain them all.
+
+        :param texts: Entities to draw on the layer.
+        """
+        texts = list(texts)
+        area = texts[0].rect.unionall([t.rect for t in texts[1:]])
+
+        if self._text_layer is None or self._text_layer.get_size() != area.size:
+            self._text_layer = pg.Surface(area.size, pg.SRCALPHA)
+        self._text_layer.fill((0, 0, 0, 0))
+
+        for text in texts:
+            self._text_layer.blit(text.surf, text.rect.move(-area.x, -area.y))
+        self._text_pos = area.topleft
+
+    @abstractmethod
+    def _texts(self) -> Iterable[Entity]:
+        """
+        Returns the texts drawn over the background.
+        Called each time the state is entered.
+        """
@@ -4,65 +4,131 @@
 Contains `PlayState` class, which is the game state
 in which the player can play the game.
 """
+from typing import TYPE_CHECKING, Optional
+
 import pygame as pg
 from pygame.locals import *
 
-from data import get_sprite, get_font
+from data import Layer, RenderLayer, get_sprite, get_font
 from data.const.settings import *
 from data.const.keybindings import *
 
-from entities import StaticEntity, Actor
+from entities import StaticEntity, Actor, ActorStore, Label, Pool
 from entities.components import BaseJump, DoubleJump, JetpackJump, RocketJump
 
-from .state import GameState
+from ..collision import SpatialHash
+from .state import GameState, on_event
+
+if TYPE_CHECKING:
+    from ..simulation import Snapshot, SnapshotBuffer
 
 
 class PlayState(GameState):
+    """
+    When `snapshot` is set, the state is drawn from it instead of from its entities,
+    which a simulation thread may be updating meanwhile, see `publish()`.
+    """
+    _dirty_rendering = True
 
     # Re-implemented abstract methods from base class
 
     def _init(self):
         self._init_entities()
         self._init_hud_elements()
+        self._moving_rects = []  # type: list[pg.Rect]
+        self.snapshot = None     # type: Optional[Snapshot]
+        self.reset()
 
     def _loop(self, dt):
+        self.actors.store_previous_positions()
         self._handle_movement(dt)
         self._check_collisions()
+        self._move_enemies(dt)
 
-    def _process_event(self, event, dt):
-        if event.type == KEYDOWN:
-            self._handle_key_down(event.key)
+    def _update_screen(self):
+        # Areas drawn last frame by moving elements are restored
+        # from the cached background and redrawn where needed.
+        queue = self.render_queue
+        if self._full_redraw:
+            queue.submit(self.background, (0, 0), layer=RenderLayer.BACKGROUND)
+        else:
+            self._restore_background(self._moving_rects)
+        self.mark_dirty(*self._moving_rects)
+
+        snapshot = self.snapshot
+        if snapshot is None:
+            self._update_hud(self.score, self.player.get_jump_type())
+            self._moving_rects = [self.player.submit(queue, RenderLayer.ACTORS, self.interpolation)]
+            for enemy in self.enemies:
+                self._moving_rects.append(enemy.submit(queue, RenderLayer.ACTORS, self.interpolation))
+        else:
+            self._update_hud(snapshot.score, snapshot.jump_type)
+            self._moving_rects = snapshot.submit(queue, RenderLayer.ACTORS, self.interpolation)
+        queue.flush()
 
-        elif event.type == KEYUP:
-            self._handle_key_up(event.key)
+        mouse_pos = pg.mouse.get_pos()
+        if snapshot is None:
+            self.collisions.sync(self.actors)
+            hovered = self.collisions.query_point(mouse_pos, Layer.ENEMY)
+        else:
+            hovered = snapshot.query_point(mouse_pos, Layer.ENEMY)
+        if hovered:
+            self._moving_rects.append(pg.draw.circle(self.screen, "gold", mouse_pos, 30, 5))
 
-        elif event.type == WINDOWFOCUSLOST:
-            self._game.pause_game()
+        self.mark_dirty(*self._moving_rects)
 
-        elif event.type == pg.MOUSEBUTTONDOWN:
-            if self.snail.rect.collidepoint(event.pos):
-                self.score += 5
+    def checksum(self):
+        return self.actors.checksum(self.score & 0xFFFFFFFF)
 
-    def _update_screen(self):
-        self.sky.blit(self.screen)
-        self.ground.blit(self.screen)
+    # Own methods
 
-        self._update_hud()
+    def reset(self) -> None:
+        """
+        Brings the state back to the start of a new game,
+        reusing its entities instead of creating new ones.
+        """
+        self.score = 0
+        for enemy in list(self.enemies):
+            self.despawn_enemy(enemy)
 
-        self.player.blit(self.screen)
-        self.snail.blit(self.screen)
+        if self.player.spawned:
+            self.player.despawn()
+        self.player.spawn(midbottom=(50, self.ground.rect.y))
 
-        mouse_pos = pg.mouse.get_pos()
-        if self.snail.rect.collidepoint(mouse_pos):
-            pg.draw.circle(self.screen, "gold", mouse_pos, 30, 5)
+        self.spawn_enemy(midbottom=(SCREEN_RES.width, self.ground.rect.y))
+        self._moving_rects = []
 
-        if self.snail.rect.right <= 0:
-            self.score += 100
-            self.snail.rect.left = SCREEN_RES.width
-        else:
-            self.snail.rect.x -= 1
+    def publish(self, snapshots: "SnapshotBuffer", tick: int) -> None:
+        """
+        Publishes a snapshot of the actors, score and jump type to be drawn from.
 
-    # Own methods
+        :param snapshots: Buffer to publish the snapshot to.
+        :param tick: Simulation tick that just ended.
+        """
+        actors = (self.player, *self.enemies)
+        snapshots.publish(tick, self.actors, [actor.row for actor in actors], tuple(actor.surf for actor in actors),
+                          self.score, self.player.get_jump_type())
+
+    def spawn_enemy(self, **rect_attrs) -> Actor:
+        """
+        Adds an enemy to the game, taking it from the enemy pool.
+
+        :param rect_attrs: `Rect` attributes to place the enemy with.
+        :return: The enemy.
+        """
+        enemy = self._enemy_pool.acquire()
+        enemy.spawn(**rect_attrs)
+        self.enemies.append(enemy)
+        return enemy
+
+    def despawn_enemy(self, enemy: Actor) -> None:
+        """
+        Removes an enemy from the game, giving it back to the enemy pool.
+
+        :param enemy: The enemy.
+        """
+        self.enemies.remove(enemy)
+        self._enemy_pool.release(enemy)
 
     def _init_entities(self) -> None:
         """
@@ -74,12 +140,27 @@ class PlayState(GameState):
         self.ground = StaticEntity(get_sprite("background", "ground.png"))
         self.ground.rect.topleft = (0, self.sky.rect.height)
 
+        self.background = pg.Surface(SCREEN_RES)
+        self.sky.blit(self.background)
+        self.ground.blit(self.background)
+
+        self.actors = ActorStore()
+        self.collisions = SpatialHash(COLLISION_CELL_SIZE)
+
         self.player = Actor(get_sprite("player", "player_stand.png"),
-                            (BaseJump, DoubleJump, JetpackJump, RocketJump))
-        self.player.rect.midbottom = (50, self.ground.rect.y)
+                            (BaseJump, DoubleJump, JetpackJump, RocketJump), store=self.actors, layer=Layer.PLAYER)
 
-        self.snail = Actor(get_sprite("snail", "snail1.png"))
-        self.snail.rect.midbottom = (SCREEN_RES.width, self.ground.rect.y)
+        self.enemies = []  # type: list[Actor]
+        self._enemy_pool = Pool(self._new_enemy, on_release=Actor.despawn, prewarm=ENEMY_POOL_SIZE)  # type: Pool[Actor]
+
+    def _new_enemy(self) -> Actor:
+        """
+        Creates an enemy for the enemy pool.
+        Enemies leave the store while in the pool, so it's despawned.
+        """
+        enemy = Actor(get_sprite("snail", "snail1.png"), store=self.actors, layer=Layer.ENEMY)
+        enemy.despawn()
+        return enemy
 
     def _init_hud_elements(self) -> None:
         """
@@ -88,34 +169,40 @@ class PlayState(GameState):
         self.font = get_font(50)
         self.score = 0
 
-        self.score_pos = (20, SCREEN_RES.height - 28)
-        self.jump_info_pos = (SCREEN_RES.width // 2, 30)
+        self.score_label = Label(self.font, "Score: {}", "black", (20, SCREEN_RES.height - 28),
+                                 anchor="midleft", bg_color="bisque2", values=(self.score,))
 
-        self.score_text = "Score: {}"
-        self.jump_info_text = "Press [{}] to change jump type. Using: {}"
+        self._change_jump_key_name = pg.key.name(CHANGE_JUMP_KEY).upper()
+        self.jump_info_label = Label(self.font, "Press [{}] to change jump type. Using: {}", "black",
+                                     (SCREEN_RES.width // 2, 30), anchor="midtop", bg_color="azure",
+                                     values=(self._change_jump_key_name, self.player.get_jump_type()))
 
-    def _update_hud(self) -> None:
+    def _update_hud(self, score: int, jump_type: str) -> None:
         """
         Draws hud elements on screen.
-        """
-        score_surf = self.font.render(self.score_text.format(self.score), False, "black")
-        score_rect = score_surf.get_rect(midleft=self.score_pos)
-        score_bg_rect = score_rect.inflate(10, 10)
-        score_bg_rect.y -= 4
-        pg.draw.rect(self.screen, "bisque2", score_bg_rect, border_radius=3)
-        self.screen.blit(score_surf, score_rect)
 
-        jump_info_surf = self.font.render(self.jump_info_text.format(pg.key.name(CHANGE_JUMP_KEY).upper(),
-                                                                     self.player.get_jump_type()),
-                                          False, "black")
+        :param score: Score shown.
+        :param jump_type: Jump type shown.
+        """
+        for label, values in ((self.score_label, (score,)),
+                              (self.jump_info_label, (self._change_jump_key_name, jump_type)),
+                              ):
+            old_area = label.area
+            if label.set_values(*values):
+                self._restore_background([old_area])
+                self.mark_dirty(old_area, label.area)
+            label.submit(self.render_queue, RenderLayer.HUD)
+
+    def _restore_background(self, rects: list[pg.Rect]) -> None:
+        """
+        Draws the background over the given screen areas.
 
-        jump_info_rect = jump_info_surf.get_rect(midtop=self.jump_info_pos)
-        jump_info_bg_rect = jump_info_rect.inflate(10, 10)
-        jump_info_bg_rect.y -= 4
-        pg.draw.rect(self.screen, "azure", jump_info_bg_rect, border_radius=3)
-        self.screen.blit(jump_info_surf, jump_info_rect)
+        :param rects: Areas to restore.
+        """
+        for rect in rects:
+            self.render_queue.submit(self.background, rect, rect, RenderLayer.BACKGROUND)
 
-    def _handle_movement(self, dt: int) -> None:
+    def _handle_movement(self, dt: float) -> None:
         """
         Handles player movement.
 
@@ -127,7 +214,7 @@ class PlayState(GameState):
         # keys = pg.key.get_pressed()
         # x += int(keys[MOVE_RIGHT_KEY]) - int(keys[MOVE_LEFT_KEY])
 
-        x += (int(self.keys_pressed[MOVE_RIGHT_KEY]) - int(self.keys_pressed[MOVE_LEFT_KEY])) * dt * 0.5
+        x += (int(self.keys_pressed[MOVE_RIGHT_KEY]) - int(self.keys_pressed[MOVE_LEFT_KEY])) * dt * PLAYER_SPEED
         if self.keys_pressed[JUMP_KEY]:
             self.player.jump()
 
@@ -135,49 +222,84 @@ class PlayState(GameState):
 
         player_rect = self.player.rect
         if player_rect.left < 0:
-            player_rect.left = 0
+            self.player.place(left=0)
         elif player_rect.right > SCREEN_RES.width:
-            player_rect.right = SCREEN_RES.width
+            self.player.place(right=SCREEN_RES.width)
 
-        for ent in (self.player, self.snail):
-            ent.apply_gravity(dt)
+        self.actors.apply_gravity(dt)
 
     def _check_collisions(self) -> None:
         """
         Checks if objects are colliding.
+        The collision grid is synced here once per tick, and again by mouse picking,
+        since enemies move after it.
         """
-        if self.player.rect.colliderect(self.snail.rect):
+        self.collisions.sync(self.actors)
+        if self.collisions.pairs(Layer.PLAYER, Layer.ENEMY):
             self._game.game_over()
 
-        top_ground = self.ground.rect.top
-        for ent in (self.player, self.snail):
-            if top_ground < ent.rect.bottom:
-                ent.rect.bottom = top_ground
-                ent.landed()
+        # Landed actors are reset by the store
+        self.actors.clamp_to_ground(self.ground.rect.top)
 
-    def _handle_key_down(self, key: int) -> None:
+    def _move_enemies(self, dt: float) -> None:
         """
-        Handles `KEYDOWN` events.
+        Moves enemies towards the player. Enemies that leave the screen
+        are despawned and replaced by a new one, scoring.
 
-        :param key: Pressed key.
+        :param dt: delta time.
+        """
+        for enemy in list(self.enemies):
+            if enemy.rect.right <= 0:
+                self.score += 100
+                self.despawn_enemy(enemy)
+                self.spawn_enemy(bottomleft=(SCREEN_RES.width, self.ground.rect.y))
+            else:
+                enemy.move(x=-SNAIL_SPEED * dt)
+
+    @on_event(KEYDOWN)
+    def _press_key(self, event: pg.event.Event) -> None:
+        """
+        Marks movement keys as pressed.
         """
-        if key in self.keys_pressed:
-            self.keys_pressed[key] = True
+        if event.key in self.keys_pressed:
+            self.keys_pressed[event.key] = True
 
-        elif key is PAUSE_KEY:
-            self._game.pause_game()
+    @on_event(KEYUP)
+    def _release_key(self, event: pg.event.Event) -> None:
+        """
+        Marks movement keys as released.
+        """
+        if event.key in self.keys_pressed:
+            self.keys_pressed[event.key] = False
 
-        elif key is MENU_KEY:
-            self._game.main_menu()
+    @on_event(KEYDOWN, PAUSE_KEY)
+    @on_event(WINDOWFOCUSLOST)
+    def _pause(self, event: pg.event.Event) -> None:
+        """
+        Pauses the game.
+        """
+        self._game.pause_game()
 
-    def _handle_key_up(self, key: int) -> None:
+    @on_event(KEYDOWN, MENU_KEY)
+    def _main_menu(self, event: pg.event.Event) -> None:
+        """
+        Goes to main menu.
         """
-        Handles `KEYUP` events.
+        self._game.main_menu()
 
-        :param key: Released key.
+    @on_event(KEYUP, CHANGE_JUMP_KEY)
+    def _change_jump_type(self, event: pg.event.Event) -> None:
+        """
+        Makes the player use the next jump type.
         """
-        if key in self.keys_pressed:
-            self.keys_pressed[key] = False
+        self.player.change_jump_type()
 
-        elif key == CHANGE_JUMP_KEY:
-            self.player.change_jump_type()
+    @on_event(pg.MOUSEBUTTONDOWN)
+    def _click(self, event: pg.event.Event) -> None:
+        """
+        Gives points for clicking on enemies.
+        The grid was synced before enemies moved in the last tick, so it's synced again first.
+        """
+        self.collisions.sync(self.actors)
+        if self.collisions.query_point(event.pos, Layer.ENEMY):
+            self.score += 5
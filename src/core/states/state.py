@@ -6,11 +6,13 @@ Contains abstract class for game states.
 import sys
 
 from abc import ABC, abstractmethod
-from typing import Protocol
+from typing import Callable, Iterable, Optional, Protocol
 
 import pygame as pg
 
-from data import State
+from data import State, PROFILER_KEY
+
+from ..render import RenderQueue
 
 
 class WrongState(Exception):
@@ -19,25 +21,95 @@ class WrongState(Exception):
     """
 
 
+EventHandler = Callable[["GameState", pg.event.Event], None]
+
+
+def on_event(event_type: int, code: Optional[int] = None) -> Callable[[EventHandler], EventHandler]:
+    """
+    Decorator adding a method of a `GameState` to the event dispatch table of its class.
+    Can be stacked to handle more kinds of events with the same method.
+
+    :param event_type: Type of the events handled.
+    :param code: Key (or mouse button) of the events handled. If None, the method handles
+                 every event of `event_type` without a handler for its own key.
+    :return: The decorator.
+    """
+    def decorator(handler: EventHandler) -> EventHandler:
+        handler.__dict__.setdefault("_handles", []).append((event_type, code))
+        return handler
+    return decorator
+
+
+def coalesce_motion(events: Iterable[pg.event.Event]) -> list[pg.event.Event]:
+    """
+    Merges each run of consecutive `MOUSEMOTION` events into a single event at the last
+    position, moved by the sum of their movements. Motion events are never merged across
+    other events, so that clicks still happen where the mouse was at the time.
+
+    :param events: Events, oldest first.
+    :return: The events, with at most one motion event between other events.
+    """
+    merged = []
+    for event in events:
+        if event.type == pg.MOUSEMOTION and merged and merged[-1].type == pg.MOUSEMOTION:
+            last = merged[-1]
+            rel = (last.rel[0] + event.rel[0], last.rel[1] + event.rel[1])
+            merged[-1] = pg.event.Event(pg.MOUSEMOTION, {**event.dict, "rel": rel})
+        else:
+            merged.append(event)
+    return merged
+
+
 class GameProtocol(Protocol):
     keys_pressed: dict[int, bool]
     screen: pg.Surface
     score: int
+    headless: bool
+    rendering: bool
     def new_game(self) -> None: ...
     def resume_game(self) -> None: ...
     def main_menu(self) -> None: ...
     def pause_game(self) -> None: ...
     def game_over(self) -> None: ...
     def has_active_game(self) -> bool: ...
+    def toggle_profiler(self) -> None: ...
 
 
 class GameState(ABC):
     """
     Abstract class for a game state.
+
+    States that set `_dirty_rendering` to `True` only update the display areas
+    marked with `mark_dirty()`, except for the first frame drawn after they are
+    entered (when `_full_redraw` is `True`), which must be drawn entirely.
+
+    Blits submitted to `render_queue` while drawing are flushed onto the screen
+    after `_update_screen()`, unless the state flushes them earlier.
+
+    Events are dispatched through a table mapping (event type, key) to the methods
+    decorated with `on_event()`, inherited and extended by subclasses. A handler
+    registered for a key takes precedence over the one for its whole event type.
+    `handled_event_types()` tells which events the state needs at all.
     """
+    _dirty_rendering = False  # type: bool
+    _event_handlers = {}      # type: dict[tuple[int, Optional[int]], EventHandler]
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        # Handlers of subclasses override those of their bases for the same events
+        handlers = {}
+        for klass in reversed(cls.__mro__):
+            for attr in vars(klass).values():
+                for event_type, code in getattr(attr, "_handles", ()):
+                    handlers[event_type, code] = attr
+        cls._event_handlers = handlers
 
     def __init__(self, game: GameProtocol) -> None:
-        self._game = game  # type: GameProtocol
+        self._game = game         # type: GameProtocol
+        self._dirty_rects = []    # type: list[pg.Rect]
+        self._full_redraw = True  # type: bool
+        self.interpolation = 1.   # type: float
+        self.render_queue = RenderQueue(game.screen)  # type: RenderQueue
         self._init()
 
     @property
@@ -62,57 +134,155 @@ class GameState(ABC):
         Initialize state.
         """
 
-    def loop(self, dt: int) -> None:
+    def enter(self) -> None:
         """
-        Runs game loop.
+        Called each time the state becomes the active state.
+        """
+        self._full_redraw = True
+
+    def reset(self) -> None:
+        """
+        Brings the state back to how it was when created, keeping its loaded assets.
+        Does nothing by default.
+        """
+
+    def redraw(self) -> None:
+        """
+        Makes the next frame be drawn and shown entirely.
+        """
+        self._full_redraw = True
+
+    def loop(self, dt: float, events: Optional[Iterable[pg.event.Event]] = None) -> None:
+        """
+        Runs a single simulation tick of the game loop,
+        processing events before and drawing after it.
+
+        :param dt: delta time
+        :param events: Events to process. If None, events are taken from the SDL event queue.
+        """
+        self.process_events(dt, events)
+        self.tick(dt)
+
+        if self._game.rendering:
+            self.update_screen()
+
+    def tick(self, dt: float) -> None:
+        """
+        Advances the state simulation.
 
         :param dt: delta time
         """
-        self.process_events(dt)
         self._loop(dt)
-        self.update_screen()
 
     @abstractmethod
-    def _loop(self, dt: int) -> None:
+    def _loop(self, dt: float) -> None:
         """
         Runs game loop.
 
         :param dt: delta time
         """
 
-    def process_events(self, dt: int) -> None:
+    def process_events(self, dt: float, events: Optional[Iterable[pg.event.Event]] = None) -> None:
         """
         Processes game events.
 
         To be called at each iteration of the game loop.
 
         :param dt: delta time.
+        :param events: Events to process. If None, events are taken from the SDL event queue.
         """
-        for event in pg.event.get():
-
-            if event.type == pg.QUIT:
-                # Exit the game
-                sys.exit()
+        if events is None:
+            events = coalesce_motion(pg.event.get())
 
+        for event in events:
             self._process_event(event, dt)
 
-    @abstractmethod
-    def _process_event(self, event: pg.event.Event, dt: int) -> None:
+    def _process_event(self, event: pg.event.Event, dt: float) -> None:
         """
-        Processes a game event
+        Processes a game event, calling its handler in the dispatch table, if any.
 
         :param event: event to process.
         :param dt: delta time.
         """
+        handlers = self._event_handlers
+        attrs = event.dict
+        handler = handlers.get((event.type, attrs.get("key", attrs.get("button"))))
+        if handler is None:
+            handler = handlers.get((event.type, None))
+        if handler is not None:
+            handler(self, event)
+
+    @classmethod
+    def handled_event_types(cls) -> set[int]:
+        """
+        Returns the types of the events the state has handlers for.
+        """
+        return {event_type for event_type, _ in cls._event_handlers}
 
-    def update_screen(self) -> None:
+    @on_event(pg.QUIT)
+    def _quit(self, event: pg.event.Event) -> None:
+        """
+        Exits the game.
+        """
+        sys.exit()
+
+    @on_event(pg.KEYDOWN, PROFILER_KEY)
+    def _toggle_profiler(self, event: pg.event.Event) -> None:
+        """
+        Shows or hides the frame profiler.
+        """
+        self._game.toggle_profiler()
+
+    def checksum(self) -> int:
+        """
+        Returns a checksum of the simulation state, used to detect replays diverging.
+        States with no simulation state return 0.
+        """
+        return 0
+
+    def mark_dirty(self, *rects: pg.Rect) -> None:
+        """
+        Marks screen areas that changed in this frame and
+        must be updated on display.
+
+        :param rects: Changed areas.
+        """
+        self._dirty_rects.extend(rects)
+
+    def update_screen(self, interpolation: float = 1.) -> None:
+        """
+        Draws elements on screen and shows them on display.
+
+        :param interpolation: Fraction of simulation tick elapsed since the last tick,
+                              moving entities are drawn in between their last two positions.
+        """
+        self.draw(interpolation)
+        self.present()
+
+    def draw(self, interpolation: float = 1.) -> None:
         """
         Draws elements on screen.
+
+        :param interpolation: Fraction of simulation tick elapsed since the last tick,
+                              moving entities are drawn in between their last two positions.
         """
+        self.interpolation = interpolation
         self._update_screen()
+        self.render_queue.flush()
+
+    def present(self) -> None:
+        """
+        Shows on display what was drawn on screen.
+        """
+        if self._game.headless:
+            pass
+        elif self._full_redraw or not self._dirty_rendering:
+            pg.display.update()
+        elif self._dirty_rects:
+            pg.display.update(self._dirty_rects)
 
-        # Draw elements on display
-        pg.display.update()
+        self._full_redraw = False
+        self._dirty_rects.clear()
 
     @abstractmethod
     def _update_screen(self) -> None:
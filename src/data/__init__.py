@@ -7,3 +7,4 @@ from .dataclasses import *
 from .const import *
 from .enums import *
 from .get_assets import *
+from .transforms import *
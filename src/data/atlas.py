@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains texture atlases: many sprites packed into a single image.
+
+An atlas is a PNG image and a JSON index, mapping each sprite to its area of the image
+and to the size and modification time of the file it was packed from.
+At runtime the atlas image is decoded once, and sprites are subsurfaces of it.
+"""
+import json
+import os
+from typing import Iterable, Optional
+
+import pygame as pg
+
+_INDEX_VERSION = 1
+_INDEX_EXT = ".json"
+_IMAGE_EXT = ".png"
+_MAX_WIDTH = 4096  # Widest atlas tried, unless a sprite is wider
+
+
+def pack_rects(sizes: Iterable[tuple[int, int]], max_width: int) -> tuple[list[tuple[int, int]], tuple[int, int]]:
+    """
+    Places rects of the given sizes without overlapping, on shelves no wider than `max_width`.
+    Rects are placed tallest first, each on the first shelf it fits in.
+
+    :param sizes: Width and height of each rect.
+    :param max_width: Width of the shelves, at least the width of the widest rect.
+    :return: Top left corner of each rect, in the order of `sizes`, and the size of the area used.
+    """
+    sizes = list(sizes)
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [(0, 0)] * len(sizes)
+    shelves = []  # type: list[list[int]]  # [y, height, used width]
+    height = 0
+
+    for i in order:
+        w, h = sizes[i]
+        assert w <= max_width, f"rect {w}x{h} is wider than {max_width}"
+        for shelf in shelves:
+            if h <= shelf[1] and shelf[2] + w <= max_width:
+                break
+        else:
+            shelf = [height, h, 0]
+            shelves.append(shelf)
+            height += h
+
+        positions[i] = (shelf[2], shelf[0])
+        shelf[2] += w
+
+    width = max((x + sizes[i][0] for i, (x, _) in enumerate(positions)), default=0)
+    return positions, (width, height)
+
+
+def build_atlas(path: str, sources: dict[str, str], alpha: bool) -> dict[str, pg.Rect]:
+    """
+    Packs the images of `sources` into an atlas and writes it.
+    The widths tried are powers of two, keeping the one that gives the smallest image.
+
+    :param path: Path of the atlas without extension; the image and the index are written next to each other.
+    :param sources: A dict mapping sprite keys to image files.
+    :param alpha: Whether the sprites of the atlas are converted with per-pixel alpha at runtime.
+    :return: The area of each sprite in the atlas.
+    """
+    keys = sorted(sources)
+    images = [pg.image.load(sources[key]) for key in keys]
+    sizes = [image.get_size() for image in images]
+
+    widest = max(w for w, _ in sizes)
+    best = None
+    max_width = 1 << (widest - 1).bit_length()
+    while True:
+        positions, area = pack_rects(sizes, max_width)
+        if best is None or area[0] * area[1] < best[1][0] * best[1][1]:
+            best = positions, area
+        if area[1] <= max(h for _, h in sizes) or max_width >= _MAX_WIDTH:
+            # Wider shelves can't do better once everything fits on a single one
+            break
+        max_width *= 2
+    positions, area = best
+
+    # Pixels are copied as they are, like `convert_alpha()` or `convert()` do: the MAX blend
+    # over a blank surface doesn't blend with alpha. Opaque atlases have no alpha channel,
+    # which makes them faster to decode.
+    if alpha:
+        atlas, blend = pg.Surface(area, pg.SRCALPHA), pg.BLEND_RGBA_MAX
+    else:
+        atlas, blend = pg.Surface(area, 0, 24), pg.BLEND_RGB_MAX
+    rects = {}
+    for key, image, pos in zip(keys, images, positions):
+        rects[key] = atlas.blit(image, pos, special_flags=blend)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    pg.image.save(atlas, path + _IMAGE_EXT)
+
+    index = {
+        "version": _INDEX_VERSION,
+        "image": os.path.basename(path) + _IMAGE_EXT,
+        "alpha": alpha,
+        "sprites": {key: {"rect": list(rects[key]), **_source_stamp(sources[key])} for key in keys},
+    }
+    with open(path + _INDEX_EXT, "w") as f:
+        json.dump(index, f, indent=1)
+    return rects
+
+
+class Atlas:
+    """
+    An atlas loaded from disk, whose image is decoded the first time a sprite is taken from it.
+    """
+
+    def __init__(self, index_path: str) -> None:
+        """
+        :param index_path: Path of the atlas index.
+        """
+        with open(index_path) as f:
+            index = json.load(f)
+        if index.get("version") != _INDEX_VERSION:
+            raise ValueError(f"unsupported atlas index {index_path}")
+
+        self.image_path = os.path.join(os.path.dirname(index_path), index["image"])  # type: str
+        self.alpha = index["alpha"]                                                   # type: bool
+        self.entries = index["sprites"]                                               # type: dict[str, dict]
+        self._image = None                                                            # type: Optional[pg.Surface]
+
+    def rect(self, key: str) -> pg.Rect:
+        """
+        Returns the area of a sprite in the atlas.
+
+        :param key: Sprite key.
+        """
+        return pg.Rect(self.entries[key]["rect"])
+
+    def is_current(self, key: str, source: str) -> bool:
+        """
+        Tells whether the sprite packed as `key` still matches the file it was packed from.
+
+        :param key: Sprite key.
+        :param source: Path of the sprite image file.
+        """
+        entry = self.entries[key]
+        try:
+            stamp = _source_stamp(source)
+        except OSError:
+            return False
+        return entry["size"] == stamp["size"] and entry["mtime_ns"] == stamp["mtime_ns"]
+
+    def sprite(self, key: str) -> pg.Surface:
+        """
+        Returns a sprite as a subsurface of the atlas image, which shares its pixels.
+        Requires the display mode to be set, as the image is converted when decoded.
+
+        :param key: Sprite key.
+        """
+        if self._image is None:
+            image = pg.image.load(self.image_path)
+            self._image = image.convert_alpha() if self.alpha else image.convert()
+        return self._image.subsurface(self.rect(key))
+
+    def unload(self) -> None:
+        """
+        Forgets the decoded image; sprites already returned keep it alive.
+        """
+        self._image = None
+
+
+def load_atlases(atlas_dir: str) -> dict[str, Atlas]:
+    """
+    Reads every atlas index in `atlas_dir`.
+
+    :param atlas_dir: Directory of the atlases.
+    :return: A dict mapping sprite keys to the atlas they are in.
+    """
+    atlases = {}
+    if not os.path.isdir(atlas_dir):
+        return atlases
+
+    for name in sorted(os.listdir(atlas_dir)):
+        if name.endswith(_INDEX_EXT):
+            atlas = Atlas(os.path.join(atlas_dir, name))
+            atlases.update(dict.fromkeys(atlas.entries, atlas))
+    return atlases
+
+
+def _source_stamp(path: str) -> dict[str, int]:
+    """
+    Returns the size and modification time of a file, used to tell when a packed sprite is outdated.
+    """
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Builds derived assets from the files in the assets directory.
+
+Run with `python -m data.build atlas` to pack the sprites into texture atlases,
+or with `python -m data.build bundle` to write the sprite bundle.
+"""
+import argparse
+import sys
+
+from data import ATLAS_DIR, BUNDLE_PATH, build_sprite_atlases, build_sprite_bundle
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m data.build", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    atlas = commands.add_parser("atlas", help="pack sprites into texture atlases")
+    atlas.add_argument("groups", nargs="*", help="sprite groups to pack (default: all)")
+    atlas.add_argument("--single", action="store_true",
+                       help="pack every group together, in one atlas for opaque sprites and one for the others")
+    atlas.add_argument("--output", default=ATLAS_DIR, help=f"directory to write to (default: {ATLAS_DIR})")
+
+    bundle = commands.add_parser("bundle", help="write sprites, decoded, to a memory-mappable bundle")
+    bundle.add_argument("--workers", type=int, help="processes decoding sprites (default: one per CPU)")
+    bundle.add_argument("--output", default=BUNDLE_PATH, help=f"bundle to write (default: {BUNDLE_PATH})")
+    args = parser.parse_args()
+
+    if args.command == "atlas":
+        written = build_sprite_atlases(args.groups or None, args.single, args.output)
+        for name, count in written.items():
+            print(f"{name}: {count} sprites")
+    elif args.command == "bundle":
+        stats = build_sprite_bundle(args.output, args.workers)
+        print(f"{args.output}: {stats['decoded']} sprites decoded, {stats['reused']} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains sprite bundles: one file holding many sprites as raw, already decoded pixels.
+
+A bundle starts with a header and a JSON index, followed by the pixels of each sprite
+as 32 bit RGBA, the widest supported pixel format of `pg.image.frombuffer()`. At runtime
+the file is memory-mapped and sprites are made from the mapped pixels, so nothing is decoded
+and a single file is opened, however many sprites there are.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import pygame as pg
+
+_MAGIC = b"LPAB"
+_VERSION = 2
+_HEADER = struct.Struct("<4sHI")  # magic, version, index length
+_ALIGN = 64                       # Pixels of each sprite start on a cache line
+_PIXEL_FORMAT = "RGBA"  # "BGRA", the byte order of the usual display format, needs pygame 2.1.3
+
+
+def _decode(path: str) -> tuple[tuple[int, int], bytes]:
+    """
+    Decodes an image file into `_PIXEL_FORMAT` pixels. Run in worker processes.
+    """
+    image = pg.image.load(path)
+    return image.get_size(), pg.image.tostring(image, _PIXEL_FORMAT)
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build_bundle(path: str, sources: dict[str, str], workers: Optional[int] = None) -> dict[str, int]:
+    """
+    Writes a bundle of the images of `sources`.
+
+    If a bundle already exists at `path`, the pixels of sprites whose source has the same
+    content hash are copied from it; the other sources are decoded in worker processes.
+
+    :param path: Path of the bundle.
+    :param sources: A dict mapping sprite keys to image files.
+    :param workers: Number of worker processes, defaults to the number of CPUs.
+    :return: The number of sprites copied from the previous bundle and decoded.
+    """
+    hashes = {key: _file_hash(source) for key, source in sources.items()}
+
+    previous = None
+    try:
+        previous = Bundle(path)
+    except (OSError, ValueError):
+        pass
+
+    sprites = {}  # type: dict[str, tuple[tuple[int, int], bytes]]
+    stale = []
+    for key in sorted(sources):
+        entry = previous.entries.get(key) if previous is not None else None
+        if entry is not None and entry["hash"] == hashes[key]:
+            sprites[key] = ((entry["width"], entry["height"]), previous.pixels(key).tobytes())
+        else:
+            stale.append(key)
+    if previous is not None:
+        previous.close()
+
+    paths = [sources[key] for key in stale]
+    if len(paths) > 1 and (workers or os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(workers) as executor:
+            decoded = list(executor.map(_decode, paths))
+    else:
+        decoded = [_decode(p) for p in paths]
+    sprites.update(zip(stale, decoded))
+
+    index = {}
+    offset = 0
+    for key in sorted(sprites):
+        (width, height), pixels = sprites[key]
+        index[key] = {"offset": offset, "width": width, "height": height, "hash": hashes[key]}
+        offset += -(-len(pixels) // _ALIGN) * _ALIGN
+
+    index_data = json.dumps({"format": _PIXEL_FORMAT, "sprites": index}).encode()
+    data_start = -(-(_HEADER.size + len(index_data)) // _ALIGN) * _ALIGN
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(index_data)))
+        f.write(index_data)
+        for key in sorted(sprites):
+            f.seek(data_start + index[key]["offset"])
+            f.write(sprites[key][1])
+        f.truncate(data_start + offset)
+    # Replaced at once, so that running games never map a partial bundle
+    os.replace(temp, path)
+    return {"reused": len(sprites) - len(stale), "decoded": len(stale)}
+
+
+class Bundle:
+    """
+    A memory-mapped sprite bundle.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: Path of the bundle.
+        :raise ValueError: If the file is not a bundle, or of an unsupported version.
+        """
+        with open(path, "rb") as f:
+            # Copy on write: pages are shared with the file until a sprite is drawn onto
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)  # type: mmap.mmap
+
+        try:
+            magic, version, index_size = _HEADER.unpack_from(self._mmap)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"{path} is not a sprite bundle, or of an unsupported version")
+            index = json.loads(self._mmap[_HEADER.size:_HEADER.size + index_size])
+        except (struct.error, ValueError):
+            self._mmap.close()
+            raise
+
+        self.entries = index["sprites"]  # type: dict[str, dict]
+        self._data_start = -(-(_HEADER.size + index_size) // _ALIGN) * _ALIGN  # type: int
+        self._zero_copy = None           # type: Optional[bool]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def size(self, key: str) -> tuple[int, int]:
+        """
+        Returns the size of a sprite.
+
+        :param key: Sprite key.
+        """
+        entry = self.entries[key]
+        return entry["width"], entry["height"]
+
+    def pixels(self, key: str) -> memoryview:
+        """
+        Returns the mapped pixels of a sprite.
+
+        :param key: Sprite key.
+        """
+        entry = self.entries[key]
+        start = self._data_start + entry["offset"]
+        return memoryview(self._mmap)[start:start + entry["width"] * entry["height"] * 4]
+
+    def sprite(self, key: str, alpha: bool) -> pg.Surface:
+        """
+        Returns a sprite in the display pixel format, like `convert()` or `convert_alpha()` would.
+        Sprites with per-pixel alpha are surfaces over the mapped pixels when the display
+        format allows it; other sprites are copied out of them.
+
+        :param key: Sprite key.
+        :param alpha: If True, keep per-pixel alpha.
+        """
+        surface = pg.image.frombuffer(self.pixels(key), self.size(key), _PIXEL_FORMAT)
+        if not alpha:
+            return surface.convert()
+
+        if self._zero_copy is None:
+            display = pg.display.get_surface()
+            self._zero_copy = display is not None and display.get_masks()[:3] == surface.get_masks()[:3]
+        return surface if self._zero_copy else surface.convert_alpha()
+
+    def close(self) -> None:
+        """
+        Unmaps the bundle. Fails with `BufferError` while sprites over its pixels are alive.
+        """
+        self._mmap.close()
+
+
+def load_bundle(path: str) -> Optional[Bundle]:
+    """
+    Opens a sprite bundle, if there's a valid one at `path`.
+
+    :param path: Path of the bundle.
+    :return: The bundle, or None.
+    """
+    try:
+        return Bundle(path)
+    except (OSError, ValueError):
+        return None
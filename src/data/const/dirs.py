@@ -10,5 +10,8 @@ CONST_DIR = os.path.dirname(__file__)
 SRC_DIR = os.path.realpath(os.path.join(CONST_DIR, "..", ".."))
 ASSETS_DIR = os.path.join(SRC_DIR, "assets")
 GRAPHICS_DIR = os.path.join(ASSETS_DIR, "graphics")
+ATLAS_DIR = os.path.join(ASSETS_DIR, "atlas")
+BUNDLE_PATH = os.path.join(ASSETS_DIR, "sprites.bundle")
+TRANSFORM_CACHE_DIR = os.path.join(ASSETS_DIR, ".cache", "transforms")
 AUDIO_DIR = os.path.join(ASSETS_DIR, "audio")
 FONT_DIR = os.path.join(ASSETS_DIR, "font")
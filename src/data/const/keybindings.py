@@ -14,3 +14,5 @@ CHANGE_JUMP_KEY = _locals.K_q
 RESTART_KEY = _locals.K_SPACE
 PAUSE_KEY = _locals.K_SPACE
 MENU_KEY = _locals.K_ESCAPE
+
+PROFILER_KEY = _locals.K_F3
@@ -11,5 +11,25 @@ SCREEN_CENTER = (SCREEN_RES.width // 2, SCREEN_RES.height // 2)
 GAME_TITLE = "Sup?"
 MAX_FPS = 60
 
+# Simulation
+TICK_RATE = 60                # Simulation ticks per second, independent of MAX_FPS
+TICK_DT = 1000 / TICK_RATE    # Milliseconds simulated by each tick
+MAX_FRAME_TIME = 250          # Milliseconds simulated at most per frame, to avoid the spiral of death
+REFERENCE_DT = 1000 / 60      # Velocities are expressed in pixels per REFERENCE_DT milliseconds
+
+# Pools
+ENEMY_POOL_SIZE = 8           # Enemies created in advance by each game
+
+# Collisions
+COLLISION_CELL_SIZE = 64      # Side of spatial hash cells, in pixels
+
 # Gameplay
 GRAVITY = 0.11
+PLAYER_SPEED = 0.5            # Pixels per millisecond
+SNAIL_SPEED = 60 / 1000       # Pixels per millisecond
+
+# Assets
+SPRITE_CACHE_BYTES = 32 * 1024 * 1024
+FONT_CACHE_SIZE = 16
+TEXT_CACHE_SIZE = 256
+TRANSFORM_CACHE_BYTES = 16 * 1024 * 1024
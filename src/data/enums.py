@@ -3,7 +3,7 @@
 """
 Contains game `Enums`.
 """
-from enum import Enum
+from enum import Enum, IntEnum, IntFlag
 
 
 class State(Enum):
@@ -14,3 +14,34 @@ class State(Enum):
     PLAYING = 1
     PAUSE = 2
     GAME_OVER = 3
+
+
+class Layer(IntFlag):
+    """
+    Collision layers. Collision queries take a mask of layers to consider.
+    """
+    NONE = 0
+    PLAYER = 1
+    ENEMY = 2
+
+
+class RenderLayer(IntEnum):
+    """
+    Layers of the render queue, drawn in ascending order.
+    """
+    BACKGROUND = 0
+    HUD = 1
+    ACTORS = 2
+
+
+class Action(IntFlag):
+    """
+    Actions of the player in a simulation tick, see `core.BatchPlay`.
+    Movement and jump keys are held during the tick, the jump type
+    is changed before it, like when its key is released.
+    """
+    NONE = 0
+    LEFT = 1
+    RIGHT = 2
+    JUMP = 4
+    CHANGE_JUMP = 8
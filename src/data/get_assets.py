@@ -2,12 +2,25 @@
 # -*- coding: utf-8 -*-
 """
 Contains functions to import sprites.
+
+Loaded sprites and fonts are kept in bounded LRU caches, so they are
+decoded/built only once. Returned objects are shared: don't modify them in place.
+
+Sprites are taken, in order of preference, from the sprite bundle at `BUNDLE_PATH`
+(see `build_sprite_bundle()`), from a texture atlas under `ATLAS_DIR` (see `build_sprite_atlases()`)
+unless their file changed since, or from their own file.
+The bundle is used as it is: it must be rebuilt when sprites change.
 """
 import os
+from typing import Iterable, Optional
 
 import pygame as pg
 
-from . import GRAPHICS_DIR, FONT_DIR
+from utils import LRUCache
+
+from . import ATLAS_DIR, BUNDLE_PATH, GRAPHICS_DIR, FONT_DIR, SPRITE_CACHE_BYTES, FONT_CACHE_SIZE, TEXT_CACHE_SIZE
+from .atlas import Atlas, build_atlas, load_atlases
+from .bundle import Bundle, build_bundle, load_bundle
 
 
 _alpha_for_sprite_group = {
@@ -17,6 +30,67 @@ _alpha_for_sprite_group = {
     "snail": True,
 }
 
+_sprite_extensions = (".png",)
+
+
+def _surface_bytes(surface: pg.Surface) -> int:
+    """
+    Returns the memory used by `surface` pixels.
+    """
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+
+_sprite_cache = LRUCache(max_bytes=SPRITE_CACHE_BYTES, sizeof=_surface_bytes)  # type: LRUCache
+_font_cache = LRUCache(max_entries=FONT_CACHE_SIZE)                             # type: LRUCache
+_text_cache = LRUCache(max_entries=TEXT_CACHE_SIZE, sizeof=_surface_bytes)      # type: LRUCache
+_atlases = None                                                                  # type: Optional[dict[str, Atlas]]
+_bundle = None                                                                   # type: Optional[Bundle]
+_bundle_opened = False                                                           # type: bool
+
+
+def _get_bundle() -> Optional[Bundle]:
+    """
+    Returns the sprite bundle, if any, opening it the first time a sprite is needed.
+    """
+    global _bundle, _bundle_opened
+    if not _bundle_opened:
+        _bundle = load_bundle(BUNDLE_PATH)
+        _bundle_opened = True
+    return _bundle
+
+
+def _atlas_for(group: str, name: str, alpha: bool) -> Optional[Atlas]:
+    """
+    Returns the atlas a sprite can be taken from, if any.
+    Atlas indexes are read the first time a sprite is needed.
+    """
+    global _atlases
+    if _atlases is None:
+        _atlases = load_atlases(ATLAS_DIR)
+
+    key = f"{group}/{name}"
+    atlas = _atlases.get(key)
+    if atlas is None or atlas.alpha != alpha or not atlas.is_current(key, os.path.join(GRAPHICS_DIR, group, name)):
+        return None
+    return atlas
+
+
+def _load_sprite(group: str, name: str, alpha: bool) -> pg.Surface:
+    """
+    Loads a sprite from the bundle, its atlas or its file, converted to the display pixel format.
+    """
+    bundle = _get_bundle()
+    key = f"{group}/{name}"
+    if bundle is not None and key in bundle:
+        return bundle.sprite(key, alpha)
+
+    atlas = _atlas_for(group, name, alpha)
+    if atlas is not None:
+        return atlas.sprite(key)
+
+    raw_img = pg.image.load(os.path.join(GRAPHICS_DIR, group, name))
+    return raw_img.convert_alpha() if alpha else raw_img.convert()
+
 
 def get_sprite(group: str, name: str) -> pg.Surface:
     """
@@ -29,17 +103,189 @@ def get_sprite(group: str, name: str) -> pg.Surface:
     """
     assert group in _alpha_for_sprite_group, f"Only this groups accepted: {list(_alpha_for_sprite_group)}"
     alpha = _alpha_for_sprite_group[group]
-    raw_img = pg.image.load(os.path.join(GRAPHICS_DIR, group, name))
-    return raw_img.convert_alpha() if alpha else raw_img.convert()
+    return _sprite_cache.get_or_create((group, name, alpha), lambda: _load_sprite(group, name, alpha))
+
+
+def sprite_size(group: str, name: str) -> tuple[int, int]:
+    """
+    Returns the size of a sprite, loading it without converting it
+    if not cached, so that no display is needed.
+
+    :param group: Folder name.
+    :param name: Sprite name.
+    :return: Width and height of the sprite.
+    """
+    assert group in _alpha_for_sprite_group, f"Only this groups accepted: {list(_alpha_for_sprite_group)}"
+    alpha = _alpha_for_sprite_group[group]
+    sprite = _sprite_cache.get((group, name, alpha))
+    if sprite is not None:
+        return sprite.get_size()
+
+    bundle = _get_bundle()
+    if bundle is not None and f"{group}/{name}" in bundle:
+        return bundle.size(f"{group}/{name}")
+
+    atlas = _atlas_for(group, name, alpha)
+    if atlas is not None:
+        return atlas.rect(f"{group}/{name}").size
+    return pg.image.load(os.path.join(GRAPHICS_DIR, group, name)).get_size()
 
 
 def get_font(size: int, default: bool = False) -> pg.font.Font:
     """
     Returns game font at the selected size.
 
+    The font module is initialized by the first call.
+
     :param size: Font size.
     :param default: If True, use default pygame font.
     :return: Game font.
     """
+    if not pg.font.get_init():
+        pg.font.init()
     font_name = None if default else os.path.join(FONT_DIR, "Pixeltype.ttf")
-    return pg.font.Font(font_name, size)
+    return _font_cache.get_or_create((font_name, size), lambda: pg.font.Font(font_name, size))
+
+
+def render_text(font: pg.font.Font, text: str, antialias: bool, color: pg.color.Color) -> pg.Surface:
+    """
+    Renders `text` with `font`, reusing the surface rendered for the same arguments if cached.
+
+    :param font: Font to render text with.
+    :param text: Text to render.
+    :param antialias: If True, text has smooth edges.
+    :param color: Text color.
+    :return: Rendered text.
+    """
+    if isinstance(color, list):
+        color = tuple(color)
+    return _text_cache.get_or_create((font, text, antialias, color), lambda: font.render(text, antialias, color))
+
+
+def sprite_manifest(groups: Optional[Iterable[str]] = None) -> dict[str, list[str]]:
+    """
+    Returns the sprites available on disk for each sprite group.
+    Groups without a folder under `GRAPHICS_DIR` are skipped.
+
+    :param groups: Groups to list. Defaults to every known group.
+    :return: A dict mapping group names to sorted sprite names.
+    """
+    if groups is None:
+        groups = _alpha_for_sprite_group
+
+    manifest = {}
+    for group in groups:
+        assert group in _alpha_for_sprite_group, f"Only this groups accepted: {list(_alpha_for_sprite_group)}"
+        group_dir = os.path.join(GRAPHICS_DIR, group)
+        if not os.path.isdir(group_dir):
+            continue
+
+        manifest[group] = sorted(name for name in os.listdir(group_dir)
+                                 if os.path.splitext(name)[1].lower() in _sprite_extensions)
+    return manifest
+
+
+def build_sprite_atlases(groups: Optional[Iterable[str]] = None, single: bool = False,
+                         atlas_dir: str = ATLAS_DIR) -> dict[str, int]:
+    """
+    Packs the sprites on disk into texture atlases, written to `atlas_dir`.
+
+    :param groups: Sprite groups to pack. Defaults to every group.
+    :param single: If True, pack every group in the same atlas, except that sprites
+                   with and without per-pixel alpha are always kept apart.
+    :param atlas_dir: Directory to write the atlases to.
+    :return: A dict mapping the name of each atlas written to its number of sprites.
+    """
+    global _atlases
+
+    atlases = {}  # type: dict[str, dict[str, str]]
+    alpha_of = {}  # type: dict[str, bool]
+    for group, names in sprite_manifest(groups).items():
+        alpha = _alpha_for_sprite_group[group]
+        atlas_name = ("sprites" if alpha else "opaque") if single else group
+        alpha_of[atlas_name] = alpha
+        sources = atlases.setdefault(atlas_name, {})
+        for name in names:
+            sources[f"{group}/{name}"] = os.path.join(GRAPHICS_DIR, group, name)
+
+    for atlas_name, sources in atlases.items():
+        if sources:
+            build_atlas(os.path.join(atlas_dir, atlas_name), sources, alpha_of[atlas_name])
+    _atlases = None
+    return {atlas_name: len(sources) for atlas_name, sources in atlases.items() if sources}
+
+
+def build_sprite_bundle(path: str = BUNDLE_PATH, workers: Optional[int] = None) -> dict[str, int]:
+    """
+    Writes every sprite on disk to a sprite bundle, decoding only the sprites
+    that changed since the bundle at `path` was built.
+
+    :param path: Path of the bundle.
+    :param workers: Number of processes decoding sprites, defaults to the number of CPUs.
+    :return: The number of sprites copied from the previous bundle and decoded.
+    """
+    global _bundle_opened
+    sources = {f"{group}/{name}": os.path.join(GRAPHICS_DIR, group, name)
+               for group, names in sprite_manifest().items() for name in names}
+    stats = build_bundle(path, sources, workers)
+    _bundle_opened = False
+    return stats
+
+
+def preload(manifest: Optional[dict[str, Iterable[str]]] = None, font_sizes: Iterable[int] = ()) -> None:
+    """
+    Loads sprites and fonts into the asset caches ahead of time.
+
+    Requires the display mode to be set, as sprites are converted on load.
+
+    :param manifest: A dict mapping groups to sprite names. Defaults to `sprite_manifest()`.
+    :param font_sizes: Game font sizes to build.
+    """
+    if manifest is None:
+        bundle = _get_bundle()
+        manifest = sprite_manifest() if bundle is None else _bundle_manifest(bundle)
+
+    for group, names in manifest.items():
+        for name in names:
+            get_sprite(group, name)
+
+    for size in font_sizes:
+        get_font(size)
+
+
+def _bundle_manifest(bundle: Bundle) -> dict[str, list[str]]:
+    """
+    Returns the sprites in `bundle` by group, like `sprite_manifest()` does for the files on disk.
+    """
+    manifest = {}
+    for key in sorted(bundle.entries):
+        group, name = key.split("/", 1)
+        if group in _alpha_for_sprite_group:
+            manifest.setdefault(group, []).append(name)
+    return manifest
+
+
+def asset_cache_stats() -> dict[str, dict[str, int]]:
+    """
+    Returns hit/miss and memory statistics of the asset caches.
+
+    :return: A dict with "sprites", "fonts" and "texts" cache stats.
+    """
+    return {
+        "sprites": _sprite_cache.stats(),
+        "fonts": _font_cache.stats(),
+        "texts": _text_cache.stats(),
+    }
+
+
+def clear_asset_cache() -> None:
+    """
+    Empties the asset caches.
+    """
+    global _atlases, _bundle, _bundle_opened
+    _sprite_cache.clear()
+    _font_cache.clear()
+    _text_cache.clear()
+    _atlases = None
+    # Sprites still in use may be over the bundle pixels, so it's left for the garbage collector to unmap
+    _bundle, _bundle_opened = None, False
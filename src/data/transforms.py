@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains a cache of transformed sprites: scaled, flipped or rotated copies of the game sprites.
+
+Transformed sprites are kept in a bounded LRU cache and, if a cache directory is set,
+written to disk under a key made of the hash of the source file, the operation and
+its parameters, so that later launches read them back instead of transforming again.
+"""
+import hashlib
+import os
+import struct
+from typing import Any, Callable, Iterable, Optional, Union
+
+import pygame as pg
+
+from utils import LRUCache
+
+from . import GRAPHICS_DIR, TRANSFORM_CACHE_BYTES, TRANSFORM_CACHE_DIR
+from .get_assets import _surface_bytes, get_sprite
+
+
+def _scaled_size(surface: pg.Surface, factor: Union[float, tuple[float, float]]) -> tuple[int, int]:
+    """
+    Returns the size of `surface` scaled by `factor`, like `pg.transform.scale_by()` computes it.
+    `scale_by()` and `smoothscale_by()` themselves need pygame 2.1.3.
+    """
+    fx, fy = factor if isinstance(factor, tuple) else (factor, factor)
+    width, height = surface.get_size()
+    return int(width * abs(fx)), int(height * abs(fy))
+
+
+# Supported operations, called with the sprite and the parameters given to `get_transformed_sprite()`
+TRANSFORMS = {
+    "scale": lambda surface, width, height: pg.transform.scale(surface, (width, height)),
+    "scale_by": lambda surface, factor: pg.transform.scale(surface, _scaled_size(surface, factor)),
+    "smoothscale_by": lambda surface, factor: pg.transform.smoothscale(surface, _scaled_size(surface, factor)),
+    "flip": pg.transform.flip,
+    "rotate": pg.transform.rotate,
+}  # type: dict[str, Callable[..., pg.Surface]]
+
+_MAGIC = b"LPTX"
+_HEADER = struct.Struct("<4sHH?")  # magic, width, height, per-pixel alpha
+_FILE_EXT = ".px"
+
+_transform_cache = LRUCache(max_bytes=TRANSFORM_CACHE_BYTES, sizeof=_surface_bytes)  # type: LRUCache
+_source_hashes = {}                                                                  # type: dict[str, str]
+_cache_dir = TRANSFORM_CACHE_DIR                                                     # type: Optional[str]
+_disk_stats = {"disk_hits": 0, "disk_writes": 0}                                     # type: dict[str, int]
+
+
+def set_transform_cache_dir(path: Optional[str]) -> None:
+    """
+    Sets the directory transformed sprites are persisted to.
+
+    :param path: The directory, created when first written to. If None, nothing is written to disk.
+    """
+    global _cache_dir
+    _cache_dir = path
+
+
+def get_transformed_sprite(group: str, name: str, operation: str, *params: Any) -> pg.Surface:
+    """
+    Returns a transformed copy of a sprite, transforming it only if it's
+    neither in memory nor on disk.
+
+    :param group: Folder name.
+    :param name: Sprite name.
+    :param operation: One of `TRANSFORMS`.
+    :param params: Parameters of the operation, e.g. the factor of "scale_by".
+    :return: The transformed sprite, converted to the display pixel format.
+    """
+    assert operation in TRANSFORMS, f"Only this operations accepted: {list(TRANSFORMS)}"
+    return _transform_cache.get_or_create((group, name, operation, params),
+                                          lambda: _load_transformed(group, name, operation, params))
+
+
+def get_scaled_sprite(group: str, name: str, factor: float) -> pg.Surface:
+    """
+    Returns a sprite scaled by `factor`, without smoothing, see `get_transformed_sprite()`.
+
+    :param group: Folder name.
+    :param name: Sprite name.
+    :param factor: Scale factor.
+    :return: The scaled sprite.
+    """
+    return get_transformed_sprite(group, name, "scale_by", factor)
+
+
+def warm_transform_cache(sprites: Iterable[tuple[str, str]], scales: Iterable[float]) -> None:
+    """
+    Builds the scaled copies of `sprites` at every scale of `scales` ahead of time.
+
+    :param sprites: Groups and names of the sprites.
+    :param scales: Scale factors.
+    """
+    scales = list(scales)
+    for group, name in sprites:
+        for factor in scales:
+            get_scaled_sprite(group, name, factor)
+
+
+def transform_cache_stats() -> dict[str, int]:
+    """
+    Returns statistics of the transform cache: those of the memory cache,
+    plus the sprites read from and written to disk.
+    """
+    return {**_transform_cache.stats(), **_disk_stats}
+
+
+def clear_transform_cache() -> None:
+    """
+    Empties the memory cache of transformed sprites. Files on disk are kept.
+    """
+    _transform_cache.clear()
+    _source_hashes.clear()
+
+
+def _load_transformed(group: str, name: str, operation: str, params: tuple) -> pg.Surface:
+    """
+    Reads a transformed sprite from disk, or transforms it and writes it to disk.
+    """
+    if _cache_dir is None:
+        return TRANSFORMS[operation](get_sprite(group, name), *params)
+
+    path = os.path.join(_cache_dir, _disk_key(group, name, operation, params) + _FILE_EXT)
+    surface = _read(path)
+    if surface is not None:
+        _disk_stats["disk_hits"] += 1
+        return surface
+
+    surface = TRANSFORMS[operation](get_sprite(group, name), *params)
+    _write(path, surface)
+    return surface
+
+
+def _disk_key(group: str, name: str, operation: str, params: tuple) -> str:
+    """
+    Returns the file name of a transformed sprite, which changes with the content of its source.
+    """
+    source = os.path.join(GRAPHICS_DIR, group, name)
+    source_hash = _source_hashes.get(source)
+    if source_hash is None:
+        with open(source, "rb") as f:
+            source_hash = _source_hashes[source] = hashlib.sha1(f.read()).hexdigest()
+    return hashlib.sha1(f"{source_hash}:{operation}:{params!r}".encode()).hexdigest()
+
+
+def _read(path: str) -> Optional[pg.Surface]:
+    """
+    Reads a transformed sprite written by `_write()`, returning None if it's missing or unreadable.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, width, height, alpha = _HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+
+    pixels = memoryview(data)[_HEADER.size:]
+    if magic != _MAGIC or len(pixels) != width * height * (4 if alpha else 3):
+        return None
+
+    surface = pg.image.frombuffer(pixels, (width, height), "RGBA" if alpha else "RGB")
+    return surface.convert_alpha() if alpha else surface.convert()
+
+
+def _write(path: str, surface: pg.Surface) -> None:
+    """
+    Writes the pixels of a transformed sprite. Failing to write only means
+    the sprite will be transformed again next time.
+    """
+    alpha = bool(surface.get_flags() & pg.SRCALPHA)
+    data = _HEADER.pack(_MAGIC, *surface.get_size(), alpha) + pg.image.tostring(surface, "RGBA" if alpha else "RGB")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and renamed, so that other instances never read a partial file
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+    except OSError:
+        return
+    _disk_stats["disk_writes"] += 1
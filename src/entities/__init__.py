@@ -6,5 +6,7 @@ NPCs and other game objects.
 """
 from . import components
 from . import processors
+from .store import *
+from .pool import *
 from .base import *
 from .ui import *
@@ -3,13 +3,15 @@
 """
 Contains base entity classes.
 """
-from typing import Protocol, Iterable, Optional
+import math
+from typing import Any, Protocol, Iterable, Optional, Sequence, Union
 from abc import ABC
 
 import pygame as pg
 
-from data import GRAVITY
+from data import GRAVITY, REFERENCE_DT
 from .processors import JumpProcessor
+from .store import ActorStore
 
 
 class _JumpComponent(Protocol):
@@ -20,6 +22,12 @@ class _JumpComponent(Protocol):
     multi_jump_tempo: float
 
 
+class _RenderQueue(Protocol):
+    """Represents the render queue interface"""
+    def submit(self, source: pg.Surface, dest: Union[pg.Rect, Sequence[int]],
+               area: Optional[pg.Rect] = None, layer: int = 0) -> pg.Rect: ...
+
+
 class Entity(ABC):
     """
     Base class for every game entity.
@@ -43,14 +51,35 @@ class Entity(ABC):
         """
         return self.__rect
 
-    def blit(self, surface: pg.Surface) -> None:
+    def _set_surface(self, surface: pg.Surface) -> None:
+        """
+        Replaces entity surface, resizing `self.rect` accordingly.
+        The top left corner of `self.rect` is kept in place.
+
+        :param surface: The new entity surface.
+        """
+        self.__surf = surface
+        self.__rect.size = surface.get_size()
+
+    def blit(self, surface: pg.Surface) -> pg.Rect:
         """
         Draws `Entity` on given `surface`, using `self.surf`
         as a representation and `self.rect` as position.
 
         :param surface: A surface to draw `Entity` onto.
+        :return: The area of `surface` that was drawn.
+        """
+        return surface.blit(self.surf, self.rect)
+
+    def submit(self, queue: _RenderQueue, layer: int = 0) -> pg.Rect:
+        """
+        Like `blit()`, but submits `Entity` to a render queue, to be drawn when it's flushed.
+
+        :param queue: The render queue.
+        :param layer: The layer to draw `Entity` in.
+        :return: The area of the queue target that will be drawn.
         """
-        surface.blit(self.surf, self.rect)
+        return queue.submit(self.surf, self.rect.topleft, layer=layer)
 
 
 class StaticEntity(Entity):
@@ -58,17 +87,141 @@ class StaticEntity(Entity):
 
 
 class Actor(Entity):
-    """An animate entity."""
+    """
+    An animate entity.
+
+    Its physics state is a row of an `ActorStore`, shared with other actors
+    so that they can be updated all at once. If no store is given, the `Actor`
+    gets a store of its own.
+
+    Its position is kept with sub-pixel precision, `self.rect` being its integer
+    part. The position at the start of the last simulation tick is also kept,
+    so that the `Actor` can be drawn in between ticks.
+
+    An `Actor` can leave its store with `despawn()` and come back with `spawn()`,
+    so that it can be reused instead of creating a new one.
+    """
 
-    def __init__(self, surface: pg.Surface, jump_components: Optional[Iterable[_JumpComponent]] = None) -> None:
+    def __init__(self, surface: pg.Surface, jump_components: Optional[Iterable[_JumpComponent]] = None,
+                 store: Optional[ActorStore] = None, layer: int = 0) -> None:
         super().__init__(surface)
-        self.gravity = 0.                                              # type: float
+        self.__store = store if store is not None else ActorStore(1)   # type: ActorStore
+        self.__layer = layer                                            # type: int
+        self.__row = self.__store.add(0, 0, *surface.get_size(), layer)  # type: Optional[int]
 
         if jump_components is None:
             jump_components = ()
 
         self.__jump_processor = JumpProcessor(self, *jump_components)  # type: JumpProcessor
 
+    @property
+    def store(self) -> ActorStore:
+        """
+        Returns the store holding the `Actor` physics state.
+        """
+        return self.__store
+
+    @property
+    def row(self) -> Optional[int]:
+        """
+        Returns the row of the `Actor` in its store, None if despawned.
+        """
+        return self.__row
+
+    @property
+    def spawned(self) -> bool:
+        """
+        `True` if the `Actor` is in its store.
+        """
+        return self.__row is not None
+
+    def spawn(self, **rect_attrs: Any) -> None:
+        """
+        Adds a despawned `Actor` back to its store, with a new physics state,
+        and places it like `place()` does.
+
+        :param rect_attrs: `Rect` attributes to set.
+        """
+        assert self.__row is None
+        self.__row = self.__store.add(0, 0, *self.surf.get_size(), self.__layer)
+        self.place(**rect_attrs)
+        self.store_previous_position()
+
+    def despawn(self) -> None:
+        """
+        Removes the `Actor` from its store, freeing its row.
+        It must not be used until spawned again.
+        """
+        assert self.__row is not None
+        self.__store.remove(self.__row)
+        self.__row = None
+
+    @property
+    def rect(self) -> pg.Rect:
+        """
+        Returns the entity rect, updated to the entity position.
+        The same `Rect` is returned each time: changes to it are applied
+        with `self.rect = rect` or `self.place()`.
+        """
+        store, row = self.__store, self.__row
+        rect = super().rect
+        rect.update(math.floor(store.x[row]), math.floor(store.y[row]), int(store.w[row]), int(store.h[row]))
+        return rect
+
+    @rect.setter
+    def rect(self, rect: pg.Rect) -> None:
+        # Coordinates left untouched keep their sub-pixel part
+        store, row = self.__store, self.__row
+        if rect.x != math.floor(store.x[row]):
+            store.x[row] = rect.x
+        if rect.y != math.floor(store.y[row]):
+            store.y[row] = rect.y
+
+    def place(self, **rect_attrs: Any) -> None:
+        """
+        Moves the entity setting attributes of its `Rect`,
+        e.g. `actor.place(midbottom=(x, y))`.
+
+        :param rect_attrs: `Rect` attributes to set.
+        """
+        rect = self.rect
+        for name, value in rect_attrs.items():
+            setattr(rect, name, value)
+        self.rect = rect
+
+    @property
+    def gravity(self) -> float:
+        """
+        Returns vertical velocity.
+        """
+        return float(self.__store.vy[self.__row])
+
+    @gravity.setter
+    def gravity(self, v: float) -> None:
+        self.__store.vy[self.__row] = v
+
+    @property
+    def jump_count(self) -> int:
+        """
+        Returns the number of jumps performed since the entity last landed.
+        """
+        return int(self.__store.jump_count[self.__row])
+
+    @jump_count.setter
+    def jump_count(self, v: int) -> None:
+        self.__store.jump_count[self.__row] = v
+
+    @property
+    def jump_index(self) -> int:
+        """
+        Returns the index of the active jump component.
+        """
+        return int(self.__store.jump_index[self.__row])
+
+    @jump_index.setter
+    def jump_index(self, v: int) -> None:
+        self.__store.jump_index[self.__row] = v
+
     def move(self, x: float = 0., y: float = 0.) -> None:
         """
         Updates entity position.
@@ -76,7 +229,50 @@ class Actor(Entity):
         :param x: x movement.
         :param y: y movement.
         """
-        self.rect.move_ip(x, y)
+        self.__store.x[self.__row] += x
+        self.__store.y[self.__row] += y
+
+    def store_previous_position(self) -> None:
+        """
+        Stores current position as the one the `Actor` is drawn from when interpolating.
+        To be called after teleporting the `Actor`, `ActorStore.store_previous_positions()`
+        does it for every actor at the start of each simulation tick.
+        """
+        store, row = self.__store, self.__row
+        store.prev_x[row], store.prev_y[row] = store.x[row], store.y[row]
+
+    def blit(self, surface: pg.Surface, interpolation: float = 1.) -> pg.Rect:
+        """
+        Draws `Actor` on given `surface`, at a position in between the one stored
+        by `store_previous_position()` and the current one.
+
+        :param surface: A surface to draw `Actor` onto.
+        :param interpolation: 0 draws `Actor` at its previous position, 1 at the current one.
+        :return: The area of `surface` that was drawn.
+        """
+        return surface.blit(self.surf, self._draw_position(interpolation))
+
+    def submit(self, queue: _RenderQueue, layer: int = 0, interpolation: float = 1.) -> pg.Rect:
+        """
+        Like `blit()`, but submits `Actor` to a render queue, to be drawn when it's flushed.
+
+        :param queue: The render queue.
+        :param layer: The layer to draw `Actor` in.
+        :param interpolation: 0 draws `Actor` at its previous position, 1 at the current one.
+        :return: The area of the queue target that will be drawn.
+        """
+        return queue.submit(self.surf, self._draw_position(interpolation), layer=layer)
+
+    def _draw_position(self, interpolation: float) -> tuple[int, int]:
+        """
+        Returns the position `Actor` is drawn at, see `blit()`.
+        """
+        store, row = self.__store, self.__row
+        x, y = store.x[row], store.y[row]
+        if interpolation < 1.:
+            x = store.prev_x[row] + (x - store.prev_x[row]) * interpolation
+            y = store.prev_y[row] + (y - store.prev_y[row]) * interpolation
+        return math.floor(x), math.floor(y)
 
     def jump(self) -> None:
         self.__jump_processor.jump()
@@ -84,9 +280,16 @@ class Actor(Entity):
     def landed(self) -> None:
         self.__jump_processor.landed()
 
-    def apply_gravity(self, dt: int) -> None:
-        self.gravity += GRAVITY * dt
-        self.move(y=self.gravity)
+    def apply_gravity(self, dt: float) -> None:
+        """
+        Accelerates the entity downwards and moves it for `dt` milliseconds,
+        like `ActorStore.apply_gravity()` does for every actor.
+
+        :param dt: delta time.
+        """
+        store, row = self.__store, self.__row
+        store.vy[row] += GRAVITY * dt
+        store.y[row] += store.vy[row] * (dt / REFERENCE_DT)
 
     def change_jump_type(self) -> None:
         """
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `Pool`, which recycles objects instead of creating new ones.
+"""
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Pool(Generic[T]):
+    """
+    Keeps released objects and hands them out again on `acquire()`,
+    creating new ones with `factory` only when none is free.
+
+    `on_acquire` and `on_release` hooks reset objects when they
+    are handed out and when they are given back. `factory` must create
+    objects in the same state released ones are left in by `on_release`.
+    """
+
+    def __init__(self, factory: Callable[[], T], on_acquire: Optional[Callable[[T], None]] = None,
+                 on_release: Optional[Callable[[T], None]] = None, prewarm: int = 0) -> None:
+        """
+        :param factory: Called with no arguments to create a new, free object.
+        :param on_acquire: Called with each object handed out by `acquire()`.
+        :param on_release: Called with each object given back by `release()`.
+        :param prewarm: Number of objects to create right away.
+        """
+        self._factory = factory         # type: Callable[[], T]
+        self._on_acquire = on_acquire   # type: Optional[Callable[[T], None]]
+        self._on_release = on_release   # type: Optional[Callable[[T], None]]
+        self._free = []                 # type: list[T]
+
+        self.in_use = 0                 # type: int
+        self.created = 0                # type: int
+        self.reused = 0                 # type: int
+
+        self.prewarm(prewarm)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of free objects.
+        """
+        return len(self._free)
+
+    def acquire(self) -> T:
+        """
+        Returns a free object, or a new one if none is free.
+        """
+        if self._free:
+            obj = self._free.pop()
+            self.reused += 1
+        else:
+            obj = self._factory()
+            self.created += 1
+
+        if self._on_acquire is not None:
+            self._on_acquire(obj)
+        self.in_use += 1
+        return obj
+
+    def release(self, obj: T) -> None:
+        """
+        Gives `obj` back to the pool. It must not be used until acquired again.
+
+        :param obj: An object returned by `acquire()`.
+        """
+        assert obj not in self._free
+        self.in_use -= 1
+        if self._on_release is not None:
+            self._on_release(obj)
+        self._free.append(obj)
+
+    def prewarm(self, n: int) -> None:
+        """
+        Creates objects until at least `n` are free.
+
+        :param n: Number of free objects.
+        """
+        while len(self._free) < n:
+            self._free.append(self._factory())
+            self.created += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the number of free and in use objects, of objects created and reused.
+        """
+        return {"free": len(self._free), "in_use": self.in_use, "created": self.created, "reused": self.reused}
+
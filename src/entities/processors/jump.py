@@ -9,6 +9,8 @@ from typing import Protocol, Type, Optional
 class _Actor(Protocol):
     """Represents the needed entity interface for it to perform a jump."""
     gravity: float
+    jump_count: int
+    jump_index: int
 
 
 class _JumpComponent(Protocol):
@@ -24,21 +26,31 @@ class JumpProcessor:
     Given an entity and a jump component,
     it can make the entity perform the jump
     represented by the jump component.
+
+    The number of jumps performed and the index of the active
+    jump component are kept by the entity.
     """
 
     def __init__(self, entity: _Actor, *jump_components: Type[_JumpComponent]) -> None:
         self.__entity = entity                # type: _Actor
         self.__jumps = list(jump_components)  # type: list[Type[_JumpComponent]]
-        self.__jumping = 0                    # type: int
-        self.__active = None                  # type: Optional[Type[_JumpComponent]]
-        if self.__jumps:
-            self.__active = self.__jumps[0]
+        self.__entity.jump_count = 0
+        self.__entity.jump_index = 0
+
+    @property
+    def _active(self) -> Optional[Type[_JumpComponent]]:
+        """
+        Returns the active jump component, if any.
+        """
+        if not self.__jumps:
+            return None
+        return self.__jumps[self.__entity.jump_index]
 
     def active(self) -> str:
         """
         Returns active jump name.
         """
-        return self.__active.name
+        return self._active.name
 
     def change_jump_type(self) -> None:
         """
@@ -47,13 +59,11 @@ class JumpProcessor:
         if not self.__jumps:
             return
 
-        assert self.__active is not None and self.__active in self.__jumps
-
-        next_jump_idx = self.__jumps.index(self.__active) + 1
+        next_jump_idx = self.__entity.jump_index + 1
         if next_jump_idx >= len(self.__jumps):
             next_jump_idx = 0
 
-        self.__active = self.__jumps[next_jump_idx]
+        self.__entity.jump_index = next_jump_idx
 
     def jump(self) -> None:
         """
@@ -62,28 +72,31 @@ class JumpProcessor:
         """
         if self._can_jump():
             self._perform_jump()
-            self.__jumping += 1
+            self.__entity.jump_count += 1
 
     def landed(self) -> None:
         """
-        Resets self.__jumping to 0.
+        Resets the entity jump count to 0.
         """
-        self.__jumping = 0
+        self.__entity.jump_count = 0
         self.__entity.gravity = 0
 
     def _can_jump(self) -> bool:
         """
         `True` if the entity that owns the `Jump` instance can jump atm.
         """
-        if self.__active is None or self.__jumping >= self.__active.max_jumps:
+        active = self._active
+        jumping = self.__entity.jump_count
+        if active is None or jumping >= active.max_jumps:
             return False
 
-        gravity_limit = 0 if not self.__jumping else self.__active.multi_jump_tempo
+        gravity_limit = 0 if not jumping else active.multi_jump_tempo
         return self.__entity.gravity >= gravity_limit
 
     def _perform_jump(self) -> None:
         """
         The entity that owns the `Jump` instance, performs a jump.
         """
-        assert self.__active is not None
-        self.__entity.gravity = - self.__active.jump_height
+        active = self._active
+        assert active is not None
+        self.__entity.gravity = - active.jump_height
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `ActorStore`, the struct-of-arrays storage of actors' physics state.
+"""
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from data import GRAVITY, REFERENCE_DT
+
+
+class ActorStore:
+    """
+    Keeps position, velocity, size and jump state of many actors in NumPy arrays,
+    one row per actor, so that they can be updated all at once.
+
+    Positions are floats: the `Rect` of an actor has the integer part of its position.
+    Rows of removed actors are reused by the next added ones.
+    Arrays are reallocated when the store grows, so don't keep references to them.
+    """
+
+    def __init__(self, capacity: int = 16) -> None:
+        self.size = 0                                   # type: int
+        self._free = []                                 # type: list[int]
+
+        self.x = np.zeros(capacity, dtype=np.float64)
+        self.y = np.zeros(capacity, dtype=np.float64)
+        self.prev_x = np.zeros(capacity, dtype=np.float64)
+        self.prev_y = np.zeros(capacity, dtype=np.float64)
+        self.vy = np.zeros(capacity, dtype=np.float64)
+        self.w = np.zeros(capacity, dtype=np.int32)
+        self.h = np.zeros(capacity, dtype=np.int32)
+        self.jump_count = np.zeros(capacity, dtype=np.int32)
+        self.jump_index = np.zeros(capacity, dtype=np.int32)
+        self.layer = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Returns the number of rows allocated.
+        """
+        return len(self.x)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of actors in the store.
+        """
+        return self.size - len(self._free)
+
+    def add(self, x: float, y: float, w: int, h: int, layer: int = 0) -> int:
+        """
+        Adds an actor to the store.
+
+        :param x: Left coordinate.
+        :param y: Top coordinate.
+        :param w: Width.
+        :param h: Height.
+        :param layer: Collision layer.
+        :return: The row of the actor.
+        """
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            row = self.size
+            self.size += 1
+
+        self.x[row] = self.prev_x[row] = x
+        self.y[row] = self.prev_y[row] = y
+        self.w[row], self.h[row] = w, h
+        self.vy[row] = 0.
+        self.jump_count[row] = 0
+        self.jump_index[row] = 0
+        self.layer[row] = layer
+        self.alive[row] = True
+        return row
+
+    def remove(self, row: int) -> None:
+        """
+        Removes the actor at `row` from the store.
+
+        :param row: The row of the actor.
+        """
+        assert self.alive[row]
+        self.alive[row] = False
+        self._free.append(row)
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of every array.
+        """
+        for name in ("x", "y", "prev_x", "prev_y", "vy", "w", "h", "jump_count", "jump_index", "layer",
+                     "alive"):
+            old = getattr(self, name)
+            new = np.zeros(max(1, len(old) * 2), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def store_previous_positions(self) -> None:
+        """
+        Stores current positions as the ones actors are drawn from when interpolating.
+        """
+        n = self.size
+        alive = self.alive[:n]
+        np.copyto(self.prev_x[:n], self.x[:n], where=alive)
+        np.copyto(self.prev_y[:n], self.y[:n], where=alive)
+
+    def apply_gravity(self, dt: float) -> None:
+        """
+        Accelerates every actor downwards and moves it for `dt` milliseconds.
+        Rows of removed actors are left untouched.
+
+        :param dt: delta time.
+        """
+        n = self.size
+        alive = self.alive[:n]
+        vy, y = self.vy[:n], self.y[:n]
+        np.add(vy, GRAVITY * dt, out=vy, where=alive)
+        np.add(y, vy * (dt / REFERENCE_DT), out=y, where=alive)
+
+    def clamp_to_ground(self, top: int) -> np.ndarray:
+        """
+        Moves actors below `top` back on it, resetting their velocity and jumps.
+
+        :param top: The y coordinate of the ground.
+        :return: Rows of the actors that landed.
+        """
+        n = self.size
+        rows = np.flatnonzero(self.alive[:n] & (np.floor(self.y[:n]) + self.h[:n] > top))
+        if rows.size:
+            self.y[rows] = top - self.h[rows]
+            self.vy[rows] = 0.
+            self.jump_count[rows] = 0
+        return rows
+
+    def draw_positions(self, interpolation: float = 1., rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the integer positions actors are drawn at, in between the ones
+        stored by `store_previous_positions()` and the current ones, one per row.
+
+        :param interpolation: 0 gives previous positions, 1 the current ones.
+        :param rows: Rows of the actors, every alive actor by default.
+        :return: Positions (x, y).
+        """
+        if rows is None:
+            rows = np.flatnonzero(self.alive[:self.size])
+        x, y = self.x[rows], self.y[rows]
+        if interpolation < 1.:
+            x = self.prev_x[rows] + (x - self.prev_x[rows]) * interpolation
+            y = self.prev_y[rows] + (y - self.prev_y[rows]) * interpolation
+        positions = np.empty((len(rows), 2), dtype=np.int32)
+        positions[:, 0] = np.floor(x)
+        positions[:, 1] = np.floor(y)
+        return positions
+
+    def rects(self) -> np.ndarray:
+        """
+        Returns the integer rects (left, top, width, height) of the actors, one per row.
+        Rows of removed actors are included, see `self.alive`.
+        """
+        n = self.size
+        rects = np.empty((n, 4), dtype=np.int32)
+        rects[:, 0] = np.floor(self.x[:n])
+        rects[:, 1] = np.floor(self.y[:n])
+        rects[:, 2] = self.w[:n]
+        rects[:, 3] = self.h[:n]
+        return rects
+
+    def checksum(self, value: int = 0) -> int:
+        """
+        Returns a CRC32 of the physics state of every actor, bit for bit.
+
+        :param value: Starting value, to chain checksums.
+        """
+        n = self.size
+        for name in ("x", "y", "vy", "w", "h", "jump_count", "jump_index", "layer", "alive"):
+            value = zlib.crc32(getattr(self, name)[:n].tobytes(), value)
+        return value
@@ -3,13 +3,24 @@
 """
 Contains entity classes useful for ui composition.
 """
+from typing import Any, Iterable, Optional
+
 import pygame as pg
 
+from data import render_text
+
 from .base import Entity
 
 
 class Button(Entity):
-    """A button that can be pressed to call a function."""
+    """
+    A button that can be pressed to call a function.
+
+    Its look in each state (active or not, focused or not) is drawn once on a surface
+    of its own, covering `self.halo`, so that the `Button` is drawn with one blit.
+    Given the color of the background it's drawn over, the surface is opaque.
+    """
+    attenuation = 32  # Added to each channel of the background color of inactive buttons
 
     def __init__(self, surface: pg.Surface, color: tuple[int, int, int], callback: callable, active: bool = False, focused: bool = False):
         super().__init__(surface)
@@ -17,6 +28,14 @@ class Button(Entity):
         self.focused = focused
         self.color = color
         self.callback = callback
+        self._images = {}  # type: dict[tuple[bool, bool, Any], pg.Surface]
+
+    @property
+    def state(self) -> tuple[bool, bool]:
+        """
+        Returns what the look of the `Button` depends on: whether it's active and focused.
+        """
+        return self.active, self.focused
 
     @property
     def box(self) -> pg.Rect:
@@ -29,28 +48,55 @@ class Button(Entity):
         box_rect.y -= 4
         return box_rect
 
-    def blit(self, surface: pg.Surface) -> None:
+    @property
+    def halo(self) -> pg.Rect:
+        """
+        Returns the `Rect` of the halo drawn around the `Button` when focused.
+
+        :return: `Button`'s halo `Rect`.
+        """
+        return self.box.inflate(5, 5)
+
+    def blit(self, surface: pg.Surface, bg_color: Any = None) -> pg.Rect:
         """
         Draws `Entity` on given `surface`, using `self.surf`
         as a representation and `self.rect` as position.
 
         :param surface: A surface to draw `Entity` onto.
+        :param bg_color: Color of the background around the box, transparent if None.
+        :return: The area of `surface` that was drawn.
         """
-        if self.active:
-            bg_color = self.color
+        key = (self.active, self.focused, bg_color)
+        image = self._images.get(key)
+        if image is None:
+            image = self._images[key] = self._render(*key)
+        return surface.blit(image, self.halo)
+
+    def _render(self, active: bool, focused: bool, bg_color: Any) -> pg.Surface:
+        """
+        Draws the box, the text and the halo of the `Button` in a state, on a surface
+        covering `self.halo`. Doesn't depend on where the `Button` is.
+        """
+        if active:
+            box_color = self.color
         else:
-            attenuation = 32
-            max_value = 255 - attenuation
-            bg_color = tuple(n + attenuation if n <= max_value else 255 for n in self.color)
+            box_color = tuple(min(255, n + self.attenuation) for n in self.color)
 
-        box = self.box
-        pg.draw.rect(surface, bg_color, box, border_radius=3)
-        surface.blit(self.surf, self.rect)
+        halo = self.halo
+        offset = (-halo.x, -halo.y)
+        box = self.box.move(offset)
+        if bg_color is None:
+            image = pg.Surface(halo.size, pg.SRCALPHA)
+        else:
+            image = pg.Surface(halo.size).convert()
+            image.fill(bg_color)
+        pg.draw.rect(image, box_color, box, border_radius=3)
+        image.blit(self.surf, self.rect.move(offset))
 
-        if self.focused:
-            halo = box.inflate(5, 5)
-            halo_color = "gold" if self.active else "silver"
-            pg.draw.rect(surface, halo_color, halo, width=5, border_radius=3)
+        if focused:
+            halo_color = "gold" if active else "silver"
+            pg.draw.rect(image, halo_color, box.inflate(5, 5), width=5, border_radius=3)
+        return image
 
     def press(self):
         """
@@ -58,3 +104,189 @@ class Button(Entity):
         """
         if self.active:
             self.callback()
+
+
+class ButtonGroup:
+    """
+    Buttons drawn in retained mode over a plain background: each button is redrawn
+    only when its state changed since it was last drawn, with a single opaque blit.
+
+    Buttons under a point are found through an index of their boxes, built by `reindex()`,
+    which must be called again whenever buttons are moved. One button at most is focused.
+    """
+
+    def __init__(self, buttons: Iterable[Button], bg_color: Any) -> None:
+        """
+        :param buttons: The buttons, placed.
+        :param bg_color: Color of the background the buttons are drawn over.
+        """
+        self.buttons = list(buttons)  # type: list[Button]
+        self.bg_color = bg_color      # type: Any
+        self._boxes = []              # type: list[pg.Rect]
+        self._drawn = {}              # type: dict[Button, tuple[bool, bool]]
+        self.reindex()
+
+    def reindex(self) -> None:
+        """
+        Indexes the boxes of the buttons where they are now, and redraws them all.
+        """
+        self._boxes = [btn.box for btn in self.buttons]
+        self._drawn.clear()
+
+    def button_at(self, pos: tuple[int, int]) -> Optional[Button]:
+        """
+        Returns the button whose box contains `pos`, if any.
+
+        :param pos: The point.
+        """
+        i = pg.Rect(pos, (1, 1)).collidelist(self._boxes)
+        return self.buttons[i] if i >= 0 else None
+
+    @property
+    def focused(self) -> Optional[Button]:
+        """
+        Returns the focused button, if any.
+        """
+        for btn in self.buttons:
+            if btn.focused:
+                return btn
+        return None
+
+    def focus(self, button: Optional[Button]) -> None:
+        """
+        Sets the focused button.
+
+        :param button: The button to focus on, or None to remove the focus.
+        """
+        assert button is None or button in self.buttons
+        if button is not None and button.focused:
+            return
+        for btn in self.buttons:
+            btn.focused = btn is button
+
+    def invalidate(self) -> None:
+        """
+        Makes every button be drawn by the next `draw()`, e.g. after the background was redrawn.
+        """
+        self._drawn.clear()
+
+    def draw(self, surface: pg.Surface) -> list[pg.Rect]:
+        """
+        Draws the buttons whose state changed since they were last drawn.
+
+        :param surface: A surface to draw the buttons onto.
+        :return: The areas of `surface` that were drawn.
+        """
+        drawn = []
+        for btn in self.buttons:
+            state = btn.state
+            if self._drawn.get(btn) == state:
+                continue
+
+            drawn.append(btn.blit(surface, self.bg_color))
+            self._drawn[btn] = state
+        return drawn
+
+
+class Label(Entity):
+    """
+    A text that is re-rendered only when the values it shows change.
+
+    The text is obtained formatting `template` with the values given to `set_values()`.
+    """
+
+    def __init__(self, font: pg.font.Font, template: str, color: Any, pos: tuple[int, int],
+                 anchor: str = "topleft", bg_color: Any = None, values: tuple = ()):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.bg_color = bg_color
+        self.pos = pos
+        self.anchor = anchor
+        self._values = values
+        self._image = None  # type: Optional[pg.Surface]
+
+        super().__init__(self._render())
+        self._place()
+        self._compose()
+
+    @property
+    def box(self) -> pg.Rect:
+        """
+        Returns the `Rect` representing the background box of the `Label`.
+
+        :return: Background box `Rect`.
+        """
+        box_rect = self.rect.inflate(10, 10)
+        box_rect.y -= 4
+        return box_rect
+
+    def set_values(self, *values) -> bool:
+        """
+        Sets the values shown by the `Label`, re-rendering it if they changed.
+
+        :return: True if the `Label` was re-rendered.
+        """
+        if values == self._values:
+            return False
+
+        self._values = values
+        self._set_surface(self._render())
+        self._place()
+        self._compose()
+        return True
+
+    @property
+    def area(self) -> pg.Rect:
+        """
+        Returns the `Rect` covered by the `Label` when drawn.
+
+        :return: `Label`'s box if it has a background, its text `Rect` otherwise.
+        """
+        return self.box.union(self.rect) if self.bg_color is not None else self.rect.copy()
+
+    def blit(self, surface: pg.Surface) -> pg.Rect:
+        """
+        Draws `Label` on given `surface`, with its background box if it has one.
+
+        :param surface: A surface to draw `Label` onto.
+        :return: The area of `surface` that was drawn.
+        """
+        surface.blit(self._image, self.area)
+        return self.area
+
+    def submit(self, queue, layer: int = 0) -> pg.Rect:
+        """
+        Like `blit()`, but submits `Label` to a render queue, to be drawn when it's flushed.
+
+        :param queue: The render queue.
+        :param layer: The layer to draw `Label` in.
+        :return: The area of the queue target that will be drawn.
+        """
+        return queue.submit(self._image, self.area.topleft, layer=layer)
+
+    def _render(self) -> pg.Surface:
+        """
+        Renders the text, using the text cache.
+        """
+        return render_text(self.font, self.template.format(*self._values), False, self.color)
+
+    def _compose(self) -> None:
+        """
+        Draws the text over its background box, if any, on a single surface
+        covering `self.area`, so that the `Label` is drawn with one blit.
+        """
+        if self.bg_color is None:
+            self._image = self.surf
+            return
+
+        area = self.area
+        self._image = pg.Surface(area.size, pg.SRCALPHA)
+        pg.draw.rect(self._image, self.bg_color, self.box.move(-area.x, -area.y), border_radius=3)
+        self._image.blit(self.surf, self.rect.move(-area.x, -area.y))
+
+    def _place(self) -> None:
+        """
+        Moves `self.rect` so that its anchor point is at `self.pos`.
+        """
+        setattr(self.rect, self.anchor, self.pos)
@@ -1,10 +1,67 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from core import Game
+from time import perf_counter
+_START = perf_counter()
+
+import argparse
+import sys
+
+from utils import StartupTrace
 
 
 def main() -> None:
-    Game()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", metavar="PATH", help="record the game to a replay log")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a log without a window, checking that it reproduces the recorded game")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="capture the frames shown to a .y4m or .raw video, or to PNG images named like frame%%05d.png")
+    parser.add_argument("--capture-fps", metavar="FPS", type=int,
+                        help="frames per second written in the header of captured .y4m videos, the frame rate cap by default")
+    parser.add_argument("--startup-trace", action="store_true",
+                        help="print the time spent importing and initializing the game, up to the first frame")
+    parser.add_argument("--low-latency", action="store_true",
+                        help="poll input as late as possible before each frame is shown, busy-waiting the last moments")
+    parser.add_argument("--latency", action="store_true",
+                        help="measure the latency from key and mouse presses to the frames showing them, "
+                             "printing a histogram on exit")
+    parser.add_argument("--threaded", action="store_true",
+                        help="simulate the game on a thread of its own, drawing while the next tick is simulated")
+    args = parser.parse_args()
+
+    # pygame and the game modules are imported only now, so that the trace can time them
+    trace = StartupTrace(_START) if args.startup_trace else None
+    if trace is not None:
+        trace.mark("arguments")
+        import pygame
+        trace.mark("import pygame")
+
+    from core import Game
+    from data import MAX_FPS
+    if trace is not None:
+        trace.mark("import game")
+
+    if args.replay:
+        from core import Replayer, ReplayDivergence, play_back
+
+        with open(args.replay, "rb") as f:
+            replayer = Replayer(f)
+        try:
+            ticks = play_back(Game(headless=True, rendering=False), replayer)
+        except ReplayDivergence as e:
+            sys.exit(str(e))
+        print(f"{ticks} ticks replayed, no divergence")
+        return
+
+    game = Game(record=args.record, startup_trace=trace, low_latency=args.low_latency,
+                measure_latency=args.latency, threaded=args.threaded)
+    if args.capture:
+        game.start_capture(args.capture, fps=args.capture_fps or MAX_FPS)
+    try:
+        game.run()
+    finally:
+        if game.latency is not None:
+            game.latency.report()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests that `BatchPlay` goes exactly like headless games playing `PlayState` with the same actions.
+"""
+import numpy as np
+
+from core import ActionKeys, BatchPlay, Game
+from data import Action
+from entities.components import JetpackJump
+
+GAMES = 8
+TICKS = 3000
+
+
+def scripted_actions(rng: np.random.Generator, observations: np.ndarray) -> np.ndarray:
+    """
+    Returns actions that move randomly, but jump over the snail
+    with the jetpack, so that games also score.
+    """
+    fields = BatchPlay.observation_fields
+    player_x, player_y = observations[:, fields.index("player_x")], observations[:, fields.index("player_y")]
+    gap = observations[:, fields.index("snail_x")] - player_x
+
+    n = len(observations)
+    actions = rng.integers(0, 4, n) * (rng.random(n) < .3)
+    actions[(gap > -80) & (gap < 150) & (player_y > 100)] |= Action.JUMP
+    jetpack = BatchPlay.jumps.index(JetpackJump)
+    actions[(observations[:, fields.index("jump_index")] != jetpack) & (rng.random(n) < .05)] |= Action.CHANGE_JUMP
+    return actions
+
+
+def test_batch_play_matches_headless_games() -> None:
+    """
+    Plays the same scripted actions on `BatchPlay` and on headless games,
+    comparing their state after every tick.
+    """
+    rng = np.random.default_rng(0)
+    batch = BatchPlay(GAMES)
+    headless = [Game(headless=True, rendering=False) for _ in range(GAMES)]
+    keys = [ActionKeys() for _ in range(GAMES)]
+    for game in headless:
+        game.new_game()
+
+    ended = scored = 0
+    observations = batch.observe()
+    for tick in range(TICKS):
+        actions = scripted_actions(rng, observations)
+        observations, _, dones = batch.step(actions)
+
+        for i, game in enumerate(headless):
+            game.step(keys[i].events(int(actions[i])))
+            state = game.state_manager.active_state()
+            where = f"game {i}, tick {tick}"
+
+            assert game.has_active_game() != bool(dones[i]), where
+            if dones[i]:
+                assert game.score == batch.final_scores[i], where
+                ended += 1
+                scored += game.score > 0
+                game.new_game()
+                keys[i].release()
+            else:
+                player, snail = state.player, state.enemies[0]
+                store = state.actors
+                expected = (store.x[player.row], store.y[player.row], store.vy[player.row], player.jump_count,
+                            player.jump_index, store.x[snail.row], store.y[snail.row])
+                assert tuple(observations[i]) == expected, where
+                assert game.score == batch.scores[i], where
+
+    # Both game over and scoring were compared
+    assert ended and scored
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests the eviction of `LRUCache` and of the transform cache built on it.
+"""
+import pygame as pg
+import pytest
+
+from data import SCREEN_RES, TRANSFORM_CACHE_DIR, clear_transform_cache, get_scaled_sprite, get_sprite, \
+    get_transformed_sprite, set_transform_cache_dir, transform_cache_stats
+from data import transforms
+from utils import LRUCache
+
+SPRITE = ("snail", "snail1.png")
+
+
+def test_lru_cache_evicts_least_recently_used_bytes() -> None:
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "aaaa")
+    cache.put("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # "b" is now the least recently used
+
+    cache.put("c", "cccc")
+    assert "b" not in cache
+    assert cache.bytes_used == 8
+    assert cache.stats() == {"entries": 2, "bytes": 8, "hits": 1, "misses": 0, "evictions": 1}
+
+
+def test_lru_cache_keeps_newest_entry_over_bounds() -> None:
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "aaaa")
+    cache.put("big", "x" * 20)
+    assert "big" in cache and "a" not in cache
+    assert cache.bytes_used == 20
+
+    cache.discard("big")
+    assert len(cache) == 0 and cache.bytes_used == 0
+
+
+def test_lru_cache_bounded_by_entries() -> None:
+    cache = LRUCache(max_entries=2)
+    created = []
+    for key in "abcab":
+        cache.get_or_create(key, lambda: created.append(key) or key.upper())
+    # "a" and "b" were evicted by the time they were asked again
+    assert created == list("abcab")
+    assert cache.stats()["evictions"] == 3
+    assert cache.get_or_create("b", lambda: None) == "B"
+
+
+@pytest.fixture
+def transform_cache(tmp_path):
+    """
+    Empties the transform cache before and after the test,
+    bounding it so that it holds two snails scaled by 2 at most.
+    """
+    pg.display.init()
+    if pg.display.get_surface() is None:
+        pg.display.set_mode(SCREEN_RES)
+
+    clear_transform_cache()
+    set_transform_cache_dir(None)
+    cache = transforms._transform_cache
+    max_bytes = cache.max_bytes
+    width, height = get_sprite(*SPRITE).get_size()
+    cache.max_bytes = 2 * transforms._surface_bytes(pg.Surface((2 * width, 2 * height), pg.SRCALPHA))
+    yield tmp_path
+
+    cache.max_bytes = max_bytes
+    clear_transform_cache()
+    set_transform_cache_dir(TRANSFORM_CACHE_DIR)
+
+
+def test_transform_cache_evicts_least_recently_used(transform_cache) -> None:
+    start = transform_cache_stats()
+    first = get_scaled_sprite(*SPRITE, 2)
+    assert first.get_size() == tuple(2 * n for n in get_sprite(*SPRITE).get_size())
+    assert get_scaled_sprite(*SPRITE, 2) is first
+
+    get_scaled_sprite(*SPRITE, 1.5)
+    get_scaled_sprite(*SPRITE, 1.9)
+    stats = transform_cache_stats()
+    assert stats["evictions"] - start["evictions"] >= 1
+    assert stats["bytes"] <= transforms._transform_cache.max_bytes
+
+    # The evicted sprite is transformed again
+    assert get_scaled_sprite(*SPRITE, 2) is not first
+    assert transform_cache_stats()["misses"] - start["misses"] == 4
+
+
+def test_transform_cache_reads_evicted_sprites_from_disk(transform_cache) -> None:
+    set_transform_cache_dir(str(transform_cache))
+    start = transform_cache_stats()
+    flipped = get_transformed_sprite(*SPRITE, "flip", True, False)
+    clear_transform_cache()
+
+    read = get_transformed_sprite(*SPRITE, "flip", True, False)
+    stats = transform_cache_stats()
+    assert stats["disk_writes"] - start["disk_writes"] == 1
+    assert stats["disk_hits"] - start["disk_hits"] == 1
+    assert pg.image.tostring(read, "RGBA") == pg.image.tostring(flipped, "RGBA")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests that a recorded game replays to the same checksums, and that a replay
+whose events were changed is reported as diverging.
+"""
+import pygame as pg
+import pytest
+
+from core import Game, Replayer, ReplayDivergence, game_checksum, play_back
+from data import SCREEN_RES, State
+from data.const.keybindings import CHANGE_JUMP_KEY, JUMP_KEY, MOVE_LEFT_KEY, MOVE_RIGHT_KEY, RESTART_KEY
+
+TICKS = 600
+PLAY_BUTTON = (SCREEN_RES.width * 2 // 3, SCREEN_RES.height // 2)
+
+
+def key_event(event_type: int, key: int) -> pg.event.Event:
+    return pg.event.Event(event_type, key=key, mod=0, unicode="", scancode=0)
+
+
+def scripted_events(tick: int) -> list[pg.event.Event]:
+    """
+    Returns the events sent before `tick`: the play button of the menu
+    is clicked, then the player runs back and forth, jumping.
+    """
+    if tick == 0:
+        return [pg.event.Event(pg.MOUSEMOTION, pos=PLAY_BUTTON, rel=(0, 0), buttons=(0, 0, 0))]
+    if tick == 1:
+        return [pg.event.Event(pg.MOUSEBUTTONDOWN, button=pg.BUTTON_LEFT, pos=PLAY_BUTTON)]
+
+    events = []
+    if tick % 120 == 10:
+        events.append(key_event(pg.KEYDOWN, MOVE_RIGHT_KEY))
+    elif tick % 120 == 70:
+        events += [key_event(pg.KEYUP, MOVE_RIGHT_KEY), key_event(pg.KEYDOWN, MOVE_LEFT_KEY)]
+    elif tick % 120 == 0:
+        events.append(key_event(pg.KEYUP, MOVE_LEFT_KEY))
+    if tick % 45 == 20:
+        events.append(key_event(pg.KEYDOWN, JUMP_KEY))
+    elif tick % 45 == 30:
+        events.append(key_event(pg.KEYUP, JUMP_KEY))
+    if tick == 200:
+        events.append(key_event(pg.KEYUP, CHANGE_JUMP_KEY))
+    return events
+
+
+@pytest.fixture(scope="module")
+def replay_log(tmp_path_factory) -> tuple[str, int]:
+    """
+    Records a game played with the scripted events, restarted whenever it ends.
+
+    :return: Path of the replay log and checksum of the game at its end.
+    """
+    path = str(tmp_path_factory.mktemp("replay") / "game.rpl")
+    game = Game(headless=True, rendering=False, record=path)
+    restarts = 0
+    for tick in range(TICKS):
+        events = scripted_events(tick)
+        if game.state_manager.active() is State.GAME_OVER:
+            events.append(key_event(pg.KEYDOWN, RESTART_KEY))
+            restarts += 1
+        game.step(events)
+    assert restarts >= 2, "the replay should span several games"
+    checksum = game_checksum(game)
+    game.stop_recording()
+    return path, checksum
+
+
+def load(path: str) -> Replayer:
+    with open(path, "rb") as f:
+        return Replayer(f)
+
+
+def test_replay_reproduces_recorded_game(replay_log: tuple[str, int]) -> None:
+    path, checksum = replay_log
+    replayer = load(path)
+    assert replayer.last_tick == TICKS - 1
+
+    game = Game(headless=True, rendering=False)
+    assert play_back(game, replayer) == TICKS
+    assert game.ticks == TICKS
+    assert game_checksum(game) == checksum
+
+
+def test_replay_with_missing_events_diverges(replay_log: tuple[str, int]) -> None:
+    path, _ = replay_log
+    replayer = load(path)
+    # Forget that the player ever moved right
+    for events in replayer._events.values():
+        events[:] = [e for e in events if getattr(e, "key", None) != MOVE_RIGHT_KEY]
+
+    with pytest.raises(ReplayDivergence) as divergence:
+        play_back(Game(headless=True, rendering=False), replayer)
+    assert divergence.value.tick >= 10
+    assert divergence.value.actual != divergence.value.expected
+
+
+def test_corrupted_checksum_diverges_at_its_tick(replay_log: tuple[str, int]) -> None:
+    path, _ = replay_log
+    replayer = load(path)
+    replayer._checksums[300] ^= 1
+
+    game = Game(headless=True, rendering=False)
+    with pytest.raises(ReplayDivergence) as divergence:
+        play_back(game, replayer)
+    assert divergence.value.tick == 300
+    assert game.ticks == 301
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests adding and removing actors of an `ActorStore`, and that removed rows are left out of its updates.
+"""
+import numpy as np
+
+from data import GRAVITY, REFERENCE_DT
+from entities import ActorStore
+
+
+def test_removed_rows_are_reused() -> None:
+    store = ActorStore(4)
+    rows = [store.add(10. * i, 0., 5, 5, layer=1) for i in range(3)]
+    assert rows == [0, 1, 2]
+
+    store.remove(1)
+    assert len(store) == 2 and store.size == 3
+    assert not store.alive[1]
+
+    # A reused row starts from a clean state, whatever the removed actor left in it
+    store.vy[1] = 7.
+    store.jump_count[1] = 2
+    assert store.add(42., 3., 8, 9, layer=2) == 1
+    assert len(store) == 3 and store.size == 3
+    assert (store.x[1], store.y[1], store.prev_x[1], store.prev_y[1]) == (42., 3., 42., 3.)
+    assert (store.w[1], store.h[1], store.layer[1]) == (8, 9, 2)
+    assert store.vy[1] == 0. and store.jump_count[1] == 0 and store.alive[1]
+
+
+def test_store_grows_keeping_actors() -> None:
+    store = ActorStore(2)
+    for i in range(5):
+        store.add(float(i), float(-i), i + 1, i + 2)
+    assert store.capacity == 8
+    assert len(store) == store.size == 5
+    np.testing.assert_array_equal(store.x[:5], np.arange(5.))
+    np.testing.assert_array_equal(store.h[:5], np.arange(2, 7))
+    assert store.alive[:5].all() and not store.alive[5:].any()
+
+
+def test_removed_rows_are_not_updated() -> None:
+    store = ActorStore(4)
+    kept, removed = store.add(0., 0., 5, 5), store.add(20., 0., 5, 5)
+    store.remove(removed)
+
+    store.apply_gravity(REFERENCE_DT)
+    assert store.vy[kept] == GRAVITY * REFERENCE_DT
+    assert store.y[kept] > 0.
+    assert store.vy[removed] == 0. and store.y[removed] == 0.
+
+    store.y[removed] = 50.
+    store.store_previous_positions()
+    assert store.prev_y[kept] == store.y[kept]
+    assert store.prev_y[removed] == 0.
+
+    # Removed actors don't land either, however low they are
+    store.y[removed] = 1000.
+    assert store.clamp_to_ground(100).tolist() == []
+
+
+def test_removed_rows_are_left_out_of_drawing() -> None:
+    store = ActorStore(4)
+    for i in range(3):
+        store.add(10. * i, 1.5, 5, 5)
+    store.remove(0)
+    assert store.draw_positions().tolist() == [[10, 1], [20, 1]]
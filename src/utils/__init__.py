@@ -2,5 +2,23 @@
 # -*- coding: utf-8 -*-
 """
 Contains utilities such as debug functions.
+
+Modules are imported when one of their names is first used, see `lazy_exports()`.
 """
-from .debug import *
+from typing import TYPE_CHECKING
+
+from .lazy import lazy_exports
+
+__getattr__, __all__ = lazy_exports(__name__, {
+    ".debug": ("debug_func", "print_event"),
+    ".cache": ("LRUCache",),
+    ".pixels": ("channel_offsets", "rgb_view"),
+    ".startup": ("StartupTrace",),
+})
+__all__.append("lazy_exports")
+
+if TYPE_CHECKING:
+    from .debug import *
+    from .cache import *
+    from .pixels import *
+    from .startup import *
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains a bounded LRU cache used to keep loaded assets in memory.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A bounded, least-recently-used cache.
+
+    The cache can be bounded by number of entries, by memory (in bytes) or by both.
+    The memory used by each entry is computed by `sizeof`; if it is not given,
+    every entry weighs 0 bytes and only `max_entries` matters.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 sizeof: Optional[Callable[[Any], int]] = None) -> None:
+        self.max_entries = max_entries                                   # type: Optional[int]
+        self.max_bytes = max_bytes                                       # type: Optional[int]
+        self._sizeof = sizeof if sizeof is not None else (lambda _: 0)  # type: Callable[[Any], int]
+
+        self.__entries = OrderedDict()                                   # type: OrderedDict[Hashable, tuple[Any, int]]
+        self.__bytes = 0                                                 # type: int
+
+        self.hits = 0                                                    # type: int
+        self.misses = 0                                                  # type: int
+        self.evictions = 0                                               # type: int
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    @property
+    def bytes_used(self) -> int:
+        """
+        Returns the memory currently accounted to cached entries.
+        """
+        return self.__bytes
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the value cached under `key`, marking it as recently used.
+
+        :param key: Cache key.
+        :param default: Value returned if `key` is not cached.
+        :return: Cached value or `default`.
+        """
+        entry = self.__entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self.__entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Caches `value` under `key`, evicting least recently used entries
+        if the cache exceeds its bounds.
+
+        :param key: Cache key.
+        :param value: Value to cache.
+        """
+        self.discard(key)
+
+        size = self._sizeof(value)
+        self.__entries[key] = (value, size)
+        self.__bytes += size
+        self._evict()
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Returns the value cached under `key`, creating it with `factory` on a miss.
+
+        :param key: Cache key.
+        :param factory: Called with no arguments to build the missing value.
+        :return: Cached value.
+        """
+        entry = self.__entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.__entries.move_to_end(key)
+            return entry[0]
+
+        self.misses += 1
+        value = factory()
+        self.put(key, value)
+        return value
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Removes `key` from the cache, if present.
+
+        :param key: Cache key.
+        """
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__bytes -= entry[1]
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache. Stats are left untouched.
+        """
+        self.__entries.clear()
+        self.__bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns cache statistics.
+
+        :return: A dict with entries, bytes, hits, misses and evictions.
+        """
+        return {
+            "entries": len(self.__entries),
+            "bytes": self.__bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _evict(self) -> None:
+        """
+        Evicts least recently used entries until the cache is within its bounds.
+        The most recently added entry is never evicted.
+        """
+        while len(self.__entries) > 1 and self._over_bounds():
+            _, (_, size) = self.__entries.popitem(last=False)
+            self.__bytes -= size
+            self.evictions += 1
+
+    def _over_bounds(self) -> bool:
+        """
+        `True` if the cache exceeds `max_entries` or `max_bytes`.
+        """
+        if self.max_entries is not None and len(self.__entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.__bytes > self.max_bytes
@@ -3,6 +3,8 @@
 """
 Contains debug functions.
 """
+import functools
+
 import pygame as pg
 from typing import Callable, Any
 
@@ -18,6 +20,7 @@ def debug_func(f: Callable, default: Any = None):
     :param default: Default return value when not in debug mode.
     :return: Function that is executed only in debug mode.
     """
+    @functools.wraps(f)
     def wrapper(*a, **kw):
         return f(*a, **kw) if __debug__ else default
     return wrapper
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `lazy_exports()`, which makes packages import their modules on first use.
+"""
+import importlib
+import sys
+from typing import Any, Callable, Iterable
+
+
+def lazy_exports(package: str, exports: dict[str, Iterable[str]]) -> tuple[Callable[[str], Any], list[str]]:
+    """
+    Builds the module `__getattr__` of a package that imports each of its modules
+    the first time one of the names it exports is accessed, instead of when the
+    package is imported.
+
+    :param package: Name of the package, i.e. its `__name__`.
+    :param exports: A dict mapping modules, relative to the package, to the names they export.
+    :return: The `__getattr__` of the package and the list of exported names, for `__all__`.
+    """
+    owners = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = owners.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+
+        value = getattr(importlib.import_module(module, package), name)
+        # Later accesses find the name in the package and don't get here
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return __getattr__, list(owners)
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains functions to read raw surface pixels with NumPy.
+"""
+import numpy as np
+import pygame as pg
+
+
+def channel_offsets(surface: pg.Surface) -> tuple[int, int, int]:
+    """
+    Returns the byte offsets of red, green and blue in a pixel of a 32 bit `surface`.
+
+    :param surface: A 32 bit surface.
+    :return: Offsets of red, green and blue.
+    """
+    assert surface.get_bytesize() == 4, "Only 32 bit surfaces are supported"
+    return tuple(shift // 8 for shift in surface.get_shifts()[:3])
+
+
+def rgb_view(raw: np.ndarray, offsets: tuple[int, int, int]) -> np.ndarray:
+    """
+    Returns a view of raw 32 bit pixels with the channels in RGB order.
+
+    :param raw: Raw pixels, shaped (height, width, 4).
+    :param offsets: Byte offsets of red, green and blue, see `channel_offsets()`.
+    :return: A view shaped (height, width, 3).
+    """
+    red, green, blue = offsets
+    step = green - red
+    if step not in (1, -1) or blue - green != step:
+        raise ValueError(f"unsupported pixel format, channel offsets {offsets}")
+    return raw[:, :, red::step][:, :, :3]
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contains `StartupTrace`, which times the steps from launch to the first frame.
+
+Only the standard library is imported here, so that the trace can start
+before pygame and the game modules are imported.
+"""
+import sys
+from time import perf_counter
+from typing import Optional, TextIO
+
+
+class StartupTrace:
+    """
+    Records the time spent in each startup step, in the order they happen.
+    Each mark closes the step that started at the previous mark.
+    """
+
+    def __init__(self, start: Optional[float] = None) -> None:
+        """
+        :param start: `perf_counter()` time the first step started at, defaults to now.
+        """
+        self.start = perf_counter() if start is None else start  # type: float
+        self._last = self.start                                  # type: float
+        self.steps = []                                          # type: list[tuple[str, float]]
+
+    def mark(self, step: str) -> None:
+        """
+        Records the time elapsed since the previous mark as `step`.
+
+        :param step: Name of the step that just ended.
+        """
+        now = perf_counter()
+        self.steps.append((step, (now - self._last) * 1000))
+        self._last = now
+
+    def total(self) -> float:
+        """
+        Returns the time elapsed from the start to the last mark, in milliseconds.
+        """
+        return (self._last - self.start) * 1000
+
+    def report(self, file: TextIO = sys.stderr) -> None:
+        """
+        Prints the time of each step and the total.
+
+        :param file: Where to print.
+        """
+        width = max((len(step) for step, _ in self.steps), default=0)
+        for step, ms in self.steps:
+            print(f"{step:<{width}}  {ms:8.1f} ms", file=file)
+        print(f"{'total':<{width}}  {self.total():8.1f} ms", file=file)